@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Better accounts to scan with.
+Each account gets its own browser context and saved login in one shared
+browser, and its own rate-limit budget; venues are spread across accounts.
+accounts.json (or BETTER_ACCOUNTS_FILE) is a list like:
+
+    [
+      {"name": "sam", "email": "sam@example.com", "password": "..."},
+      {"name": "alex", "email": "alex@example.com", "password": "..."}
+    ]
+
+Without the file, BETTER_EMAIL/BETTER_PASSWORD is the only account and keeps
+using browser_state.json as before.
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+ACCOUNTS_FILE = os.getenv("BETTER_ACCOUNTS_FILE", "accounts.json")
+
+
+@dataclass
+class Account:
+    """Login credentials and where that account's browser state is saved."""
+    name: str
+    email: str
+    password: str = field(repr=False)
+    state_path: str = None
+
+
+def _state_path(name, default_state_path):
+    root, ext = os.path.splitext(default_state_path)
+    return f"{root}_{re.sub(r'[^A-Za-z0-9_-]+', '_', name)}{ext or '.json'}"
+
+
+def load_accounts(path=ACCOUNTS_FILE, default_email=None, default_password=None,
+                  default_state_path="browser_state.json"):
+    """Accounts from `path`, or the single BETTER_EMAIL/BETTER_PASSWORD account. May be empty."""
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                entries = json.load(f)
+            accounts = [Account(name=str(entry.get("name") or entry["email"]), email=entry["email"],
+                                password=entry["password"]) for entry in entries]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Could not load accounts from {path}: {e}")
+            accounts = []
+        names = [account.name for account in accounts]
+        if len(set(names)) != len(names):
+            print(f"⚠️ Duplicate account names in {path} - they would share a saved login")
+        for account in accounts:
+            account.state_path = _state_path(account.name, default_state_path)
+        if accounts:
+            return accounts
+
+    if default_email and default_password:
+        return [Account(name="default", email=default_email, password=default_password,
+                        state_path=default_state_path)]
+    return []
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Debug artifact store.
+HTML snapshots and screenshots are stored once per unique content (SHA-256),
+HTML is compressed (zstd if installed, gzip otherwise), every artifact is
+indexed by run/venue/date in SQLite, and size/age retention keeps the disk in
+check. Writes happen on a background thread so debug mode doesn't slow runs.
+
+Usage:
+    python artifacts.py list [--venue NAME] [--date YYYY-MM-DD] [--run RUN_ID]
+    python artifacts.py show ID [-o FILE]
+    python artifacts.py prune
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "debug_artifacts")
+ARTIFACT_MAX_MB = int(os.getenv("ARTIFACT_MAX_MB", "500"))
+ARTIFACT_MAX_AGE_DAYS = int(os.getenv("ARTIFACT_MAX_AGE_DAYS", "14"))
+
+# Already-compressed formats are stored as-is
+COMPRESSIBLE_KINDS = {"html"}
+EXTENSIONS = {"html": "html", "screenshot": "png"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    venue TEXT,
+    date TEXT,
+    kind TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_lookup ON artifacts (venue, date, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_sha ON artifacts (sha256);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+"""
+
+
+def new_run_id():
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+
+
+def _compress(data):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=6), ".gz"
+
+
+def _decompress(data, path):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("zstandard is needed to read this artifact (pip install zstandard)")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if path.endswith(".gz"):
+        return gzip.decompress(data)
+    return data
+
+
+class ArtifactStore:
+    """Content-addressed artifact store with a SQLite index."""
+
+    def __init__(self, root=ARTIFACT_DIR, max_mb=ARTIFACT_MAX_MB, max_age_days=ARTIFACT_MAX_AGE_DAYS):
+        self.root = root
+        self.max_bytes = max_mb * 1024 * 1024
+        self.max_age = max_age_days * 86400
+        self.index_path = os.path.join(root, "index.db")
+        self._queue = None
+        self._writer = None
+
+    def _connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.executescript(SCHEMA)
+        return conn
+
+    # -- writing -------------------------------------------------------------
+
+    def _store(self, conn, kind, data, run_id, venue, date_str):
+        digest = hashlib.sha256(data).hexdigest()
+        known = conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+        if not known:
+            payload, suffix = _compress(data) if kind in COMPRESSIBLE_KINDS else (data, "")
+            relative = os.path.join("blobs", digest[:2], f"{digest}.{EXTENSIONS.get(kind, 'bin')}{suffix}")
+            path = os.path.join(self.root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            conn.execute("INSERT INTO blobs (sha256, path, stored_size) VALUES (?, ?, ?)",
+                         (digest, relative, len(payload)))
+        conn.execute(
+            "INSERT INTO artifacts (run_id, venue, date, kind, sha256, size, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, venue, date_str, kind, digest, len(data), time.time())
+        )
+        conn.commit()
+        return digest, bool(known)
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                kind, _, _, venue, date_str = item
+                try:
+                    digest, duplicate = self._store(conn, *item)
+                    note = "duplicate of stored content" if duplicate else "stored"
+                    print(f"💾 {kind} for {venue} {date_str or ''}: {note} ({digest[:12]})")
+                except Exception as e:
+                    print(f"Failed to store debug artifact: {e}")
+                finally:
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+    def put(self, kind, data, run_id, venue=None, date_str=None):
+        """Queue an artifact (bytes or str) for storage on the background writer."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self._writer is None:
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, name="artifact-writer", daemon=True)
+            self._writer.start()
+        self._queue.put((kind, data, run_id, venue, date_str))
+
+    def close(self):
+        """Finish pending writes and apply retention."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        if os.path.exists(self.index_path):
+            self.enforce_retention()
+
+    # -- retention -----------------------------------------------------------
+
+    def enforce_retention(self):
+        """Drop artifacts older than the age limit, then the oldest until under the size limit."""
+        conn = self._connect()
+        try:
+            removed = conn.execute("DELETE FROM artifacts WHERE created_at < ?",
+                                   (time.time() - self.max_age,)).rowcount
+            removed_blobs = self._remove_orphans(conn)
+
+            total = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+            while total > self.max_bytes:
+                oldest_run = conn.execute("SELECT run_id FROM artifacts ORDER BY created_at LIMIT 1").fetchone()
+                if not oldest_run:
+                    break
+                removed += conn.execute("DELETE FROM artifacts WHERE run_id = ?", oldest_run).rowcount
+                removed_blobs += self._remove_orphans(conn)
+                total = conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+            conn.commit()
+            if removed:
+                print(f"🧹 Artifact retention removed {removed} artifact(s), {removed_blobs} file(s); "
+                      f"{total / 1024 / 1024:.1f} MB kept")
+            return removed
+        finally:
+            conn.close()
+
+    def _remove_orphans(self, conn):
+        orphans = conn.execute(
+            "SELECT sha256, path FROM blobs WHERE sha256 NOT IN (SELECT DISTINCT sha256 FROM artifacts)"
+        ).fetchall()
+        for digest, relative in orphans:
+            try:
+                os.remove(os.path.join(self.root, relative))
+            except OSError:
+                pass
+            conn.execute("DELETE FROM blobs WHERE sha256 = ?", (digest,))
+        return len(orphans)
+
+    # -- reading -------------------------------------------------------------
+
+    def find(self, venue=None, date_str=None, run_id=None):
+        conn = self._connect()
+        try:
+            query = ("SELECT a.id, a.run_id, a.venue, a.date, a.kind, a.size, b.stored_size, a.created_at "
+                     "FROM artifacts a JOIN blobs b USING (sha256) WHERE 1=1")
+            params = []
+            for column, value in (("a.venue", venue), ("a.date", date_str), ("a.run_id", run_id)):
+                if value:
+                    query += f" AND {column} = ?"
+                    params.append(value)
+            return conn.execute(query + " ORDER BY a.created_at", params).fetchall()
+        finally:
+            conn.close()
+
+    def read(self, artifact_id):
+        """Return (kind, original bytes) for an artifact id."""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT a.kind, b.path FROM artifacts a JOIN blobs b USING (sha256) WHERE a.id = ?",
+                               (artifact_id,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            raise KeyError(artifact_id)
+        kind, relative = row
+        with open(os.path.join(self.root, relative), "rb") as f:
+            return kind, _decompress(f.read(), relative)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browse stored debug artifacts")
+    parser.add_argument("--dir", default=ARTIFACT_DIR)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="List stored artifacts")
+    list_parser.add_argument("--venue")
+    list_parser.add_argument("--date")
+    list_parser.add_argument("--run")
+
+    show_parser = subparsers.add_parser("show", help="Write an artifact's original content")
+    show_parser.add_argument("id", type=int)
+    show_parser.add_argument("-o", "--output", help="File to write (default: stdout)")
+
+    subparsers.add_parser("prune", help="Apply size/age retention now")
+
+    args = parser.parse_args()
+    store = ArtifactStore(args.dir)
+
+    if args.command == "list":
+        for row in store.find(args.venue, args.date, args.run):
+            artifact_id, run_id, venue, date_str, kind, size, stored, created = row
+            print(f"{artifact_id:>6}  {run_id}  {venue or '-':<28} {date_str or '-':<10}  {kind:<10} "
+                  f"{size / 1024:>8.1f} KB -> {stored / 1024:>7.1f} KB  {time.strftime('%Y-%m-%d %H:%M', time.localtime(created))}")
+    elif args.command == "show":
+        kind, data = store.read(args.id)
+        if args.output:
+            with open(args.output, "wb") as f:
+                f.write(data)
+            print(f"Wrote {kind} ({len(data)} bytes) to {args.output}")
+        else:
+            sys.stdout.buffer.write(data)
+    elif args.command == "prune":
+        store.enforce_retention()
+
+
+if __name__ == "__main__":
+    main()
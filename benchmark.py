@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark against the local mock site (see mock_server.py).
+Runs the watcher's real scan path (login, waits, scrolling, parsing) for each
+strategy and browser profile (see browser_profiles.py) and prints one
+comparison table: time to ready (launch + login), sweep wall time, per-page
+p50/p95, slots found, CPU (Python and browser) and peak memory.
+
+Usage:
+    python benchmark.py --sweeps 3 --strategies cron,daemon --render-delay-ms 3000 --error-rate 0.1
+    python benchmark.py --strategies daemon --profiles all   # compare browser profiles on the same pages
+    python benchmark.py --base-url http://127.0.0.1:8765   # use an already running mock
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+from envfile import load_env_file
+
+# .env first, so the scratch paths and mock URL set below win over it
+load_env_file()
+
+from browser_profiles import PROFILES, get_profile
+from browser_session import browser_pids, memory_usage
+from mock_server import add_mock_arguments, mock_options, start_mock_server
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def _cpu_seconds(pid):
+    """User + system CPU time of a process (Linux /proc), or 0."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def _browser_cpu():
+    """CPU seconds used so far by each Playwright process (driver and browsers), by PID."""
+    return {pid: _cpu_seconds(pid) for pid in browser_pids()}
+
+
+def make_session_class(watcher, measurements, state_path, profile):
+    """BrowserSession that records time to ready, per-page latency, peak memory and browser CPU."""
+
+    class TimedSession(watcher.BrowserSession):
+        def __init__(self, *args, **kwargs):
+            kwargs.setdefault("storage_state_path", state_path)
+            kwargs.setdefault("profile", profile)
+            super().__init__(*args, **kwargs)
+            self._cpu_at_start = {}
+
+        def start(self):
+            # The driver (and, for daemons, the browser) outlive a session: only count what it adds
+            self._cpu_at_start = _browser_cpu()
+            started = time.perf_counter()
+            try:
+                return super().start()
+            finally:
+                measurements["ready"].append(time.perf_counter() - started)
+
+        def _check(self, check, label):
+            started = time.perf_counter()
+            try:
+                return super()._check(check, label)
+            finally:
+                measurements["pages"].append(time.perf_counter() - started)
+                usage = memory_usage()
+                measurements["peak_python_mb"] = max(measurements["peak_python_mb"], usage["python_mb"])
+                measurements["peak_browser_mb"] = max(measurements["peak_browser_mb"], usage["browser_mb"] or 0)
+
+        def close(self):
+            # Browser processes are gone after close, so take their CPU time first
+            measurements["browser_cpu"] += sum(cpu - self._cpu_at_start.get(pid, 0.0)
+                                               for pid, cpu in _browser_cpu().items())
+            super().close()
+
+    return TimedSession
+
+
+def strategy_cron(watcher, playwright, session_class, sweeps, on_sweep):
+    """A fresh browser and login for every sweep, like one cron run each."""
+    for _ in range(sweeps):
+        session = session_class(playwright, headless=True, login=watcher.login_to_better)
+        try:
+            session.start()
+            on_sweep(watcher.run_sweep([session], False)[0])
+        finally:
+            session.close()
+
+
+def strategy_daemon(watcher, playwright, session_class, sweeps, on_sweep):
+    """One browser kept open across sweeps, like --daemon."""
+    session = session_class(playwright, headless=True, login=watcher.login_to_better)
+    try:
+        session.start()
+        for _ in range(sweeps):
+            on_sweep(watcher.run_sweep([session], False)[0])
+    finally:
+        session.close()
+
+
+def strategy_daemon_full_load(watcher, playwright, session_class, sweeps, on_sweep):
+    """Like daemon, but every date is a full page load (DATE_NAVIGATION=full)."""
+    previous = watcher.DATE_NAVIGATION
+    watcher.DATE_NAVIGATION = "full"
+    try:
+        strategy_daemon(watcher, playwright, session_class, sweeps, on_sweep)
+    finally:
+        watcher.DATE_NAVIGATION = previous
+
+
+def strategy_daemon_inline_parse(watcher, playwright, session_class, sweeps, on_sweep):
+    """Like daemon, but pages are parsed on the browser thread (PARSE_WORKERS=0)."""
+    from parse_pool import ParsePool  # After main() has pointed parsers.py at the mock
+
+    previous = watcher.PARSE_POOL
+    watcher.PARSE_POOL = ParsePool(workers=0)
+    try:
+        strategy_daemon(watcher, playwright, session_class, sweeps, on_sweep)
+    finally:
+        watcher.PARSE_POOL = previous
+
+
+STRATEGIES = {
+    "cron": strategy_cron,
+    "daemon": strategy_daemon,
+    "daemon-full-load": strategy_daemon_full_load,
+    "daemon-inline-parse": strategy_daemon_inline_parse,
+}
+
+
+def run_strategy(watcher, name, sweeps, state_path, profile):
+    from playwright.sync_api import sync_playwright
+
+    measurements = {"ready": [], "pages": [], "sweeps": [], "failed_pages": 0, "slots": 0,
+                    "browser_cpu": 0.0, "peak_python_mb": 0.0, "peak_browser_mb": 0.0}
+    sweep_started = [time.perf_counter()]
+
+    def on_sweep(results):
+        now = time.perf_counter()
+        measurements["sweeps"].append(now - sweep_started[0])
+        sweep_started[0] = now
+        dates = len(watcher.get_weekend_dates())
+        measurements["failed_pages"] += sum(dates - len(r["dates_checked"]) for r in results)
+        measurements["slots"] += sum(len(r["slots"]) for r in results)
+
+    cpu_started = time.process_time()
+    with sync_playwright() as playwright:
+        session_class = make_session_class(watcher, measurements, state_path, profile)
+        STRATEGIES[name](watcher, playwright, session_class, sweeps, on_sweep)
+    measurements["python_cpu"] = time.process_time() - cpu_started
+    return measurements
+
+
+def summarise(name, profile, m):
+    return {
+        "strategy": name,
+        "profile": profile.name,
+        "ready_s": round(sum(m["ready"]) / len(m["ready"]), 1) if m["ready"] else None,
+        "sweeps": len(m["sweeps"]),
+        "sweep_mean_s": round(sum(m["sweeps"]) / len(m["sweeps"]), 1) if m["sweeps"] else None,
+        "page_p50_s": round(percentile(m["pages"], 50), 1) if m["pages"] else None,
+        "page_p95_s": round(percentile(m["pages"], 95), 1) if m["pages"] else None,
+        "failed_pages": m["failed_pages"],
+        "slots": m["slots"],
+        "python_cpu_s": round(m["python_cpu"], 1),
+        "browser_cpu_s": round(m["browser_cpu"], 1),
+        "peak_python_mb": round(m["peak_python_mb"]),
+        "peak_browser_mb": round(m["peak_browser_mb"]),
+    }
+
+
+def reset_state(watcher, scratch):
+    """Forget what the previous run learned, so runs don't bias each other."""
+    from circuit_breaker import CircuitBreaker
+    from timeouts import AdaptiveTimeouts
+
+    for name in ("browser_state.json", "wait_timings.json", "wait_timings_history.jsonl",
+                 "circuit_state.json", "rate_limit.json"):
+        path = os.path.join(scratch, name)
+        if os.path.exists(path):
+            os.remove(path)
+    watcher.WAIT_TIMEOUTS = AdaptiveTimeouts()
+    watcher.BREAKER = CircuitBreaker()
+
+
+def print_table(rows):
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the watcher's scan path against the mock site")
+    parser.add_argument("--strategies", default=",".join(STRATEGIES),
+                        help=f"Comma-separated, from: {', '.join(STRATEGIES)}")
+    parser.add_argument("--profiles", default=os.getenv("BROWSER_PROFILE", "default"),
+                        help=f"Comma-separated browser profiles, or 'all', from: {', '.join(PROFILES)}")
+    parser.add_argument("--sweeps", type=int, default=3, help="Sweeps per strategy (default: 3)")
+    parser.add_argument("--base-url", help="Benchmark an already running mock instead of starting one")
+    parser.add_argument("--output", help="Also write the results table to this JSON file")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.strategies.split(",") if n.strip()]
+    unknown = [n for n in names if n not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+    profiles = list(PROFILES) if args.profiles == "all" else [p.strip() for p in args.profiles.split(",") if p.strip()]
+    unknown = [p for p in profiles if p not in PROFILES]
+    if unknown:
+        parser.error(f"unknown browser profiles: {', '.join(unknown)}")
+
+    server = None if args.base_url else start_mock_server(**mock_options(args))
+    base_url = args.base_url or server.base_url
+    print(f"🧪 Benchmarking against {base_url}")
+
+    # The watcher reads its configuration at import time, so point it at the mock and keep
+    # every piece of state (slot index, history, login, learned timeouts, circuit and rate
+    # limit state, artifacts, traces) out of the real files first
+    scratch = tempfile.mkdtemp(prefix="tennis-bench-")
+    os.environ["BETTER_BASE_URL"] = base_url
+    os.environ.setdefault("BETTER_EMAIL", "benchmark@example.com")
+    os.environ.setdefault("BETTER_PASSWORD", "benchmark")
+    os.environ["BETTER_ACCOUNTS_FILE"] = os.path.join(scratch, "accounts.json")
+    os.environ["SLOT_INDEX_PATH"] = os.path.join(scratch, "slot_index.json")
+    os.environ["HISTORY_DIR"] = os.path.join(scratch, "history")
+    os.environ["TIMEOUTS_PATH"] = os.path.join(scratch, "wait_timings.json")
+    os.environ["TIMEOUTS_HISTORY_PATH"] = os.path.join(scratch, "wait_timings_history.jsonl")
+    os.environ["CIRCUIT_STATE_PATH"] = os.path.join(scratch, "circuit_state.json")
+    os.environ["RATE_LIMIT_STATE"] = os.path.join(scratch, "rate_limit.json")
+    os.environ["ARTIFACT_DIR"] = os.path.join(scratch, "debug_artifacts")
+    os.environ["TRACE_DIR"] = os.path.join(scratch, "traces")
+    # The mock is local: don't let the politeness limit dominate the timings (override to measure it)
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "6000")
+    os.environ.setdefault("RATE_LIMIT_BURST", "100")
+    state_path = os.path.join(scratch, "browser_state.json")
+    import watcher
+
+    if not watcher.BOOKING_HOST.startswith(base_url):
+        sys.exit(f"Watcher is configured for {watcher.BOOKING_HOST}, not the mock - refusing to benchmark")
+
+    rows = []
+    for profile in map(get_profile, profiles):
+        for name in names:
+            print(f"\n⏱️ Strategy '{name}' with the {profile.name} browser profile ({args.sweeps} sweep(s))")
+            reset_state(watcher, scratch)  # Every run starts logged out, with default timeouts and closed circuits
+            try:
+                rows.append(summarise(name, profile, run_strategy(watcher, name, args.sweeps, state_path, profile)))
+            except Exception as e:
+                # Usually an engine that isn't installed (playwright install firefox webkit)
+                print(f"⚠️ Skipping the {profile.name} profile: {e}")
+                break
+
+    if not rows:
+        sys.exit("Nothing was measured")
+    print()
+    print_table(rows)
+    if server is not None:
+        print(f"\nMock server: {server.stats.get('pages', 0)} page(s) and {server.stats.get('xhr', 0)} slot "
+              f"list(s) served, {server.stats.get('errors', 0)} errors, {server.stats.get('slow', 0)} slow")
+        server.shutdown()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Browser launch profiles. The watcher only reads a list of slots, so most of a
+default Chromium (GPU compositing, a renderer per site, images, caches) is
+overhead. Pick one with BROWSER_PROFILE or `watcher.py --browser-profile`, and
+compare them on the same pages with `python benchmark.py --profiles all`.
+
+Profiles:
+    default   Chromium as Playwright launches it
+    lean      Chromium without GPU/rasteriser, images, service workers or disk
+              cache, in an 800x600 viewport
+    minimal   lean, plus one renderer process for every page
+    firefox   Firefox with images and disk cache off, 800x600
+    webkit    WebKit, 800x600
+
+Firefox and WebKit need `playwright install firefox webkit` first.
+"""
+
+import os
+from dataclasses import dataclass, field
+
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "default")
+
+SMALL_VIEWPORT = {"width": 800, "height": 600}
+
+# Only switches Playwright doesn't already pass. No --disable-features here: a second
+# one replaces Playwright's own list instead of adding to it.
+LEAN_CHROMIUM_ARGS = (
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--blink-settings=imagesEnabled=false",
+    "--disk-cache-size=1",
+    "--media-cache-size=1",
+    "--aggressive-cache-discard",
+)
+
+MINIMAL_CHROMIUM_ARGS = LEAN_CHROMIUM_ARGS + (
+    "--renderer-process-limit=1",
+    "--disable-site-isolation-trials",
+)
+
+LEAN_FIREFOX_PREFS = {
+    "permissions.default.image": 2,  # Don't load images
+    "browser.cache.disk.enable": False,
+    "browser.cache.memory.capacity": 16384,  # KiB
+    "media.autoplay.default": 5,  # Block all autoplay
+    "gfx.webrender.software": True,
+}
+
+
+@dataclass
+class BrowserProfile:
+    """How to launch the browser and set up its contexts."""
+    name: str
+    engine: str = "chromium"
+    args: tuple = ()
+    firefox_prefs: dict = field(default_factory=dict)
+    viewport: dict = None  # None: Playwright's default (1280x720)
+    block_service_workers: bool = False
+
+    def launch(self, playwright, headless=True):
+        options = {"headless": headless}
+        if self.args:
+            options["args"] = list(self.args)
+        if self.firefox_prefs:
+            options["firefox_user_prefs"] = dict(self.firefox_prefs)
+        return getattr(playwright, self.engine).launch(**options)
+
+    def context_options(self):
+        """Extra new_context() options."""
+        options = {}
+        if self.viewport:
+            options["viewport"] = dict(self.viewport)
+        if self.block_service_workers:
+            options["service_workers"] = "block"
+        return options
+
+
+PROFILES = {profile.name: profile for profile in (
+    BrowserProfile("default"),
+    BrowserProfile("lean", args=LEAN_CHROMIUM_ARGS, viewport=SMALL_VIEWPORT, block_service_workers=True),
+    BrowserProfile("minimal", args=MINIMAL_CHROMIUM_ARGS, viewport=SMALL_VIEWPORT, block_service_workers=True),
+    BrowserProfile("firefox", engine="firefox", firefox_prefs=LEAN_FIREFOX_PREFS, viewport=SMALL_VIEWPORT,
+                   block_service_workers=True),
+    BrowserProfile("webkit", engine="webkit", viewport=SMALL_VIEWPORT, block_service_workers=True),
+)}
+
+
+def get_profile(name=None):
+    """The named profile (default: BROWSER_PROFILE). Raises ValueError for unknown names."""
+    name = name or BROWSER_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"Unknown browser profile '{name}' (choose from: {', '.join(PROFILES)})")
+    return PROFILES[name]
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Memory-bounded browser session for long-running watchers.
+Tracks Python and browser RSS, recycles the page after a number of navigations
+or when the browser grows too large, rebuilds the context from saved login
+state, and relaunches the browser after crashes or repeatedly hung pages.
+"""
+
+import gc
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from browser_profiles import get_profile
+
+STORAGE_STATE_PATH = os.getenv("BROWSER_STATE_PATH", "browser_state.json")
+
+# Recycle the page after this many navigations
+MAX_PAGE_NAVIGATIONS = int(os.getenv("BROWSER_MAX_PAGE_NAVIGATIONS", "50"))
+# Rebuild the whole context after this many navigations
+MAX_CONTEXT_NAVIGATIONS = int(os.getenv("BROWSER_MAX_CONTEXT_NAVIGATIONS", "300"))
+# Browser processes (everything Playwright started) above this get the page recycled,
+# and the context rebuilt if that wasn't enough
+MAX_BROWSER_MB = int(os.getenv("BROWSER_MAX_MB", "800"))
+# Python above this gets a full garbage collection and a warning
+MAX_PYTHON_MB = int(os.getenv("PYTHON_MAX_MB", "300"))
+# Consecutive failed checks before the browser is considered hung and relaunched
+HUNG_AFTER_FAILURES = int(os.getenv("BROWSER_HUNG_AFTER_FAILURES", "3"))
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+
+
+def _rss_mb(pid):
+    """Current resident memory of a process in MB (Linux /proc), or None."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _descendant_pids(root_pid, skip=None):
+    """All descendants of a process (Linux /proc), leaving out those `skip(pid)` is true for and their own."""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Field 4 is the parent PID; the command name may contain spaces, so split after ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    found = []
+    stack = [root_pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if skip and skip(child):
+                continue
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def browser_pids():
+    """
+    Processes Playwright started: its node driver and the browsers under it.
+    Our other children run this same Python (parse_pool.py's workers and
+    multiprocessing's resource tracker) and are left out.
+    """
+    python = os.path.realpath(sys.executable)
+    return _descendant_pids(os.getpid(), skip=lambda pid: os.path.realpath(f"/proc/{pid}/exe") == python)
+
+
+def memory_usage():
+    """
+    Returns {"python_mb", "browser_mb"}. The browser figure sums every process
+    Playwright started (driver + browser), not the parse workers. On systems
+    without /proc only the Python peak RSS is available and browser_mb is None.
+    """
+    python_mb = _rss_mb(os.getpid())
+    if python_mb is None:
+        if resource is None:
+            return {"python_mb": 0.0, "browser_mb": None}
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        python_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+        return {"python_mb": round(python_mb, 1), "browser_mb": None}
+
+    browser_mb = sum(_rss_mb(pid) or 0 for pid in browser_pids())
+    return {"python_mb": round(python_mb, 1), "browser_mb": round(browser_mb, 1)}
+
+
+class SharedBrowser:
+    """One browser process for several sessions (one context each, e.g. one per account)."""
+
+    def __init__(self, playwright, headless=True, profile=None):
+        self.playwright = playwright
+        self.headless = headless
+        self.profile = profile or get_profile()
+        self.browser = None
+
+    def get(self):
+        """The browser, (re)launched if it isn't running."""
+        if self.browser is None or not self.browser.is_connected():
+            print(f"🔧 Launching shared browser ({self.profile.name} profile)...")
+            self.browser = self.profile.launch(self.playwright, self.headless)
+            print("✅ Browser launched successfully")
+        return self.browser
+
+    def close(self):
+        try:
+            if self.browser:
+                self.browser.close()
+        except Exception:
+            pass
+        self.browser = None
+
+
+class BrowserSession:
+    """
+    Owns the browser, context and page. Use `run(fn)` for every page check so
+    housekeeping happens between navigations and a crashed browser is replaced
+    (and the check retried) instead of the check being dropped.
+    """
+
+    def __init__(self, playwright, headless=True, login=None, storage_state_path=STORAGE_STATE_PATH, tracer=None,
+                 recording=None, limiter=None, shared_browser=None, name=None, profile=None):
+        self.playwright = playwright
+        self.headless = headless
+        self.login = login
+        self.tracer = tracer
+        self.recording = recording
+        self.limiter = limiter
+        self.storage_state_path = storage_state_path
+        self.shared_browser = shared_browser  # With one, restarts replace only this session's context
+        self.profile = shared_browser.profile if shared_browser else profile or get_profile()
+        self.name = name
+        self.browser = None
+        self._watched_browser = None
+        self.context = None
+        self.page = None
+        self._crashed = False
+        self._closing = False
+        self._page_navigations = 0
+        self._context_navigations = 0
+        self._consecutive_failures = 0
+        self.stats = {"page_recycles": 0, "context_rebuilds": 0, "browser_restarts": 0}
+
+    # -- lifecycle -----------------------------------------------------------
+
+    def start(self):
+        if self.shared_browser:
+            self.browser = self.shared_browser.get()
+        else:
+            print(f"🔧 Launching browser ({self.profile.name} profile)...")
+            self.browser = self.profile.launch(self.playwright, self.headless)
+            print("✅ Browser launched successfully")
+        if self.browser is not self._watched_browser:
+            self.browser.on("disconnected", lambda _: self._mark_crashed("browser disconnected"))
+            self._watched_browser = self.browser
+        self._new_context(always_login=not self.stats["browser_restarts"])
+        return self
+
+    def _new_context(self, always_login=False):
+        """
+        Create a context, restoring saved login state if there is any. Logs in when
+        there's no saved state, or on first start to confirm the session is still valid.
+        """
+        print(f"🔧 Creating browser context{f' for {self.name}' if self.name else ''}...")
+        has_state = os.path.exists(self.storage_state_path)
+        self.context = self.browser.new_context(
+            user_agent=USER_AGENT,
+            storage_state=self.storage_state_path if has_state else None,
+            **self.profile.context_options(),
+            **(self.recording.context_options() if self.recording else {})
+        )
+        if self.recording:
+            self.recording.setup_context(self.context)  # HAR routing when replaying
+        if self.limiter:
+            self.limiter.watch(self.context)  # Slow down when the site's API says 429
+        self._context_navigations = 0
+        if self.tracer:
+            self.tracer.attach(self.context)
+        self._new_page()
+        if self.login and (always_login or not has_state):
+            self.login(self.page)
+            self.save_state()
+        print("✅ Browser setup complete")
+
+    def _new_page(self):
+        self.page = self.context.new_page()
+        self.page.on("crash", lambda _: self._mark_crashed("page crashed"))
+        self._page_navigations = 0
+
+    def _mark_crashed(self, reason):
+        if self._closing:
+            return
+        if not self._crashed:
+            print(f"💥 Browser problem: {reason}")
+        self._crashed = True
+
+    def save_state(self):
+        """Persist cookies/local storage so a rebuilt context stays logged in."""
+        try:
+            self.context.storage_state(path=self.storage_state_path)
+        except Exception as e:
+            print(f"Could not save browser state: {e}")
+
+    def close(self):
+        self._closing = True
+        for closer in (lambda: self.context and self.context.close(),
+                       lambda: self.browser and not self.shared_browser and self.browser.close()):
+            try:
+                closer()
+            except Exception:
+                pass  # Already gone after a crash
+        self._closing = False
+
+    # -- recycling -----------------------------------------------------------
+
+    def recycle_page(self, reason):
+        print(f"♻️ Recycling page ({reason})")
+        try:
+            self.page.close()
+        except Exception:
+            pass
+        self._new_page()
+        self.stats["page_recycles"] += 1
+
+    def rebuild_context(self, reason):
+        print(f"♻️ Rebuilding browser context ({reason})")
+        self.save_state()
+        try:
+            self.context.close()
+        except Exception:
+            pass
+        self._new_context()
+        self.stats["context_rebuilds"] += 1
+
+    def restart_browser(self, reason):
+        print(f"🔁 Restarting browser ({reason})")
+        if not self._crashed:
+            self.save_state()
+        self.close()
+        self._crashed = False
+        self._consecutive_failures = 0
+        self.stats["browser_restarts"] += 1
+        self.start()
+
+    def healthy(self):
+        try:
+            return not self._crashed and self.browser.is_connected() and not self.page.is_closed()
+        except Exception:
+            return False
+
+    def housekeeping(self):
+        """Apply navigation and memory limits before the next navigation."""
+        if not self.healthy():
+            self.restart_browser("browser or page no longer usable")
+            return
+
+        if self._context_navigations >= MAX_CONTEXT_NAVIGATIONS:
+            self.rebuild_context(f"{self._context_navigations} navigations")
+            return
+        if self._page_navigations >= MAX_PAGE_NAVIGATIONS:
+            self.recycle_page(f"{self._page_navigations} navigations")
+
+        usage = memory_usage()
+        if usage["browser_mb"] is not None and usage["browser_mb"] > MAX_BROWSER_MB:
+            if self._page_navigations:
+                self.recycle_page(f"browser using {usage['browser_mb']:.0f} MB")
+            else:
+                # A fresh page didn't bring memory down; start from a clean context
+                self.rebuild_context(f"browser still using {usage['browser_mb']:.0f} MB")
+        if usage["python_mb"] > MAX_PYTHON_MB:
+            gc.collect()
+            print(f"⚠️ Python process using {usage['python_mb']:.0f} MB (limit {MAX_PYTHON_MB} MB)")
+
+    # -- running checks ------------------------------------------------------
+
+    def _check(self, check, label):
+        """Run one check, recording it as a trace chunk when tracing is on."""
+        self._page_navigations += 1
+        self._context_navigations += 1
+        if not (self.tracer and label):
+            return check(self.page)
+        context = self.context
+        self.tracer.begin(context, label)
+        try:
+            result = check(self.page)
+        except Exception as e:
+            self.tracer.end(context, label, e)
+            raise
+        self.tracer.end(context, label, result)
+        return result
+
+    def run(self, check, label=None):
+        """
+        Run `check(page)` for one page visit. A result dict with an "error" key
+        counts as a failure; repeated failures or a crash relaunch the browser
+        and the check is retried once so scheduled checks aren't lost.
+        `label` names the check in traces.
+        """
+        self.housekeeping()
+        started = time.time()
+        try:
+            result = self._check(check, label)
+        except Exception as e:
+            if self.healthy():
+                raise
+            result = {"error": str(e)}
+
+        failed = isinstance(result, dict) and "error" in result
+        self._consecutive_failures = self._consecutive_failures + 1 if failed else 0
+
+        if failed and (not self.healthy() or self._consecutive_failures >= HUNG_AFTER_FAILURES):
+            reason = ("crash" if not self.healthy()
+                      else f"{self._consecutive_failures} failed checks in a row, last took {time.time() - started:.0f}s")
+            self.restart_browser(reason)
+            result = self._check(check, label)
+        return result
+
+    def report(self):
+        usage = memory_usage()
+        browser = f"{usage['browser_mb']:.0f} MB" if usage["browser_mb"] is not None else "n/a"
+        print(f"🧠 Memory: python {usage['python_mb']:.0f} MB, browser {browser} | "
+              f"recycled pages {self.stats['page_recycles']}, contexts {self.stats['context_rebuilds']}, "
+              f"browser restarts {self.stats['browser_restarts']}")
+        return dict(usage, **self.stats)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker for the booking site and each venue.
+After enough consecutive failed pages a circuit opens and further pages are
+skipped instead of each paying the full timeout. Once the backoff has passed
+the circuit is half-open: one cheap probe decides whether to close it again or
+reopen it for twice as long. State is persisted so the backoff carries across
+cron runs.
+"""
+
+import json
+import os
+import time
+
+CIRCUIT_STATE_PATH = os.getenv("CIRCUIT_STATE_PATH", "circuit_state.json")
+# Consecutive failed pages before a venue / the whole site is skipped
+CIRCUIT_VENUE_FAILURES = int(os.getenv("CIRCUIT_VENUE_FAILURES", "2"))
+CIRCUIT_SITE_FAILURES = int(os.getenv("CIRCUIT_SITE_FAILURES", "4"))
+# First backoff after tripping; doubles on every failed probe up to the maximum
+CIRCUIT_BACKOFF_SECONDS = int(os.getenv("CIRCUIT_BACKOFF_SECONDS", "300"))
+CIRCUIT_MAX_BACKOFF_SECONDS = int(os.getenv("CIRCUIT_MAX_BACKOFF_SECONDS", str(6 * 3600)))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Per-key (site or venue) failure counters with persisted exponential backoff."""
+
+    def __init__(self, path=CIRCUIT_STATE_PATH, backoff=CIRCUIT_BACKOFF_SECONDS,
+                 max_backoff=CIRCUIT_MAX_BACKOFF_SECONDS):
+        self.path = path
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._circuits = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._circuits, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _circuit(self, key):
+        return self._circuits.setdefault(key, {"failures": 0, "trips": 0, "open_until": 0})
+
+    def state(self, key):
+        """CLOSED (go ahead), OPEN (skip) or HALF_OPEN (backoff over: try one probe)."""
+        circuit = self._circuits.get(key)
+        if not circuit or not circuit["trips"]:
+            return CLOSED
+        return OPEN if time.time() < circuit["open_until"] else HALF_OPEN
+
+    def retry_in(self, key):
+        """Seconds until an open circuit is due a probe."""
+        circuit = self._circuits.get(key)
+        return max(0, circuit["open_until"] - time.time()) if circuit else 0
+
+    def record_success(self, key):
+        circuit = self._circuit(key)
+        if circuit["trips"]:
+            print(f"🟢 Circuit for {key} closed again")
+        circuit.update(failures=0, trips=0, open_until=0)
+        self._save()
+
+    def record_failure(self, key, threshold):
+        """Count a failure; trip (or re-trip a half-open circuit) once `threshold` is reached."""
+        circuit = self._circuit(key)
+        circuit["failures"] += 1
+        if circuit["failures"] >= threshold or circuit["trips"]:
+            circuit["trips"] += 1
+            wait = min(self.max_backoff, self.backoff * 2 ** (circuit["trips"] - 1))
+            circuit["open_until"] = time.time() + wait
+            circuit["failures"] = 0
+            print(f"🔴 Circuit for {key} open: skipping it for {wait / 60:.0f} min "
+                  f"(trip {circuit['trips']})")
+        self._save()
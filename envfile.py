@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Loads .env into the environment. Most modules read their settings into
+module constants when they are imported, so this has to run before the
+first local import.
+"""
+
+from dotenv import load_dotenv
+
+_loaded = False
+
+
+def load_env_file():
+    """Load .env (overriding the environment) once per process.
+    Later calls do nothing, so settings changed after the first load (benchmark.py) stay changed."""
+    global _loaded
+    if not _loaded:
+        load_dotenv(override=True)
+        _loaded = True
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Columnar availability history.
+Every sweep appends its observations to per-day partitions of fixed-width
+column files, so months of history can be loaded straight into NumPy arrays
+and aggregated without parsing anything.
+
+Usage:
+    python history.py cancellations --venue "Highbury Tennis" --weekday Sat --time 10:00
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from array import array
+from datetime import date, datetime, timedelta
+
+HISTORY_DIR = os.getenv("HISTORY_DIR", "history")
+
+# Column name -> array typecode. Strings are dictionary-encoded into uint16 codes,
+# dates are stored as proleptic ordinals and times as minutes after midnight.
+OBSERVATION_COLUMNS = {
+    "observed_at": "d",  # unix seconds
+    "venue": "H",
+    "date": "i",
+    "start": "h",
+    "end": "h",
+    "court": "H",
+    "spaces": "h",
+    "price": "i",        # pence, -1 if unknown
+}
+
+# One row per (venue, date) page that was successfully checked, whether or not it had slots.
+# Needed to tell "slot disappeared" from "page wasn't checked".
+CHECK_COLUMNS = {
+    "observed_at": "d",
+    "venue": "H",
+    "date": "i",
+}
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+PRICE_RE = re.compile(r'(\d+)(?:\.(\d{1,2}))?')
+
+
+def _numpy_dtype(typecode):
+    """NumPy dtype string matching an array typecode's on-disk layout."""
+    kind = "f" if typecode == "d" else ("u" if typecode.isupper() else "i")
+    return f"{kind}{array(typecode).itemsize}"
+
+
+def _minutes(hhmm: str) -> int:
+    hours, _, minutes = hhmm.partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _pence(price: str) -> int:
+    match = PRICE_RE.search(price or "")
+    if not match:
+        return -1
+    return int(match.group(1)) * 100 + int((match.group(2) or "0").ljust(2, "0"))
+
+
+class HistoryStore:
+    """Append-only columnar store partitioned by observation day."""
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self._dictionary_path = os.path.join(root, "dictionary.json")
+        self._dictionary = None
+
+    # -- dictionary encoding -------------------------------------------------
+
+    def _load_dictionary(self):
+        if self._dictionary is None:
+            try:
+                with open(self._dictionary_path, encoding="utf-8") as f:
+                    self._dictionary = json.load(f)
+            except (OSError, ValueError):
+                self._dictionary = {"venue": [], "court": []}
+        return self._dictionary
+
+    def _encode(self, kind, value, dirty):
+        values = self._load_dictionary()[kind]
+        try:
+            return values.index(value)
+        except ValueError:
+            values.append(value)
+            dirty.append(kind)
+            return len(values) - 1
+
+    def _save_dictionary(self):
+        tmp_path = f"{self._dictionary_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._dictionary, f)
+        os.replace(tmp_path, self._dictionary_path)
+
+    def code_for(self, kind, value):
+        """Return the stored code for a venue/court name, or None if never seen."""
+        values = self._load_dictionary()[kind]
+        return values.index(value) if value in values else None
+
+    # -- writing -------------------------------------------------------------
+
+    def _partition(self, day: str):
+        path = os.path.join(self.root, day)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _append(path, table, columns, rows):
+        for name, typecode in columns.items():
+            column = array(typecode, (row[name] for row in rows))
+            with open(os.path.join(path, f"{table}.{name}"), "ab") as f:
+                column.tofile(f)
+
+    def record_sweep(self, results, observed_at=None):
+        """
+        Append one sweep's results. Each result needs "location", "slots" and
+        "dates_checked" (the dates whose page loaded successfully).
+        """
+        observed_at = observed_at or time.time()
+        os.makedirs(self.root, exist_ok=True)
+        dirty = []
+
+        observations = []
+        checks = []
+        for result in results:
+            venue = self._encode("venue", result["location"], dirty)
+            for date_str in result.get("dates_checked", []):
+                checks.append({
+                    "observed_at": observed_at,
+                    "venue": venue,
+                    "date": date.fromisoformat(date_str).toordinal(),
+                })
+            for slot in result["slots"]:
+                observations.append({
+                    "observed_at": observed_at,
+                    "venue": venue,
+                    "date": date.fromisoformat(slot.date).toordinal(),
+                    "start": _minutes(slot.start),
+                    "end": _minutes(slot.end),
+                    "court": self._encode("court", slot.court, dirty),
+                    "spaces": slot.spaces,
+                    "price": _pence(slot.price),
+                })
+
+        if dirty:
+            self._save_dictionary()
+
+        path = self._partition(datetime.fromtimestamp(observed_at).strftime("%Y-%m-%d"))
+        self._append(path, "checks", CHECK_COLUMNS, checks)
+        self._append(path, "observations", OBSERVATION_COLUMNS, observations)
+        return len(observations)
+
+    # -- reading -------------------------------------------------------------
+
+    def partitions(self, since=None, until=None):
+        """List partition directories (YYYY-MM-DD) in the given inclusive range."""
+        if not os.path.isdir(self.root):
+            return []
+        days = sorted(d for d in os.listdir(self.root) if re.fullmatch(r"\d{4}-\d{2}-\d{2}", d))
+        return [d for d in days if (since is None or d >= since) and (until is None or d <= until)]
+
+    def load(self, table, since=None, until=None):
+        """Load a table's columns as NumPy arrays concatenated across partitions."""
+        import numpy as np
+
+        columns = OBSERVATION_COLUMNS if table == "observations" else CHECK_COLUMNS
+        dtypes = {name: _numpy_dtype(typecode) for name, typecode in columns.items()}
+        parts = {name: [] for name in columns}
+        for day in self.partitions(since, until):
+            loaded = {}
+            for name, dtype in dtypes.items():
+                path = os.path.join(self.root, day, f"{table}.{name}")
+                loaded[name] = np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype)
+            # An interrupted append can leave columns of different lengths; keep complete rows only
+            rows = min(len(column) for column in loaded.values())
+            for name in columns:
+                parts[name].append(loaded[name][:rows])
+        return {
+            name: np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype)
+            for name, dtype in dtypes.items()
+        }
+
+    def cancellations(self, venue, weekday, start, days=90):
+        """
+        When do slots for `venue` on `weekday` (0=Mon) at `start` (HH:MM) appear?
+        An appearance is a slot seen in a check whose previous check of the same
+        page didn't have it. Returns a summary dict.
+        """
+        import numpy as np
+
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        summary = {"venue": venue, "weekday": WEEKDAYS[weekday], "start": start,
+                   "appearances": 0, "lead_hours": [], "hour_histogram": [0] * 24}
+
+        venue_code = self.code_for("venue", venue)
+        if venue_code is None:
+            return summary
+
+        obs = self.load("observations", since=since)
+        checks = self.load("checks", since=since)
+
+        # Ordinal 1 (0001-01-01) was a Monday
+        mask = ((obs["venue"] == venue_code)
+                & (obs["start"] == _minutes(start))
+                & ((obs["date"] - 1) % 7 == weekday))
+        obs_date, obs_court, obs_time = obs["date"][mask], obs["court"][mask], obs["observed_at"][mask]
+        check_mask = checks["venue"] == venue_code
+
+        appeared_at = []
+        slot_dates = []
+        for day in np.unique(obs_date):
+            check_times = np.sort(checks["observed_at"][check_mask & (checks["date"] == day)])
+            in_day = obs_date == day
+            for court in np.unique(obs_court[in_day]):
+                seen = np.sort(obs_time[in_day & (obs_court == court)])
+                # Previous check of this page before each sighting (-inf if it was the first check)
+                idx = np.searchsorted(check_times, seen) - 1
+                previous = np.where(idx >= 0, check_times[np.maximum(idx, 0)], -np.inf)
+                new = ~np.isin(previous, seen)
+                appeared_at.append(seen[new])
+                slot_dates.append(np.full(int(new.sum()), day))
+
+        if not appeared_at:
+            return summary
+
+        appeared_at = np.concatenate(appeared_at)
+        slot_dates = np.concatenate(slot_dates)
+
+        # Slot start as unix seconds (local time) to measure how far ahead cancellations appear
+        slot_days, day_index = np.unique(slot_dates, return_inverse=True)
+        midnights = np.array([
+            datetime.combine(date.fromordinal(int(d)), datetime.min.time()).timestamp() for d in slot_days
+        ])
+        lead_hours = (midnights[day_index] + _minutes(start) * 60 - appeared_at) / 3600.0
+
+        hours = np.array([datetime.fromtimestamp(t).hour for t in appeared_at])
+        summary.update({
+            "appearances": int(len(appeared_at)),
+            "lead_hours": sorted(float(h) for h in lead_hours),
+            "median_lead_hours": float(np.median(lead_hours)),
+            "hour_histogram": np.bincount(hours, minlength=24).tolist(),
+        })
+        return summary
+
+
+def record_results(results, root=HISTORY_DIR):
+    """Append a sweep to the history store, never failing the run."""
+    try:
+        rows = HistoryStore(root).record_sweep(results)
+        print(f"🗄️ Recorded {rows} observation(s) to {root}")
+    except Exception as e:
+        print(f"Failed to record availability history: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the availability history")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    cancellations = subparsers.add_parser("cancellations", help="When do slots for a venue/day/time appear?")
+    cancellations.add_argument("--venue", required=True)
+    cancellations.add_argument("--weekday", required=True, choices=WEEKDAYS)
+    cancellations.add_argument("--time", required=True, help="Slot start time, HH:MM")
+    cancellations.add_argument("--days", type=int, default=90, help="How far back to look")
+    cancellations.add_argument("--dir", default=HISTORY_DIR)
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = HistoryStore(args.dir).cancellations(args.venue, WEEKDAYS.index(args.weekday), args.time, args.days)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"🎾 {summary['venue']} – {summary['weekday']} {summary['start']} (last {args.days} days)")
+    print(f"Appearances: {summary['appearances']}")
+    if summary["appearances"]:
+        print(f"Median lead time: {summary['median_lead_hours']:.1f} hours before the slot")
+        print("Appearances by hour of day:")
+        peak = max(summary["hour_histogram"])
+        for hour, count in enumerate(summary["hour_histogram"]):
+            if count:
+                print(f"  {hour:02d}:00  {'█' * max(1, round(20 * count / peak))} {count}")
+    print(f"Query took {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
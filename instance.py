@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Single-instance guard and local control socket.
+Only one watcher (and so one browser) runs at a time. A cron invocation that
+finds a daemon already running asks it over a Unix socket to sweep now and exits.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to PID checks only
+    fcntl = None
+
+LOCK_PATH = os.getenv("WATCHER_LOCK_PATH", "watcher.lock")
+SOCKET_PATH = os.getenv("WATCHER_SOCKET_PATH", "watcher.sock")
+
+# A lock holder that hasn't checked in for this long is reported as possibly hung
+STALE_AFTER = int(os.getenv("WATCHER_STALE_AFTER", str(3 * 3600)))
+
+
+def pid_alive(pid):
+    """Check whether a process with this PID exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Exists but owned by someone else
+    except (OSError, TypeError, ValueError):
+        return False
+    return True
+
+
+class InstanceLock:
+    """
+    Lockfile holding the owner's PID, mode and last heartbeat.
+    Uses flock where available so a crashed owner never leaves a stale lock;
+    otherwise a lock whose PID is gone is taken over.
+    """
+
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self._file = None
+        self._info = None
+
+    def _write_info(self):
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(self._info))
+        self._file.flush()
+
+    def acquire(self, mode="run"):
+        """Try to take the lock without waiting. Returns True on success."""
+        if fcntl is None and self._held_by_live_process():
+            return False
+
+        lock_file = open(self.path, "a+", encoding="utf-8")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+
+        self._file = lock_file
+        now = time.time()
+        self._info = {"pid": os.getpid(), "mode": mode, "started": now, "heartbeat": now}
+        self._write_info()
+        return True
+
+    def heartbeat(self):
+        """Record that the owner is still making progress."""
+        if self._file is not None:
+            self._info["heartbeat"] = time.time()
+            self._write_info()
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            self._file.seek(0)
+            self._file.truncate()
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+        # With flock the file stays: removing it could let two processes lock different inodes
+        if fcntl is None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def holder(self):
+        """
+        Describe the current owner: pid, mode, started, heartbeat, alive, and
+        stale (seconds since last heartbeat if over STALE_AFTER, else 0).
+        Returns None if nobody holds the lock. With flock, the file's contents
+        are ignored when the lock can be taken: they were left by a crashed
+        owner, whose PID may since have been reused by another process.
+        """
+        if fcntl is not None and not self._flocked():
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                info = json.loads(f.read() or "null")
+        except (OSError, ValueError):
+            return None
+        if not isinstance(info, dict):
+            return None
+        info["alive"] = pid_alive(info.get("pid"))
+        silence = time.time() - info.get("heartbeat", info.get("started", 0))
+        info["stale"] = silence if silence > STALE_AFTER else 0
+        return info
+
+    def _flocked(self):
+        """Whether some process (this one included) holds the flock, tested without taking it."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                try:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return True
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                return False
+        except OSError:
+            return False  # No lock file yet
+
+    def _held_by_live_process(self):
+        info = self.holder()
+        return bool(info and info["alive"] and info.get("pid") != os.getpid())
+
+
+class ControlServer:
+    """
+    Line-based JSON command server on a Unix socket.
+    `handler(command)` runs on the server thread and returns a dict reply.
+    """
+
+    def __init__(self, path, handler):
+        self.path = path
+        self.handler = handler
+        self._sock = None
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        if not hasattr(socket, "AF_UNIX"):
+            print("Control socket not supported on this platform - skipping")
+            return
+        # Only the lock holder starts a server, so any existing socket file is left over
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self._sock.listen(4)
+        self._sock.settimeout(1.0)
+        self._thread = threading.Thread(target=self._serve, name="control-socket", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with conn:
+                try:
+                    conn.settimeout(5)
+                    command = conn.makefile("r", encoding="utf-8").readline().strip()
+                    reply = self.handler(command)
+                except Exception as e:
+                    reply = {"ok": False, "message": str(e)}
+                try:
+                    conn.sendall((json.dumps(reply) + "\n").encode("utf-8"))
+                except OSError:
+                    pass
+
+    def stop(self):
+        self._stopping.set()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def send_command(path, command, timeout=5):
+    """Send a command to a running daemon. Returns its reply, or None if unreachable."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall((command + "\n").encode("utf-8"))
+            return json.loads(sock.makefile("r", encoding="utf-8").readline() or "null")
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Fast-exit entry point for cron.
+Decides whether a sweep is due (day, hours, time since the last run, another
+watcher holding the lock) using only the standard library, and only then
+imports watcher.py with Playwright, BeautifulSoup and friends. Invocations
+with nothing to do finish in milliseconds.
+
+Usage:
+    python launcher.py [watcher.py arguments]
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def _load_env_file(path=".env"):
+    """Minimal .env reader (KEY=VALUE lines), overriding like watcher.py does."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        os.environ[key] = value.strip().strip("'\"")
+
+
+# Run by cron, .env has to be in the environment before instance.py (and the settings
+# below) read it. Imported by watcher.py, it already is: loading it then would change
+# the environment halfway through watcher's imports.
+if __name__ == "__main__":
+    _load_env_file()
+
+from instance import InstanceLock, send_command, LOCK_PATH, SOCKET_PATH
+
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# Flags that always hand over to watcher.py without checking the schedule
+PASS_THROUGH_FLAGS = ("--daemon", "--live", "--record", "--replay", "-h", "--help")
+
+# Days to sweep on (default: the weekend being watched)
+WATCH_DAYS = {d.strip().lower()[:3] for d in os.getenv("WATCH_DAYS", "fri,sat,sun").split(",") if d.strip()}
+# Optional hour range, e.g. "7-22" (inclusive start, exclusive end)
+WATCH_HOURS = os.getenv("WATCH_HOURS", "")
+# Skip runs that start less than this many seconds after the last completed one
+WATCH_MIN_INTERVAL = int(os.getenv("WATCH_MIN_INTERVAL", "0"))
+LAST_RUN_PATH = os.getenv("LAST_RUN_PATH", "last_run.json")
+
+
+def day_is_due(now=None):
+    """Is today one of WATCH_DAYS?"""
+    now = now or time.localtime()
+    return DAY_NAMES[now.tm_wday] in WATCH_DAYS
+
+
+def hour_is_due(now=None):
+    if not WATCH_HOURS:
+        return True
+    now = now or time.localtime()
+    start, _, end = WATCH_HOURS.partition("-")
+    return int(start) <= now.tm_hour < int(end or 24)
+
+
+def last_run():
+    """Timestamp of the last completed sweep, or None."""
+    try:
+        with open(LAST_RUN_PATH, encoding="utf-8") as f:
+            return json.load(f).get("finished")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def record_run(finished=None):
+    """Called by the watcher after a completed sweep."""
+    tmp_path = f"{LAST_RUN_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"finished": finished or time.time()}, f)
+    os.replace(tmp_path, LAST_RUN_PATH)
+
+
+def why_not_due(now=None):
+    """Reason to skip this invocation, or None if a sweep is due."""
+    now = now or time.localtime()
+    if not day_is_due(now):
+        return (f"Today is not a watch day ({', '.join(sorted(WATCH_DAYS, key=DAY_NAMES.index))}). Exiting.")
+    if not hour_is_due(now):
+        return f"Outside watch hours ({WATCH_HOURS}). Exiting."
+    previous = last_run()
+    if WATCH_MIN_INTERVAL and previous and time.time() - previous < WATCH_MIN_INTERVAL:
+        return (f"Last sweep finished {time.time() - previous:.0f}s ago "
+                f"(minimum interval {WATCH_MIN_INTERVAL}s). Exiting.")
+    return None
+
+
+def main():
+    args = sys.argv[1:]
+    if not any(arg.split("=", 1)[0] in PASS_THROUGH_FLAGS for arg in args):
+        reason = why_not_due()
+        if reason:
+            print(reason)
+            return
+
+        holder = InstanceLock(LOCK_PATH).holder()
+        if holder and holder.get("alive") and not holder.get("stale"):
+            if holder.get("mode") == "daemon":
+                reply = send_command(SOCKET_PATH, "sweep")
+                if reply and reply.get("ok"):
+                    print(f"Daemon (pid {holder.get('pid')}) is running - requested an immediate sweep")
+                    return
+            else:
+                print(f"Another watcher is already running (pid {holder.get('pid')}). Exiting.")
+                return
+
+    # Work is due: only now pay for the heavy imports
+    import watcher
+    watcher.main()
+
+
+if __name__ == "__main__":
+    main()
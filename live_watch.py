@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Live watching of open date pages.
+Keeps one page per (venue, date) open, lets a MutationObserver inside each page
+push the slot list back to Python (via expose_binding) whenever it changes,
+and refreshes the widget in place on a timer. A page whose in-app refresh
+produces no data request is reloaded instead, as is every page now and then to
+keep memory in check.
+"""
+
+import json
+import time
+
+from parsers import get_parser, venue_key, parse_court_availability, BOOKING_HOST
+from rate_limiter import host_of
+
+BINDING_NAME = "reportSlots"
+
+# Runs in every page load: report the slot list once rendered, then after each change (debounced)
+OBSERVER_SCRIPT = """
+(() => {
+    const SELECTOR = %(selector)s;
+    let timer = null;
+    function report() {
+        timer = null;
+        const nodes = SELECTOR ? document.querySelectorAll(SELECTOR) : [];
+        const html = nodes.length ? Array.from(nodes, node => node.outerHTML).join("\\n") : document.body.innerHTML;
+        window.%(binding)s(html);
+    }
+    function start() {
+        new MutationObserver(() => { if (!timer) timer = setTimeout(report, %(debounce_ms)d); })
+            .observe(document.body, {childList: true, subtree: true, characterData: true});
+        timer = setTimeout(report, %(debounce_ms)d);
+    }
+    if (document.body) start(); else document.addEventListener("DOMContentLoaded", start);
+})();
+"""
+
+# Ask the widget to refetch the way it does when the tab regains focus
+REFRESH_SCRIPT = """
+() => {
+    document.dispatchEvent(new Event("visibilitychange"));
+    window.dispatchEvent(new Event("focus"));
+}
+"""
+
+
+class PageWatch:
+    """One open by-time page and the last slot list it reported."""
+
+    def __init__(self, location, date_str, page):
+        self.location = location
+        self.date_str = date_str
+        self.page = page
+        self.url = f"{location['base_url']}/{date_str}/by-time"
+        self.signature = None
+        self.reports = 0
+        self.last_data_response = 0.0
+        self.refreshes = 0
+
+
+class LiveWatcher:
+    """
+    Watches (venue, date) pages in one browser context. `on_change(location, date_str, slots)`
+    is called with the full slot list whenever a page's availability changes.
+    """
+
+    def __init__(self, context, on_change, navigate, refresh_interval=60, reload_every=30, grace=5, want=None):
+        self.context = context
+        self.on_change = on_change
+        self.navigate = navigate  # navigate(page, url, **goto_options), rate limited
+        self.refresh_interval = refresh_interval
+        self.reload_every = reload_every
+        self.grace = grace
+        self.want = want  # want(location, date_str): skip pages nobody could want a slot from
+        self.watches = {}  # (venue name, date) -> PageWatch
+        self._by_page = {}
+        self._host = host_of(BOOKING_HOST)
+        context.expose_binding(BINDING_NAME, self._on_report)
+
+    def _on_report(self, source, html):
+        watch = self._by_page.get(source["page"])
+        if watch is None:
+            return
+        slots = parse_court_availability(html, watch.location, watch.date_str)
+        signature = sorted((slot.key, slot.spaces) for slot in slots)
+        watch.reports += 1
+        if signature != watch.signature:
+            watch.signature = signature
+            self.on_change(watch.location, watch.date_str, slots)
+
+    def _on_response(self, watch, response):
+        try:
+            if response.request.resource_type in ("xhr", "fetch") and host_of(response.url) == self._host:
+                watch.last_data_response = time.time()
+        except Exception:
+            pass
+
+    def open(self, location, date_str):
+        page = self.context.new_page()
+        watch = PageWatch(location, date_str, page)
+        extractor = get_parser(*venue_key(location["base_url"]))
+        page.add_init_script(OBSERVER_SCRIPT % {
+            "selector": json.dumps(extractor.container_selector if extractor else None),
+            "binding": BINDING_NAME,
+            "debounce_ms": 500,
+        })
+        page.on("response", lambda response: self._on_response(watch, response))
+        self._by_page[page] = watch
+        self.watches[(location["name"], date_str)] = watch
+        print(f"👁️ Watching {location['name']} {date_str} live")
+        self.navigate(page, watch.url, wait_until="domcontentloaded", timeout=30000)
+        return watch
+
+    def close(self, key):
+        watch = self.watches.pop(key, None)
+        if watch is None:
+            return
+        self._by_page.pop(watch.page, None)
+        try:
+            watch.page.close()
+        except Exception:
+            pass
+        print(f"👁️ Stopped watching {key[0]} {key[1]}")
+
+    def sync(self, locations, dates):
+        """Open pages for every (location, date) wanted and close the rest."""
+        wanted = {(location["name"], date_str): location for location in locations for date_str in dates
+                  if self.want is None or self.want(location, date_str)}
+        for key in [key for key in self.watches if key not in wanted]:
+            self.close(key)
+        for key, location in wanted.items():
+            if key not in self.watches:
+                try:
+                    self.open(location, key[1])
+                except Exception as e:
+                    print(f"Could not open {key[0]} {key[1]}: {e}")
+                    self.close(key)
+
+    def refresh(self):
+        """
+        Trigger an in-app refresh on every page, then reload the ones whose widget
+        didn't fetch anything (and every page once per `reload_every` refreshes).
+        """
+        triggered = time.time()
+        for watch in self.watches.values():
+            watch.refreshes += 1
+            try:
+                watch.page.evaluate(REFRESH_SCRIPT)
+            except Exception as e:
+                print(f"In-app refresh failed for {watch.url}: {e}")
+        self.pump(self.grace)
+        for watch in list(self.watches.values()):
+            stale = watch.last_data_response < triggered
+            if stale or watch.refreshes % self.reload_every == 0:
+                try:
+                    self.navigate(watch.page, watch.url, wait_until="domcontentloaded", timeout=30000)
+                except Exception as e:
+                    print(f"Reload failed for {watch.url}: {e}")
+
+    def idle(self):
+        """Wait out the rest of the refresh interval while changes keep arriving."""
+        self.pump(max(0, self.refresh_interval - self.grace))
+
+    def pump(self, seconds):
+        """Let page events (binding calls, responses) be delivered for `seconds`."""
+        page = next(iter(self.watches.values())).page if self.watches else None
+        if page is None:
+            time.sleep(seconds)
+        else:
+            page.wait_for_timeout(seconds * 1000)
+
+    def close_all(self):
+        for key in list(self.watches):
+            self.close(key)
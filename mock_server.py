@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Better booking pages, for benchmarking without touching the real site.
+Serves a home page with a cookie banner and login modal, and by-time pages whose
+slot cards are fetched over XHR and rendered lazily as the page is scrolled.
+The date links switch days client-side (pushState + refetch), and so does a
+popstate, like the real widget's router.
+Render/XHR delays, failures and slow responses are configurable.
+
+Usage:
+    python mock_server.py --port 8765 --render-delay-ms 1500 --xhr-delay-ms 400 --error-rate 0.05
+    BETTER_BASE_URL=http://127.0.0.1:8765 python watcher.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+DEFAULT_OPTIONS = {
+    "cookie_delay_ms": 500,    # Banner appears this long after load
+    "render_delay_ms": 1500,   # Client-side delay before the slot list is requested
+    "xhr_delay_ms": 400,       # Server-side delay of the slot list response
+    "lazy_batch": 6,           # Cards rendered per scroll step
+    "error_rate": 0.0,         # Share of by-time pages answered with a 500
+    "slow_rate": 0.0,          # Share of by-time pages answered slowly
+    "slow_ms": 20000,          # Extra delay for slow pages
+    "seed": 1,                 # Same seed, same slots
+}
+
+BY_TIME_RE = re.compile(r"^/location/([^/]+)/([^/]+)/(\d{4}-\d{2}-\d{2})/by-time$")
+TIMES_RE = re.compile(r"^/api/times/([^/]+)/([^/]+)/(\d{4}-\d{2}-\d{2})$")
+
+COOKIE_BANNER = """
+<div id="cookie-banner" style="display:none;position:fixed;bottom:0;width:100vw;background:#eee;padding:20px">
+  We use cookies. <button onclick="acceptCookies()">Accept All Cookies</button>
+</div>
+<script>
+  function acceptCookies() {
+    document.cookie = "cookies_accepted=1; path=/";
+    document.getElementById("cookie-banner").remove();
+  }
+  if (!document.cookie.includes("cookies_accepted=1")) {
+    setTimeout(() => { document.getElementById("cookie-banner").style.display = "block"; }, %(cookie_delay_ms)d);
+  }
+</script>
+"""
+
+HOME_PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>Better - Mock</title></head><body>
+<header id="account">
+  <button id="login-button" onclick="document.getElementById('login-modal').style.display='block'">Log in</button>
+</header>
+<div id="login-modal" class="ModalComponent__Wrapper-mock" style="display:none">
+  <form onsubmit="logIn(event)">
+    <input name="username" type="email">
+    <input name="password" type="password">
+    <button type="submit">Log in</button>
+  </form>
+</div>
+<h1>Mock Better bookings</h1>
+%(cookie_banner)s
+<script>
+  if (document.cookie.includes("session=")) {
+    document.getElementById("account").innerHTML = '<a href="/logout">Log out</a>';
+  }
+  async function logIn(event) {
+    event.preventDefault();
+    const form = event.target;
+    const response = await fetch("/api/auth/login", {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({username: form.username.value, password: form.password.value}),
+    });
+    if (response.ok) {
+      document.getElementById("login-modal").remove();
+      document.getElementById("account").innerHTML = '<a href="/logout">Log out</a>';
+    }
+  }
+</script>
+</body></html>"""
+
+BY_TIME_PAGE = """<!doctype html><html><head><meta charset="utf-8"><title>%(activity)s %(date)s - Mock</title>
+</head><body>
+<h1>%(activity)s – <span id="date">%(date)s</span></h1>
+<nav>%(date_links)s</nav>
+<div id="slots"><p>Loading…</p></div>
+%(cookie_banner)s
+<script>
+  let cards = [];
+  let shown = 0;
+  function renderMore() {
+    const list = document.getElementById("slots");
+    if (shown === 0) list.innerHTML = cards.length ? "" : "<p>No sessions available on this date</p>";
+    for (const card of cards.slice(shown, shown + %(lazy_batch)d)) {
+      const div = document.createElement("div");
+      div.className = "ClassCardComponent__Wrapper-mock";
+      div.style.height = "180px";
+      div.innerHTML =
+        '<span class="ClassCardComponent__ClassTime-mock">' + card.time + '</span> ' +
+        '<span class="ClassCardComponent__Price-mock">£' + card.price + '</span> ' +
+        '<div class="ContextualComponent__BookWrap-mock">' +
+        (card.spaces > 0 ? card.spaces + ' spaces available <a href="' + card.url + '">Book</a>' : 'Fully booked') +
+        '</div>';
+      list.appendChild(div);
+    }
+    shown = Math.min(cards.length, shown + %(lazy_batch)d);
+  }
+  window.addEventListener("scroll", () => {
+    if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) renderMore();
+  });
+  let currentDate = "%(date)s";
+  async function loadDate(date) {
+    currentDate = date;
+    cards = [];
+    shown = 0;
+    document.getElementById("date").textContent = date;
+    document.getElementById("slots").innerHTML = "<p>Loading…</p>";
+    const response = await fetch("/api/times/%(centre)s/%(activity)s/" + date);
+    const loaded = await response.json();
+    if (date !== currentDate) return;  // Superseded by a later switch
+    cards = loaded;
+    renderMore();
+  }
+  function dateFromPath() { return location.pathname.split("/")[4]; }
+  window.addEventListener("popstate", () => loadDate(dateFromPath()));
+  document.querySelectorAll("a.DateLink").forEach(link => link.addEventListener("click", event => {
+    event.preventDefault();
+    history.pushState({}, "", link.getAttribute("href"));
+    loadDate(dateFromPath());
+  }));
+  setTimeout(() => loadDate(currentDate), %(render_delay_ms)d);
+</script>
+</body></html>"""
+
+
+def date_links(centre, activity, date_str):
+    """Links to the surrounding days, as in the real widget's date strip."""
+    day = date.fromisoformat(date_str)
+    links = []
+    for offset in range(-1, 8):
+        other = (day + timedelta(days=offset)).isoformat()
+        links.append(f'<a class="DateLink" href="/location/{centre}/{activity}/{other}/by-time">{other}</a>')
+    return " ".join(links)
+
+
+def mock_slots(centre, activity, date_str, seed):
+    """Deterministic session list for one venue/date."""
+    rng = random.Random(f"{seed}/{centre}/{activity}/{date_str}")
+    slots = []
+    for hour in range(7, 22):
+        slots.append({
+            "time": f"{hour:02d}:00 - {hour + 1:02d}:00",
+            "price": "12.35" if hour < 17 else "15.60",
+            "spaces": rng.choice([0, 0, 0, 1, 2, 3]),
+            "url": f"/location/{centre}/{activity}/{date_str}/by-time/slot/{hour:02d}:00-{hour + 1:02d}:00",
+        })
+    return slots
+
+
+class MockBetterHandler(BaseHTTPRequestHandler):
+    options = DEFAULT_OPTIONS
+    stats = None  # {"pages", "errors", "slow"} shared with the server owner
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=()):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, key):
+        if self.stats is not None:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def do_GET(self):
+        options = self.options
+        path = urlparse(self.path).path
+        cookie_banner = COOKIE_BANNER % options
+
+        if path == "/":
+            self._send(200, HOME_PAGE % {"cookie_banner": cookie_banner})
+            return
+
+        match = BY_TIME_RE.match(path)
+        if match:
+            centre, activity, date_str = match.groups()
+            self._count("pages")
+            roll = random.random()
+            if roll < options["error_rate"]:
+                self._count("errors")
+                self._send(500, "<h1>Something went wrong</h1>")
+                return
+            if roll < options["error_rate"] + options["slow_rate"]:
+                self._count("slow")
+                time.sleep(options["slow_ms"] / 1000)
+            self._send(200, BY_TIME_PAGE % dict(options, centre=centre, activity=activity, date=date_str,
+                                                date_links=date_links(centre, activity, date_str),
+                                                cookie_banner=cookie_banner))
+            return
+
+        match = TIMES_RE.match(path)
+        if match:
+            self._count("xhr")
+            time.sleep(options["xhr_delay_ms"] / 1000)
+            body = json.dumps(mock_slots(*match.groups(), options["seed"]))
+            self._send(200, body, "application/json")
+            return
+
+        self.send_error(404)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/api/auth/login":
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", "0"))
+        self.rfile.read(length)
+        self._send(200, '{"ok": true}', "application/json", [("Set-Cookie", "session=mock; Path=/")])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, **options):
+    """
+    Serve the mock on a background thread. Returns the server; its base URL is
+    server.base_url and per-request counters are in server.stats.
+    """
+    unknown = set(options) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown mock options: {', '.join(sorted(unknown))}")
+    stats = {}
+    handler = type("BoundMockBetterHandler", (MockBetterHandler,),
+                   {"options": dict(DEFAULT_OPTIONS, **options), "stats": stats})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stats = stats
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="mock-better", daemon=True).start()
+    return server
+
+
+def add_mock_arguments(parser):
+    """Command-line flags for every mock option (shared with benchmark.py)."""
+    for name, default in DEFAULT_OPTIONS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, type=type(default), default=default,
+                            help=f"default: {default}")
+
+
+def mock_options(args):
+    return {name: getattr(args, name) for name in DEFAULT_OPTIONS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Better booking pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.host, args.port, **mock_options(args))
+    print(f"🧪 Mock Better site on {server.base_url}/")
+    print(f"   Point the watcher at it with: BETTER_BASE_URL={server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Telegram Bot API, for trying bot commands (see
+telegram_bot.py) without a real bot. Supports getUpdates long polling and
+sendMessage for any token. POST /send to play the user; GET /sent lists what
+the bot has sent.
+
+Usage:
+    python mock_telegram.py --port 8766
+    TELEGRAM_API_BASE=http://127.0.0.1:8766 python watcher.py --daemon --bot
+    curl -d '{"chat_id": "123", "text": "/now"}' http://127.0.0.1:8766/send
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+METHOD_RE = re.compile(r"^/bot[^/]+/(\w+)$")
+
+
+class MockTelegramHandler(BaseHTTPRequestHandler):
+    server_version = "MockTelegram"
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json_body(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/sent":
+            self._send(200, self.server.sent)
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        params = self._json_body()
+        if path == "/send":
+            update = self.server.say(params.get("chat_id", "1"), params.get("text", ""))
+            self._send(200, {"ok": True, "result": update})
+            return
+        match = METHOD_RE.match(path)
+        method = match.group(1) if match else None
+        if method == "getUpdates":
+            updates = self.server.updates_after(params.get("offset"), min(float(params.get("timeout") or 0), 50))
+            self._send(200, {"ok": True, "result": updates})
+        elif method == "sendMessage":
+            message = {"chat_id": str(params.get("chat_id")), "text": params.get("text", ""), "at": time.time()}
+            with self.server.changed:
+                self.server.sent.append(message)
+                self.server.changed.notify_all()
+            print(f"🤖 → {message['chat_id']}: {message['text'][:200]}")
+            self._send(200, {"ok": True, "result": message})
+        else:
+            self._send(404, {"ok": False, "description": f"Not Found: {method or path}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockTelegramServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, MockTelegramHandler)
+        self.updates = []
+        self.sent = []
+        self.changed = threading.Condition()
+        self._next_id = 1
+        self.base_url = f"http://{address[0]}:{self.server_address[1]}"
+
+    def say(self, chat_id, text):
+        """Queue a message from a user, as getUpdates will deliver it."""
+        with self.changed:
+            update = {"update_id": self._next_id,
+                      "message": {"chat": {"id": chat_id}, "text": text, "date": int(time.time())}}
+            self._next_id += 1
+            self.updates.append(update)
+            self.changed.notify_all()
+        return update
+
+    def updates_after(self, offset, timeout):
+        """Updates from `offset` on, waiting up to `timeout` seconds for one (long polling)."""
+        with self.changed:
+            if offset is not None:
+                self.updates = [update for update in self.updates if update["update_id"] >= offset]
+            self.changed.wait_for(lambda: self.updates, timeout=timeout)
+            return list(self.updates)
+
+    def wait_for_sent(self, count, timeout=10):
+        """Wait until the bot has sent `count` messages in total. Returns them."""
+        with self.changed:
+            self.changed.wait_for(lambda: len(self.sent) >= count, timeout=timeout)
+            return list(self.sent)
+
+
+def start_mock_telegram(host="127.0.0.1", port=0):
+    """Serve the stand-in on a background thread; its base URL is server.base_url."""
+    server = MockTelegramServer((host, port))
+    threading.Thread(target=server.serve_forever, name="mock-telegram", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    server = start_mock_telegram(args.host, args.port)
+    print(f"🧪 Mock Telegram API on {server.base_url}/")
+    print(f"   Point the watcher at it with: TELEGRAM_API_BASE={server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ echo ""
 
 # Check if cron job exists
 echo "📅 Cron Job Status:"
-if crontab -l 2>/dev/null | grep -q "watcher.py"; then
+if crontab -l 2>/dev/null | grep -qE "watcher.py|launcher.py"; then
     echo "   ✅ Cron job is installed and active"
     echo "   ⏰ Runs every 30 minutes"
 else
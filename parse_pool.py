@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Page parsing off the browser thread.
+Each page's HTML snapshot goes to a small process pool while the browser moves
+on to the next page, so a sweep takes as long as the slower of navigating and
+parsing rather than both added up. At most PARSE_QUEUE_SIZE snapshots are
+queued or being parsed at once; beyond that, submitting blocks, so navigation
+slows to the parsers' pace instead of piling up HTML in memory.
+"""
+
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from concurrent.futures.process import BrokenProcessPool
+
+from parsers import parse_snapshot, SELF_CHECK_FAILURES
+
+# Parser processes (0 parses inline on the browser thread, as before)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(2, os.cpu_count() or 1))))
+# Snapshots queued or being parsed before navigation has to wait
+PARSE_QUEUE_SIZE = int(os.getenv("PARSE_QUEUE_SIZE", "4"))
+
+
+@contextmanager
+def _spawn_from_here():
+    """
+    Spawned workers re-run the parent's __main__ before anything else. Under
+    `python watcher.py` that is all of watcher's setup (Playwright import, .env,
+    accounts, subscriptions, state files) in every worker, so while workers start,
+    __main__ names this module instead, which imports nothing but parsers.py.
+    """
+    main = sys.modules["__main__"]
+    saved = getattr(main, "__spec__", None)
+    main.__spec__ = __spec__
+    try:
+        yield
+    finally:
+        main.__spec__ = saved
+
+
+class ParsePool:
+    """Bounded queue of page snapshots in front of a process pool."""
+
+    def __init__(self, workers=PARSE_WORKERS, max_pending=PARSE_QUEUE_SIZE):
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self.submitted = 0
+        self.stalls = 0  # Times navigation waited for the parsers to catch up
+
+    def _pool(self):
+        if self._executor is None:
+            # Spawned, not forked: forking a process running Playwright's threads isn't safe
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, html, location, date_str):
+        """
+        Queue one snapshot for parsing; returns a Future for result().
+        Blocks while PARSE_QUEUE_SIZE snapshots are already waiting.
+        """
+        self.submitted += 1
+        if self.workers <= 0:
+            future = Future()
+            future.set_result(parse_snapshot(html, location, date_str))
+            return future
+        if not self._pending.acquire(blocking=False):
+            self.stalls += 1
+            self._pending.acquire()
+        try:
+            with _spawn_from_here():  # Workers start on demand inside submit()
+                future = self._pool().submit(parse_snapshot, html, location, date_str)
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def result(self, future):
+        """Slots of a submitted snapshot, with its parser self-check applied to SELF_CHECK_FAILURES."""
+        try:
+            slots, self_check = future.result()
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory): start a fresh pool for the next pages
+            self.close()
+            raise
+        for venue, reason in self_check.items():
+            if reason:
+                SELF_CHECK_FAILURES[venue] = reason
+            else:
+                SELF_CHECK_FAILURES.pop(venue, None)
+        return slots
+
+    def report(self):
+        return {"workers": self.workers, "submitted": self.submitted, "stalls": self.stalls}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Slot parser registry for Better booking pages.
+Each venue/activity can register a selector-based extractor; the generic
+heuristic is only used for layouts nobody has registered yet.
+"""
+
+import os
+import re
+from urllib.parse import urlparse
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+from slots import Slot, SlotIndex
+
+# Point at a local mock (see mock_server.py) to test without touching the real site
+BOOKING_HOST = os.getenv("BETTER_BASE_URL", "https://bookings.better.org.uk").rstrip("/")
+
+TIME_RE = re.compile(r'(\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2})')
+BOUNDED_TIME_RE = re.compile(r'\b(\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2})\b')
+PRICE_RE = re.compile(r'£\s*(\d+\.?\d*)')
+SPACES_RE = re.compile(r'(\d+)\s+spaces?\s+available', re.IGNORECASE)
+BOOK_RE = re.compile(r'Book', re.IGNORECASE)
+
+# Fallback patterns for the text-node scan (original method)
+AVAILABILITY_PATTERNS = [
+    re.compile(r"(\d+)\s+spaces?\s+available", re.IGNORECASE),  # "1 space available", "3 spaces available"
+    re.compile(r"(\d+)\s+courts?\s+available", re.IGNORECASE),  # "1 court available", "2 courts available"
+    re.compile(r"available\s*:\s*(\d+)", re.IGNORECASE),        # "available: 2"
+    re.compile(r"(\d+)\s+remaining", re.IGNORECASE),            # "2 remaining"
+    re.compile(r"(\d+)\s+spaces?\s+left", re.IGNORECASE),       # "1 space left"
+    re.compile(r"Book\s*.*?(\d+)\s+spaces?", re.IGNORECASE),    # Near "Book" button with spaces
+]
+
+
+def absolute_booking_url(href: str) -> str:
+    """Turn a relative booking link into an absolute one."""
+    return href if href.startswith('http') else f"{BOOKING_HOST}{href}"
+
+
+def venue_key(base_url: str):
+    """
+    Derive the (centre, activity) registry key from a location URL, e.g.
+    .../location/islington-tennis-centre/highbury-tennis -> ("islington-tennis-centre", "highbury-tennis")
+    """
+    parts = [p for p in urlparse(base_url).path.split('/') if p]
+    if len(parts) >= 3 and parts[0] == 'location':
+        return parts[1], parts[2]
+    return None, None
+
+
+class SelectorExtractor:
+    """
+    Extracts slots from a known page layout using pre-compiled CSS selectors.
+    `container` selects one element per slot; the optional field selectors
+    narrow where time/spaces/price are read from inside that container.
+    """
+
+    def __init__(self, name, container, time=None, spaces=None, price=None, book_link=None):
+        self.name = name
+        self.container_selector = container
+        self.container = soupsieve.compile(container)
+        self.time = soupsieve.compile(time) if time else None
+        self.spaces = soupsieve.compile(spaces) if spaces else None
+        self.price = soupsieve.compile(price) if price else None
+        self.book_link = soupsieve.compile(book_link) if book_link else None
+
+    def _field_text(self, container, selector, container_text):
+        if selector is None:
+            return container_text
+        element = selector.select_one(container)
+        return element.get_text(" ", strip=True) if element else ""
+
+    def extract(self, soup, venue="", date_str=""):
+        """Return (slots, containers_matched) for the given soup."""
+        containers = self.container.select(soup)
+        index = SlotIndex()
+        slots = []
+        for container in containers:
+            container_text = container.get_text(" ", strip=True)
+
+            time_match = TIME_RE.search(self._field_text(container, self.time, container_text))
+            spaces_match = SPACES_RE.search(self._field_text(container, self.spaces, container_text))
+            if not (time_match and spaces_match):
+                continue
+
+            spaces = int(spaces_match.group(1))
+            if spaces <= 0:
+                continue
+
+            price_match = PRICE_RE.search(self._field_text(container, self.price, container_text))
+
+            book_url = ""
+            if self.book_link is not None:
+                link = self.book_link.select_one(container)
+                if link is not None and link.get('href'):
+                    book_url = absolute_booking_url(link['href'])
+
+            slot = Slot.create(
+                venue, date_str, time_match.group(1), spaces,
+                price=f"£{price_match.group(1)}" if price_match else "",
+                book_url=book_url,
+                raw_text=container_text
+            )
+            if index.add(slot):
+                slots.append(slot)
+        return slots, len(containers)
+
+
+# Registry of extractors keyed by (centre, activity); centre=None matches any centre
+_PARSERS = {}
+
+# Venues whose registered extractor failed its last self-check: venue -> reason
+SELF_CHECK_FAILURES = {}
+
+
+def register_parser(centre, activity, extractor):
+    """Register an extractor for a centre/activity pair (centre=None for all centres)."""
+    _PARSERS[(centre, activity)] = extractor
+
+
+def get_parser(centre, activity):
+    """Find the registered extractor for a centre/activity, if any."""
+    return _PARSERS.get((centre, activity)) or _PARSERS.get((None, activity))
+
+
+# Better "by-time" listing: one card per session with time, spaces, price and a Book link
+BETTER_BY_TIME = SelectorExtractor(
+    name="better-by-time",
+    container='div[class*="ClassCardComponent__Wrapper"], div[class*="ClassCard__Wrapper"]',
+    time='[class*="ClassCardComponent__ClassTime"], [class*="ClassCard__Time"]',
+    spaces='[class*="ContextualComponent__BookWrap"], [class*="SpacesAvailable"]',
+    price='[class*="ClassCardComponent__Price"], [class*="ClassCard__Price"]',
+    book_link='a[href*="/slot/"], a:-soup-contains("Book")'
+)
+
+register_parser("islington-tennis-centre", "highbury-tennis", BETTER_BY_TIME)
+register_parser("islington-tennis-centre", "rosemary-gardens-tennis", BETTER_BY_TIME)
+
+
+def ready_selector(base_url):
+    """Selector that shows a location's slot list has rendered (for waiting in the browser)."""
+    extractor = get_parser(*venue_key(base_url))
+    return extractor.container_selector if extractor else "text=/spaces? available/i"
+
+
+def parse_generic(soup, venue="", date_str=""):
+    """
+    Heuristic parser for unknown layouts.
+    Walks up from "Book" buttons, then falls back to scanning every text node.
+    """
+    available_slots = []
+    index = SlotIndex()  # Same court and time seen via several containers counts once
+
+    # Method 1: Look for "Book" buttons (most reliable indicator)
+    for button in soup.find_all(['button', 'a'], string=BOOK_RE):
+        # Find the container that holds this booking slot
+        container = button.parent
+        for _ in range(8):  # Walk up the DOM tree
+            if container and container.name:
+                container_text = container.get_text()
+
+                time_match = TIME_RE.search(container_text)
+                spaces_match = SPACES_RE.search(container_text)
+
+                if time_match and spaces_match:
+                    spaces = int(spaces_match.group(1))
+                    if spaces > 0:
+                        price_match = PRICE_RE.search(container_text)
+                        book_url = ""
+                        if button.name == 'a' and button.get('href'):
+                            book_url = absolute_booking_url(button['href'])
+
+                        slot = Slot.create(
+                            venue, date_str, time_match.group(1), spaces,
+                            price=f"£{price_match.group(1)}" if price_match else "",
+                            book_url=book_url,
+                            raw_text=container_text
+                        )
+                        if index.add(slot):
+                            available_slots.append(slot)
+                        break
+            container = container.parent if container else None
+
+    if available_slots:
+        return available_slots
+
+    # Method 2: Fallback - Look for text patterns (original method)
+    for text_node in soup.find_all(string=True):
+        text = text_node.strip()
+        if not text:
+            continue
+
+        for pattern in AVAILABILITY_PATTERNS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            spaces = int(match.group(1))
+            if spaces <= 0:
+                continue
+
+            # Walk up the DOM to find a larger container with time/price info
+            container = text_node.parent
+            for _ in range(5):
+                if container and container.name:
+                    container_text = container.get_text()
+                    time_match = BOUNDED_TIME_RE.search(container_text)
+
+                    if time_match:  # Only add if we found time information
+                        time_text = time_match.group(1)
+                        price_match = PRICE_RE.search(container_text)
+
+                        # Look for booking links
+                        book_url = ""
+                        for link in container.find_all('a', href=True):
+                            if '/slot/' in link['href'] or 'book' in link.get_text().lower():
+                                book_url = absolute_booking_url(link['href'])
+                                break
+
+                        slot = Slot.create(
+                            venue, date_str, time_text, spaces,
+                            price=f"£{price_match.group(1)}" if price_match else "",
+                            book_url=book_url,
+                            raw_text=container_text
+                        )
+                        if index.add(slot):
+                            available_slots.append(slot)
+                        break
+
+                container = container.parent if container else None
+
+    return available_slots
+
+
+def _self_check(extractor, soup, slots, containers_matched, venue=""):
+    """
+    Flag a venue's registered extractor that looks like it has stopped matching
+    the page. Returns True if the extractor's result can be trusted.
+    """
+    if containers_matched and slots:
+        SELF_CHECK_FAILURES.pop(venue, None)
+        return True
+
+    # Zero slots is a legitimate result for a fully booked or closed day (with or
+    # without session cards), but only if the page doesn't show signs of bookable
+    # sessions the extractor failed to see.
+    page_text = soup.get_text(" ")
+    looks_bookable = bool(SPACES_RE.search(page_text)) and bool(TIME_RE.search(page_text))
+    if not looks_bookable:
+        SELF_CHECK_FAILURES.pop(venue, None)
+        return True
+
+    reason = (f"'{extractor.name}' matched no slot containers on a bookable page" if not containers_matched
+              else f"'{extractor.name}' matched containers but extracted no slots from a bookable page")
+    SELF_CHECK_FAILURES[venue] = reason
+    print(f"⚠️ Parser self-check failed for {venue or 'this page'}: {reason} - falling back to generic parser")
+    return False
+
+
+def parse_court_availability(html: str, location=None, date_str=""):
+    """
+    Parse the Better booking page HTML to find available court slots.
+    Uses the extractor registered for the location's venue/activity when there
+    is one, otherwise (or if it fails its self-check) the generic heuristic.
+    Returns list of available Slot objects for the location and date.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    venue = location["name"] if location else ""
+
+    extractor = get_parser(*venue_key(location["base_url"])) if location else None
+    if extractor is not None:
+        slots, containers_matched = extractor.extract(soup, venue, date_str)
+        if _self_check(extractor, soup, slots, containers_matched, venue):
+            return slots
+
+    return parse_generic(soup, venue, date_str)
+
+
+def parse_snapshot(html, location=None, date_str=""):
+    """
+    Worker entry point for parse_pool.py. Returns (slots, self_check), where
+    self_check is {venue: failure reason or None} for the parent process to
+    apply to its own SELF_CHECK_FAILURES.
+    """
+    slots = parse_court_availability(html, location, date_str)
+    extractor = get_parser(*venue_key(location["base_url"])) if location else None
+    if extractor is None:
+        return slots, {}
+    return slots, {location["name"]: SELF_CHECK_FAILURES.get(location["name"])}
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling of a run or of the parse stage alone.
+`watcher.py --profile cpu|mem` wraps the run in cProfile or tracemalloc and
+writes the raw profile plus a top-N summary to PROFILE_DIR, one pair of files
+per run. The CPU summary also splits out the usual suspects: waiting on the
+browser, page.content(), BeautifulSoup tree building and the regex walks.
+
+Usage:
+    python profiling.py parse page.html [--venue NAME] [--date YYYY-MM-DD] [--repeat 20] [--mode cpu|mem]
+    python -m pstats profiles/<file>.prof      # dig into a CPU profile interactively
+
+Saved debug pages can be exported with `python artifacts.py show ID -o page.html`.
+"""
+
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+import tracemalloc
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "25"))
+# Frames kept per allocation in memory profiles
+PROFILE_MEM_FRAMES = int(os.getenv("PROFILE_MEM_FRAMES", "10"))
+
+MODES = ("cpu", "mem")
+
+# Stage -> (file suffix, function name); time is cumulative (includes callees)
+CUMULATIVE_STAGES = [
+    ("page.content()", ("sync_api/_generated.py", "content")),
+    ("BeautifulSoup tree building", ("bs4/__init__.py", "__init__")),
+    ("parse_court_availability()", ("parsers.py", "parse_court_availability")),
+]
+
+
+def stage_times(stats):
+    """[(stage, seconds)] for the hot paths this project cares about, from a pstats.Stats."""
+    times = {stage: 0.0 for stage, _ in CUMULATIVE_STAGES}
+    browser_wait = regex = 0.0
+    for (filename, _, function), (_, _, own, cumulative, _) in stats.stats.items():
+        filename = filename.replace(os.sep, "/")
+        for stage, (suffix, name) in CUMULATIVE_STAGES:
+            if function == name and filename.endswith(suffix):
+                times[stage] += cumulative
+        if "greenlet" in function and "switch" in function:
+            browser_wait += own  # The sync API parks here while the browser does the work
+        elif "re.Pattern" in function:
+            regex += own
+    return ([("Waiting on the browser (Playwright round-trips)", browser_wait)]
+            + list(times.items()) + [("Regex matching", regex)])
+
+
+class Profiler:
+    """
+    Context manager profiling its body. `mode` is "cpu" (cProfile) or "mem"
+    (tracemalloc); files are named <timestamp>_<label>_<mode>.* in `directory`.
+    """
+
+    def __init__(self, mode, label="run", directory=PROFILE_DIR, top=PROFILE_TOP):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.directory = directory
+        self.top = top
+        safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_")
+        self.base_path = os.path.join(directory, f"{time.strftime('%Y%m%d_%H%M%S')}_{safe_label}_{mode}")
+        self._profile = None
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        if self.mode == "cpu":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            tracemalloc.start(PROFILE_MEM_FRAMES)
+        return self
+
+    def __exit__(self, *exc_info):
+        # Also on sys.exit(): runs end that way, and that's exactly when the profile is wanted
+        elapsed = time.perf_counter() - self._started
+        os.makedirs(self.directory, exist_ok=True)
+        if self.mode == "cpu":
+            self._profile.disable()
+            summary = self._cpu_summary(elapsed)
+        else:
+            summary = self._mem_summary(elapsed)
+        with open(f"{self.base_path}.txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+        print(summary)
+        print(f"📈 Profile written to {self.base_path}.{'prof' if self.mode == 'cpu' else 'snapshot'} "
+              f"(summary: {self.base_path}.txt)")
+        return False
+
+    def _cpu_summary(self, elapsed):
+        self._profile.dump_stats(f"{self.base_path}.prof")
+        stats = pstats.Stats(self._profile)
+        lines = [f"CPU profile: {elapsed:.2f}s wall", "", "Hot paths:"]
+        for stage, seconds in stage_times(stats):
+            lines.append(f"  {stage:<50} {seconds:8.3f}s")
+        for sort_key, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).strip_dirs().sort_stats(sort_key).print_stats(self.top)
+            table = out.getvalue()
+            lines += ["", f"Top {self.top} by {title}:", table[table.find("   ncalls"):].rstrip()]
+        return "\n".join(lines) + "\n"
+
+    def _mem_summary(self, elapsed):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        snapshot.dump(f"{self.base_path}.snapshot")
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        lines = [f"Memory profile: {elapsed:.2f}s wall, peak {peak / 1024 / 1024:.1f} MB traced, "
+                 f"{current / 1024 / 1024:.1f} MB still allocated at the end", "",
+                 f"Top {self.top} allocation sites still held:"]
+        for stat in snapshot.statistics("lineno")[:self.top]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+
+def profile_parse(html_path, venue=None, date_str="", repeat=20, mode="cpu"):
+    """Profile parse_court_availability() on a saved page, `repeat` times over."""
+    from watcher import TENNIS_LOCATIONS  # For the venue's base URL, which picks its registered parser
+    from parsers import parse_court_availability
+
+    location = next((l for l in TENNIS_LOCATIONS if not venue or venue.lower() in l["name"].lower()), None)
+    if location is None:
+        raise SystemExit(f"No venue matching '{venue}'")
+    with open(html_path, encoding="utf-8") as f:
+        html = f.read()
+    print(f"⏱️ Parsing {html_path} ({len(html) / 1024:.0f} KiB) as {location['name']}, {repeat}x")
+    label = f"parse_{os.path.splitext(os.path.basename(html_path))[0]}"
+    with Profiler(mode, label=label):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            slots = parse_court_availability(html, location, date_str)
+        print(f"{len(slots)} slot(s), {(time.perf_counter() - started) / repeat * 1000:.1f} ms per parse")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the parse stage against a saved page")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    parse = subcommands.add_parser("parse", help="Profile parsing of a saved HTML file")
+    parse.add_argument("html")
+    parse.add_argument("--venue", help="Venue name (or part of it); default: the first watched venue")
+    parse.add_argument("--date", default="", help="Date to stamp on parsed slots")
+    parse.add_argument("--repeat", type=int, default=20)
+    parse.add_argument("--mode", choices=MODES, default="cpu")
+    args = parser.parse_args()
+    profile_parse(args.html, args.venue, args.date, args.repeat, args.mode)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Per-host politeness throttle.
+A token bucket per host (burst + sustained rate) kept in a small state file, so
+every page, daemon and cron run on the box shares one budget. With several
+accounts (see accounts.py) each account also has its own bucket per host on top
+of it: a request needs a token from both, so more accounts never means more
+requests from this box. 429 responses (and 403s on page loads) halve the host's
+rate and pause it; each successful request earns a little of the rate back, up
+to the configured maximum.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows: the budget is only shared within this process
+    fcntl = None
+
+RATE_LIMIT_STATE = os.getenv("RATE_LIMIT_STATE", "rate_limit.json")
+# Sustained requests per minute per host, and how many may go out back to back
+RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "20"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "5"))
+# Each account's own share of that, when scanning with several accounts
+RATE_LIMIT_ACCOUNT_PER_MINUTE = float(os.getenv("RATE_LIMIT_ACCOUNT_PER_MINUTE", str(RATE_LIMIT_PER_MINUTE)))
+RATE_LIMIT_ACCOUNT_BURST = float(os.getenv("RATE_LIMIT_ACCOUNT_BURST", str(RATE_LIMIT_BURST)))
+# Never slow down below this after repeated 429/403s
+RATE_LIMIT_MIN_PER_MINUTE = float(os.getenv("RATE_LIMIT_MIN_PER_MINUTE", "2"))
+# Pause after a 429/403 without a Retry-After header
+RATE_LIMIT_PENALTY_SECONDS = int(os.getenv("RATE_LIMIT_PENALTY_SECONDS", "60"))
+
+
+def host_of(url):
+    return urlparse(url).netloc.lower()
+
+
+class RateLimiter:
+    """Token buckets per host, shared across processes through a locked JSON file."""
+
+    def __init__(self, state_path=RATE_LIMIT_STATE, per_minute=RATE_LIMIT_PER_MINUTE, burst=RATE_LIMIT_BURST,
+                 min_per_minute=RATE_LIMIT_MIN_PER_MINUTE, penalty_seconds=RATE_LIMIT_PENALTY_SECONDS):
+        self.state_path = state_path
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.min_rate = min_per_minute / 60
+        self.penalty_seconds = penalty_seconds
+        self._thread_lock = threading.Lock()
+        self.hosts = set()  # Hosts this process has navigated to
+        self.account = None
+        self.account_rate = self.rate
+        self.account_burst = self.burst
+
+    def for_account(self, account, per_minute=RATE_LIMIT_ACCOUNT_PER_MINUTE, burst=RATE_LIMIT_ACCOUNT_BURST):
+        """A limiter sharing this one's host-wide budget that also holds `account` to its own."""
+        limiter = copy.copy(self)
+        limiter.account = account
+        limiter.account_rate = per_minute / 60
+        limiter.account_burst = burst
+        limiter.hosts = set()
+        return limiter
+
+    def _buckets(self, state, host, now):
+        """The host-wide bucket, plus this limiter's account bucket if it has one."""
+        buckets = [self._bucket(state, host, now, self.rate, self.burst)]
+        if self.account:
+            buckets.append(self._bucket(state, f"{host} [{self.account}]", now,
+                                        self.account_rate, self.account_burst))
+        return buckets
+
+    @contextmanager
+    def _state(self):
+        """Locked read-modify-write of the shared state."""
+        with self._thread_lock:
+            with open(self.state_path, "a+", encoding="utf-8") as f:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read() or "{}")
+                    except ValueError:
+                        state = {}
+                    yield state
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps(state))
+                    f.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _bucket(self, state, key, now, rate, burst):
+        bucket = state.setdefault(key, {"tokens": burst, "updated": now, "rate": rate, "blocked_until": 0})
+        # Settings may have changed since the bucket was created
+        bucket["rate"] = max(self.min_rate, min(bucket["rate"], rate))
+        bucket["max_rate"] = rate
+        elapsed = max(0.0, now - bucket["updated"])
+        bucket["tokens"] = min(burst, bucket["tokens"] + elapsed * bucket["rate"])
+        bucket["updated"] = now
+        return bucket
+
+    @staticmethod
+    def _delay(bucket, now):
+        if now < bucket["blocked_until"]:
+            return bucket["blocked_until"] - now
+        if bucket["tokens"] >= 1:
+            return 0.0
+        return (1 - bucket["tokens"]) / bucket["rate"]
+
+    def acquire(self, host):
+        """Block until a request to `host` is allowed. Returns the seconds waited."""
+        self.hosts.add(host)
+        label = f"{host} [{self.account}]" if self.account else host
+        waited = 0.0
+        while True:
+            now = time.time()
+            with self._state() as state:
+                buckets = self._buckets(state, host, now)
+                delay = max(self._delay(bucket, now) for bucket in buckets)
+                if delay <= 0:
+                    for bucket in buckets:
+                        bucket["tokens"] -= 1
+                    return waited
+            if waited == 0:
+                print(f"🐢 Throttling {label}: waiting {delay:.1f}s")
+            time.sleep(delay)
+            waited += delay
+
+    def penalise(self, host, status, retry_after=None):
+        """Multiplicative decrease after a 429/403: halve the rate and pause the host."""
+        pause = retry_after if retry_after is not None else self.penalty_seconds
+        with self._state() as state:
+            # The host-wide bucket too: the site throttles this box, whichever account asked
+            buckets = self._buckets(state, host, time.time())
+            for bucket in buckets:
+                bucket["rate"] = max(self.min_rate, bucket["rate"] / 2)
+                bucket["tokens"] = 0
+                bucket["blocked_until"] = max(bucket["blocked_until"], time.time() + pause)
+            rate = buckets[0]["rate"]
+        print(f"🚦 {host} answered {status}: pausing {pause:.0f}s, slowing to {rate * 60:.1f} requests/min")
+
+    def reward(self, host):
+        """Additive increase after a successful request, up to the configured rate."""
+        with self._state() as state:
+            for bucket in self._buckets(state, host, time.time()):
+                if bucket["rate"] < bucket["max_rate"]:
+                    bucket["rate"] = min(bucket["max_rate"], bucket["rate"] + bucket["max_rate"] / 20)
+
+    def observe(self, url, status, headers=None, navigation=True):
+        """Adjust the host's rate from a response. 403s only count for page loads."""
+        host = host_of(url)
+        if status == 429 or (status == 403 and navigation):
+            self.penalise(host, status, _retry_after(headers or {}))
+            return True
+        if status < 400:
+            self.reward(host)
+        return False
+
+    def watch(self, context):
+        """Penalise hosts whose in-page API calls (XHR/fetch) come back 429; page loads go through navigate()."""
+        def on_response(response):
+            try:
+                if (response.status == 429 and host_of(response.url) in self.hosts
+                        and response.request.resource_type != "document"):
+                    self.observe(response.url, response.status, response.headers, navigation=False)
+            except Exception:
+                pass  # Never let bookkeeping break a page
+
+        context.on("response", on_response)
+
+
+def _retry_after(headers):
+    value = {k.lower(): v for k, v in headers.items()}.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form: use the default pause
+
+
+def navigate(page, url, limiter, **kwargs):
+    """`page.goto` that waits for the host's budget and reports throttling responses."""
+    host = host_of(url)
+    limiter.acquire(host)
+    response = page.goto(url, **kwargs)
+    if response is not None and limiter.observe(url, response.status, response.headers):
+        raise RuntimeError(f"{host} is throttling us (HTTP {response.status})")
+    return response
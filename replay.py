@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Record/replay of full watcher runs.
+`watcher.py --record DIR` runs against the live site while saving a HAR of
+every browser context (login and every date page) plus a manifest of the dates
+and locations checked. `watcher.py --replay DIR` serves every request from
+those HARs (anything not recorded is aborted), pins the same dates and
+locations, and writes notifications to DIR instead of sending them, so the
+whole pipeline runs offline and deterministically.
+"""
+
+import json
+import os
+import time
+
+MANIFEST = "manifest.json"
+NOTIFICATIONS = "notifications.jsonl"
+
+# Watcher state kept inside the recording instead of the real files, reset before every run
+RUN_STATE_FILES = ("browser_state.json", "slot_index.json", "circuit_state.json",
+                   "wait_timings.json", "wait_timings_history.jsonl", "rate_limit.json")
+
+
+class Recording:
+    """A recorded run on disk: manifest.json, har-N.zip files and captured notifications."""
+
+    def __init__(self, directory, mode):
+        self.directory = directory
+        self.mode = mode  # "record" or "replay"
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.notifications_path = os.path.join(directory, NOTIFICATIONS)
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+            self.manifest = {"recorded_at": time.strftime("%Y-%m-%d %H:%M:%S"), "hars": []}
+        else:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        # Every run starts logged out with nothing seen before, so record and replay
+        # go through the same requests and produce the same notifications
+        for path in (self.notifications_path, *(self.path(name) for name in RUN_STATE_FILES)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def path(self, name):
+        """Where this run keeps one of the RUN_STATE_FILES."""
+        return os.path.join(self.directory, name)
+
+    def pinned_dates(self):
+        """Dates a replay must ask for (None while recording)."""
+        return list(self.manifest["dates"]) if self.mode == "replay" else None
+
+    # -- recording -----------------------------------------------------------
+
+    def pin(self, dates, locations):
+        """Store what this run checks so a replay asks for exactly the same pages."""
+        self.manifest["dates"] = list(dates)
+        self.manifest["locations"] = [dict(location) for location in locations]
+        self._save_manifest()
+
+    def _save_manifest(self):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def context_options(self):
+        """Extra new_context() options: a fresh HAR per context while recording."""
+        if self.mode != "record":
+            return {}
+        name = f"har-{len(self.manifest['hars'])}.zip"
+        self.manifest["hars"].append(name)
+        self._save_manifest()
+        return {"record_har_path": os.path.join(self.directory, name), "record_har_mode": "full"}
+
+    # -- replaying -----------------------------------------------------------
+
+    def setup_context(self, context):
+        """Route every request of a new context to the recorded responses."""
+        if self.mode != "replay":
+            return
+        # Later routes take precedence, so this catch-all only sees requests no HAR answered
+        context.route("**/*", lambda route: route.abort("internetdisconnected"))
+        for name in self.manifest["hars"]:
+            context.route_from_har(os.path.join(self.directory, name), not_found="fallback")
+
+    # -- notifications -------------------------------------------------------
+
+    def record_notification(self, channel, **fields):
+        """Capture a notification instead of sending it."""
+        entry = dict(fields, channel=channel)
+        with open(self.notifications_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        print(f"📥 {channel} notification captured to {self.notifications_path}")
@@ -7,7 +7,7 @@ echo "🎾 Setting up Tennis Court Monitor to run every 30 minutes..."
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 # Create the cron job entry - runs every 30 minutes on Friday, Saturday, Sunday only
-CRON_JOB="*/30 * * * 5,6,0 cd $SCRIPT_DIR && /bin/bash -c 'source venv/bin/activate && python watcher.py' >> $SCRIPT_DIR/monitor.log 2>&1"
+CRON_JOB="*/30 * * * 5,6,0 cd $SCRIPT_DIR && /bin/bash -c 'source venv/bin/activate && python launcher.py' >> $SCRIPT_DIR/monitor.log 2>&1"
 
 # Add to crontab
 echo "Adding cron job..."
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Compact slot model and dedup index.
+A Slot is immutable and identified by (venue, date, start, end, court), so the
+same court/time is recognised across pages, sweeps and runs.
+"""
+
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+
+# Keep only a short excerpt of the container text (0 drops it entirely)
+RAW_TEXT_LIMIT = int(os.getenv("SLOT_RAW_TEXT_LIMIT", "120"))
+
+# "Court 3" / "court B", but not "2 courts", "Outdoor Courts" or "Tennis Court Hire"
+COURT_RE = re.compile(r'\b(?i:court)\s+(\d+|[A-Z])\b')
+
+
+def _intern(value):
+    return sys.intern(value) if value else ""
+
+
+@dataclass(frozen=True)
+class Slot:
+    """One bookable session as seen on a booking page."""
+    __slots__ = ('venue', 'date', 'start', 'end', 'court', 'spaces', 'price', 'book_url', 'raw_text')
+
+    venue: str
+    date: str
+    start: str
+    end: str
+    court: str
+    spaces: int
+    price: str
+    book_url: str
+    raw_text: str
+
+    @classmethod
+    def create(cls, venue, date, time_text, spaces, price="", book_url="", raw_text="", court=None):
+        """
+        Build a slot from parsed page text. Repeated strings (venue, date, times,
+        court, price) are interned so thousands of stored slots share them.
+        """
+        start, _, end = time_text.partition('-')
+        if court is None:
+            court_match = COURT_RE.search(raw_text)
+            court = court_match.group(1) if court_match else ""
+        raw_text = " ".join(raw_text.split())
+        raw_text = raw_text[:RAW_TEXT_LIMIT] if RAW_TEXT_LIMIT > 0 else ""
+        return cls(
+            venue=_intern(venue),
+            date=_intern(date),
+            start=_intern(start.strip()),
+            end=_intern(end.strip()),
+            court=_intern(court),
+            spaces=spaces,
+            price=_intern(price),
+            book_url=book_url,
+            raw_text=raw_text
+        )
+
+    def __reduce__(self):
+        # Frozen with __slots__, so pickle (e.g. back from a parse_pool.py worker) can't set
+        # the fields itself; rebuild through __init__, re-interning the repeated strings
+        return _restore_slot, (self.venue, self.date, self.start, self.end, self.court, self.spaces,
+                               self.price, self.book_url, self.raw_text)
+
+    @property
+    def key(self):
+        """Stable identity, independent of how many spaces are left."""
+        return (self.venue, self.date, self.start, self.end, self.court)
+
+    @property
+    def time(self):
+        return f"{self.start} - {self.end}"
+
+
+def _restore_slot(venue, date, start, end, court, spaces, price, book_url, raw_text):
+    return Slot(_intern(venue), _intern(date), _intern(start), _intern(end), _intern(court), spaces,
+                _intern(price), book_url, raw_text)
+
+
+class SlotIndex:
+    """
+    Set of slot identities seen so far. Used to drop duplicates within a sweep
+    and, when persisted, to tell new slots from ones already reported.
+    """
+
+    def __init__(self, keys=None):
+        self._keys = set(keys or ())
+
+    def __contains__(self, slot):
+        return slot.key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, slot):
+        """Add a slot; returns True if it was not already in the index."""
+        if slot.key in self._keys:
+            return False
+        self._keys.add(slot.key)
+        return True
+
+    def dedupe(self, slots):
+        """Return the slots not yet in the index, adding them as it goes."""
+        return [slot for slot in slots if self.add(slot)]
+
+    def prune(self, before_date):
+        """Forget slots for dates before `before_date` (YYYY-MM-DD)."""
+        self._keys = {key for key in self._keys if key[1] >= before_date}
+
+    @classmethod
+    def load(cls, path):
+        """Load a persisted index, starting empty if the file is missing or unreadable."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls(tuple(key) for key in json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path):
+        """Persist the index, dropping slots for dates that have passed."""
+        self.prune(datetime.now().strftime("%Y-%m-%d"))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(self._keys), f)
+        os.replace(tmp_path, path)
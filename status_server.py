@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Local HTTP status and availability API.
+Serves the latest sweep results from an in-memory cache, so anyone on the
+box can see what's free without triggering any scraping.
+
+    GET /                   minimal HTML overview
+    GET /api/availability   latest slots per venue/date (?venue=...&date=YYYY-MM-DD)
+    GET /api/status         last-check timestamps and scan health
+
+Responses carry an ETag; clients sending If-None-Match get 304 until the data changes.
+"""
+
+import hashlib
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _iso(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)) if timestamp else None
+
+
+def slot_to_dict(slot):
+    return {
+        "date": slot.date,
+        "time": slot.time,
+        "start": slot.start,
+        "end": slot.end,
+        "court": slot.court,
+        "spaces": slot.spaces,
+        "price": slot.price,
+        "book_url": slot.book_url,
+    }
+
+
+class ResultCache:
+    """Latest result per (venue, date) plus sweep health, safe to read from server threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pages = {}  # (venue, date) -> {"slots", "checked_at", "error"}
+        self._health = {
+            "sweeps": 0,
+            "last_sweep_started": None,
+            "last_sweep_finished": None,
+            "last_sweep_seconds": None,
+            "pages_failed_last_sweep": 0,
+            "consecutive_failed_sweeps": 0,
+            "parser_warnings": {},
+        }
+
+    def update(self, all_results, dates, started, finished, parser_warnings=None):
+        """Store a finished sweep. `dates` are the dates every location was asked for."""
+        failed = 0
+        skipped = 0
+        with self._lock:
+            for result in all_results:
+                venue = result["location"]
+                checked = set(result.get("dates_checked", []))
+                not_wanted = set(result.get("dates_skipped", []))
+                for date_str in dates:
+                    if date_str in not_wanted:
+                        skipped += 1  # Deliberately not loaded: neither checked nor failed
+                    elif date_str in checked:
+                        self._pages[(venue, date_str)] = {
+                            "slots": [s for s in result["slots"] if s.date == date_str],
+                            "checked_at": finished,
+                            "error": None,
+                        }
+                    else:
+                        failed += 1
+                        previous = self._pages.get((venue, date_str), {"slots": [], "checked_at": None})
+                        # Keep the last good slots but record that this check failed
+                        self._pages[(venue, date_str)] = dict(previous, error="check failed", failed_at=finished)
+
+            health = self._health
+            health["sweeps"] += 1
+            health["last_sweep_started"] = started
+            health["last_sweep_finished"] = finished
+            health["last_sweep_seconds"] = round(finished - started, 1)
+            health["pages_failed_last_sweep"] = failed
+            total_pages = len(all_results) * len(dates) - skipped
+            if total_pages and failed == total_pages:
+                health["consecutive_failed_sweeps"] += 1
+            else:
+                health["consecutive_failed_sweeps"] = 0
+            health["parser_warnings"] = dict(parser_warnings or {})
+
+    def set_memory(self, stats):
+        """Record the latest memory/recycling figures from the browser session."""
+        with self._lock:
+            self._health["memory"] = dict(stats)
+
+    def update_page(self, venue, date_str, slots, checked_at, error=None):
+        """Store the result of a single (venue, date) check outside a full sweep."""
+        with self._lock:
+            self._pages[(venue, date_str)] = {"slots": list(slots), "checked_at": checked_at, "error": error}
+
+    def page(self, venue, date_str):
+        with self._lock:
+            return self._pages.get((venue, date_str))
+
+    def pages(self, venue=None, date_str=None):
+        """Sorted [((venue, date), page)] of cached pages, optionally filtered."""
+        with self._lock:
+            pages = sorted(self._pages.items())
+        return [
+            (key, page) for key, page in pages
+            if (venue is None or key[0].lower() == venue.lower()) and (date_str is None or key[1] == date_str)
+        ]
+
+    def availability(self, venue=None, date_str=None):
+        """JSON-ready list of cached pages, optionally filtered."""
+        return [
+            {
+                "venue": page_venue,
+                "date": page_date,
+                "checked_at": _iso(page["checked_at"]),
+                "error": page.get("error"),
+                "slots": [slot_to_dict(s) for s in page["slots"]],
+            }
+            for (page_venue, page_date), page in self.pages(venue, date_str)
+        ]
+
+    def status(self):
+        with self._lock:
+            health = dict(self._health)
+            pages = dict(self._pages)
+        for key in ("last_sweep_started", "last_sweep_finished"):
+            health[key] = _iso(health[key])
+        health["last_checked"] = {
+            f"{venue} {date_str}": _iso(page["checked_at"]) for (venue, date_str), page in sorted(pages.items())
+        }
+        return health
+
+
+# Shared by the watcher (writer) and the HTTP server (reader)
+RESULT_CACHE = ResultCache()
+
+
+def render_html(cache):
+    rows = []
+    for page in cache.availability():
+        slots = ", ".join(
+            f"{s['time']}{' (court ' + s['court'] + ')' if s['court'] else ''} – {s['spaces']} left"
+            for s in page["slots"]
+        ) or "none"
+        status = f"⚠️ {page['error']}" if page["error"] else "✅"
+        rows.append(
+            f"<tr><td>{html.escape(page['venue'])}</td><td>{page['date']}</td>"
+            f"<td>{html.escape(slots)}</td><td>{page['checked_at'] or '-'}</td><td>{html.escape(status)}</td></tr>"
+        )
+    health = cache.status()
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'><title>🎾 Court availability</title>"
+        "<style>body{font-family:sans-serif}td,th{padding:4px 10px;text-align:left}</style></head><body>"
+        "<h1>🎾 Court availability</h1>"
+        f"<p>Last sweep: {health['last_sweep_finished'] or 'not yet'}"
+        f" ({health['last_sweep_seconds'] or '-'}s, {health['pages_failed_last_sweep']} page(s) failed)</p>"
+        "<table><tr><th>Venue</th><th>Date</th><th>Available</th><th>Checked</th><th>Status</th></tr>"
+        + "".join(rows) + "</table></body></html>"
+    )
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    cache = RESULT_CACHE
+
+    def _send(self, body: bytes, content_type: str):
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/api/availability":
+            body = json.dumps(self.cache.availability(query.get("venue"), query.get("date")), indent=2)
+            self._send(body.encode("utf-8"), "application/json")
+        elif url.path == "/api/status":
+            self._send(json.dumps(self.cache.status(), indent=2).encode("utf-8"), "application/json")
+        elif url.path == "/":
+            self._send(render_html(self.cache).encode("utf-8"), "text/html; charset=utf-8")
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        pass  # Keep monitor.log free of request noise
+
+
+def start_status_server(host, port, cache=RESULT_CACHE):
+    """Serve the cache on a background thread. Returns the server (call shutdown() to stop)."""
+    handler = type("BoundStatusHandler", (StatusHandler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="status-http", daemon=True).start()
+    print(f"🌐 Status API on http://{host}:{server.server_address[1]}/")
+    return server
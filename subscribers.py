@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Subscribers and fan-out.
+One scan of each (venue, date) is matched against every subscription, so the
+cost of a sweep depends on the pages checked, not on how many people want alerts.
+
+subscribers.json is a list of subscriptions, e.g.:
+
+    [
+      {"name": "Sam", "telegram_chat_id": "123456", "venues": ["Highbury Tennis"],
+       "days": ["Sat", "Sun"], "from": "08:00", "to": "12:00"},
+      {"name": "Jo", "telegram_chat_id": "654321",
+       "windows": {"Sat": "08:00-12:00", "Sun": ["09:00-11:00", "16:00-19:00"], "Mon-Fri": "18:30-20:00"},
+       "max_price": 14, "courts": ["1", "2"], "min_duration": 120,
+       "prefer_venues": ["Highbury Tennis"], "prefer_courts": ["1"], "max_results": 5},
+      {"name": "Alex", "pushover_user_key": "uQiRzpo4...", "email": "alex@example.com"}
+    ]
+
+Every filter is optional; a missing filter matches everything. `windows`
+replaces days/from/to with start-time windows per day. Consecutive matching
+slots at a venue/court are grouped into blocks. `min_duration` (minutes) drops
+shorter blocks, and blocks are ranked by preferred venue, then preferred
+court, then length, then how soon they are.
+"""
+
+import bisect
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date
+
+SUBSCRIBERS_FILE = os.getenv("SUBSCRIBERS_FILE", "subscribers.json")
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+PRICE_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+def _minutes(hhmm):
+    hours, _, minutes = hhmm.partition(':')
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _day_numbers(spec):
+    """Weekday numbers for "Sat", "Mon-Fri" or "Fri-Sun"."""
+    first, _, last = spec.partition("-")
+    start = WEEKDAYS.index(first.strip()[:3].title())
+    end = WEEKDAYS.index(last.strip()[:3].title()) if last else start
+    return [day % 7 for day in range(start, end + 1 if end >= start else end + 8)]
+
+
+def _parse_windows(windows):
+    """{"Sat": "08:00-12:00", "Mon-Fri": ["07:00-08:00", "18:00-21:00"]} -> {weekday: ((from, to), ...)}"""
+    parsed = {}
+    for days, ranges in windows.items():
+        for text in [ranges] if isinstance(ranges, str) else ranges:
+            start, _, end = text.partition("-")
+            window = (_minutes(start.strip()), _minutes(end.strip()) if end.strip() else 24 * 60)
+            for day in _day_numbers(days):
+                parsed.setdefault(day, []).append(window)
+    return {day: tuple(sorted(day_windows)) for day, day_windows in parsed.items()}
+
+
+def slot_price(slot):
+    """Numeric price of a slot ("£12.35" -> 12.35), or None if unknown."""
+    match = PRICE_RE.search(slot.price or "")
+    return float(match.group(1)) if match else None
+
+
+def block_minutes(block):
+    """Length of a block of consecutive slots in minutes (0 if its times are incomplete)."""
+    if not (block[0].start and block[-1].end):
+        return 0
+    return _minutes(block[-1].end) - _minutes(block[0].start)
+
+
+def group_consecutive(slots):
+    """
+    Group slots into blocks of back-to-back sessions at the same venue, date and
+    court (one slot's end is the next one's start). Returns a list of lists.
+    """
+    blocks = []
+    ordered = sorted(slots, key=lambda s: (s.venue, s.date, s.court, _minutes(s.start) if s.start else 0))
+    for slot in ordered:
+        previous = blocks[-1][-1] if blocks else None
+        if (previous and (previous.venue, previous.date, previous.court) == (slot.venue, slot.date, slot.court)
+                and previous.end and previous.end == slot.start):
+            blocks[-1].append(slot)
+        else:
+            blocks.append([slot])
+    return blocks
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Who to notify and which slots they care about."""
+    name: str
+    telegram_chat_id: str = None
+    pushover_user_key: str = None
+    email: str = None
+    venues: frozenset = None     # lower-cased venue names, None = all
+    days: frozenset = None       # weekday numbers (0=Mon), None = all
+    dates: frozenset = None      # YYYY-MM-DD strings, None = all
+    start_from: int = 0          # earliest slot start, minutes after midnight
+    start_to: int = 24 * 60      # latest slot start (inclusive)
+    windows: dict = None         # weekday number -> ((from, to), ...) start windows, None = days/from/to
+    max_price: float = None
+    courts: frozenset = None     # lower-cased court names, None = all
+    min_duration: int = 0        # minutes of back-to-back free slots required
+    prefer_venues: tuple = ()    # lower-cased, best first
+    prefer_courts: tuple = ()
+    max_results: int = 0         # best N blocks per notification, 0 = all
+    channels: tuple = field(init=False, default=())
+
+    def __post_init__(self):
+        self.channels = tuple(c for c, v in (("telegram", self.telegram_chat_id),
+                                             ("pushover", self.pushover_user_key),
+                                             ("email", self.email)) if v)
+        if self.windows:
+            # Outer bounds of all windows, so SubscriptionIndex can still bisect on start_from
+            all_windows = [window for day_windows in self.windows.values() for window in day_windows]
+            self.start_from = min(start for start, _ in all_windows)
+            self.start_to = max(end for _, end in all_windows)
+
+    @classmethod
+    def from_dict(cls, data):
+        venues = data.get("venues")
+        days = data.get("days")
+        dates = data.get("dates")
+        return cls(
+            name=data.get("name", "subscriber"),
+            telegram_chat_id=str(data["telegram_chat_id"]) if data.get("telegram_chat_id") else None,
+            pushover_user_key=data.get("pushover_user_key"),
+            email=data.get("email"),
+            venues=frozenset(v.lower() for v in venues) if venues else None,
+            days=frozenset(WEEKDAYS.index(d[:3].title()) for d in days) if days else None,
+            dates=frozenset(dates) if dates else None,
+            start_from=_minutes(data["from"]) if data.get("from") else 0,
+            start_to=_minutes(data["to"]) if data.get("to") else 24 * 60,
+            windows=_parse_windows(data["windows"]) if data.get("windows") else None,
+            max_price=float(data["max_price"]) if data.get("max_price") is not None else None,
+            courts=frozenset(str(c).lower() for c in data["courts"]) if data.get("courts") else None,
+            min_duration=int(data.get("min_duration", 0)),
+            prefer_venues=tuple(v.lower() for v in data.get("prefer_venues", ())),
+            prefer_courts=tuple(str(c).lower() for c in data.get("prefer_courts", ())),
+            max_results=int(data.get("max_results", 0)),
+        )
+
+    def wants_venue(self, venue):
+        return self.venues is None or venue.lower() in self.venues
+
+    def wants_date(self, date_str):
+        if self.dates is not None and date_str not in self.dates:
+            return False
+        weekday = date.fromisoformat(date_str).weekday()
+        if self.days is not None and weekday not in self.days:
+            return False
+        if self.windows is not None and weekday not in self.windows:
+            return False
+        return True
+
+    def wants_slot(self, slot, start):
+        """Checks beyond venue/date: start window for that day, price and court."""
+        if self.windows is not None:
+            day_windows = self.windows.get(date.fromisoformat(slot.date).weekday(), ())
+            if not any(low <= start <= high for low, high in day_windows):
+                return False
+        if self.max_price is not None:
+            price = slot_price(slot)
+            if price is not None and price > self.max_price:
+                return False
+        if self.courts is not None and slot.court.lower() not in self.courts:
+            return False
+        return True
+
+    def rank_key(self, block):
+        """Sort key for a block of slots: preferred venue, preferred court, longer, sooner, cheaper."""
+        first = block[0]
+        venue, court = first.venue.lower(), first.court.lower()
+        venue_rank = self.prefer_venues.index(venue) if venue in self.prefer_venues else len(self.prefer_venues)
+        court_rank = self.prefer_courts.index(court) if court in self.prefer_courts else len(self.prefer_courts)
+        return (venue_rank, court_rank, -block_minutes(block), first.date,
+                _minutes(first.start) if first.start else 0, slot_price(first) or 0)
+
+
+def load_subscriptions(path=SUBSCRIBERS_FILE, default_chat_id=None):
+    """
+    Load subscriptions from `path`. The legacy single-recipient TELEGRAM_CHAT_ID
+    becomes an unfiltered subscription unless the file already covers that chat.
+    """
+    subscriptions = []
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                subscriptions = [Subscription.from_dict(entry) for entry in json.load(f)]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Could not load subscribers from {path}: {e}")
+
+    if default_chat_id and not any(s.telegram_chat_id == str(default_chat_id) for s in subscriptions):
+        subscriptions.append(Subscription(name="default", telegram_chat_id=str(default_chat_id)))
+    return subscriptions
+
+
+class SubscriptionIndex:
+    """
+    Subscriptions indexed by venue, each bucket sorted by window start so a slot
+    only has to be compared with subscriptions whose window could contain it.
+    """
+
+    def __init__(self, subscriptions):
+        buckets = {}
+        for sub in subscriptions:
+            for venue in (sub.venues or (None,)):
+                buckets.setdefault(venue, []).append(sub)
+        self._buckets = {}
+        for venue, subs in buckets.items():
+            subs.sort(key=lambda s: s.start_from)
+            self._buckets[venue] = ([s.start_from for s in subs], subs)
+
+    def _candidates(self, venue, start):
+        for key in (venue.lower(), None):
+            if key not in self._buckets:
+                continue
+            starts, subs = self._buckets[key]
+            # Only subscriptions whose window opens at or before this slot
+            for sub in subs[:bisect.bisect_right(starts, start)]:
+                if start <= sub.start_to:
+                    yield sub
+
+    def match(self, slot):
+        """Subscriptions that want this slot."""
+        start = _minutes(slot.start)
+        return [sub for sub in self._candidates(slot.venue, start)
+                if sub.wants_date(slot.date) and sub.wants_slot(slot, start)]
+
+
+def page_wanted(subscriptions, venue, date_str):
+    """
+    Could any subscription want a slot from this (venue, date) page? True when
+    there are no subscriptions (everything is reported then).
+    """
+    return not subscriptions or any(sub.wants_venue(venue) and sub.wants_date(date_str) for sub in subscriptions)
+
+
+def fan_out(all_results, subscriptions):
+    """
+    Match a sweep against every subscription.
+    Returns [(subscription, results)] where results keeps the sweep's per-location
+    structure but only contains the slots that subscriber asked for, grouped into
+    ranked blocks of consecutive slots ("blocks"), best location first.
+    """
+    index = SubscriptionIndex(subscriptions)
+    matched = {}  # subscription -> {location: [slots]}
+    for result in all_results:
+        for slot in result["slots"]:
+            for sub in index.match(slot):
+                matched.setdefault(sub, {}).setdefault(result["location"], []).append(slot)
+
+    fanned = []
+    for sub in subscriptions:
+        if sub not in matched:
+            continue
+        blocks = [(result, block) for result in all_results
+                  for block in group_consecutive(matched[sub].get(result["location"], []))
+                  if block_minutes(block) >= sub.min_duration]
+        blocks.sort(key=lambda item: sub.rank_key(item[1]))
+        if sub.max_results:
+            blocks = blocks[:sub.max_results]
+        by_location = {}  # Insertion order: the location of the best block first
+        for result, block in blocks:
+            by_location.setdefault(result["location"], (result, []))[1].append(block)
+        results = [
+            dict(result, slots=[slot for block in location_blocks for slot in block], blocks=location_blocks)
+            for result, location_blocks in by_location.values()
+        ]
+        if results:
+            fanned.append((sub, results))
+    return fanned
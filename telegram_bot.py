@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Telegram bot commands answered from the result cache.
+A background thread long-polls getUpdates and answers straight from the latest
+cached scan. When a question pins down a single (venue, date) whose cached
+result is older than BOT_RESCAN_AFTER, just that page is queued for a rescan
+on the browser thread and a follow-up is sent once it's done. Nothing here
+ever starts a sweep.
+
+    /now                          everything free in the latest scan
+    /venue <name> [yyyy-mm-dd]    one venue (any part of its name)
+    /date <yyyy-mm-dd> [venue]    one date
+
+Point TELEGRAM_API_BASE at mock_telegram.py to try it without a real bot.
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+
+import requests
+
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+# A single page asked about is rescanned if its cached result is older than this (seconds)
+BOT_RESCAN_AFTER = int(os.getenv("BOT_RESCAN_AFTER", "900"))
+BOT_POLL_TIMEOUT = int(os.getenv("BOT_POLL_TIMEOUT", "30"))
+
+MESSAGE_LIMIT = 4000
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+HELP = ("🎾 Ask me what's free:\n"
+        "/now – everything free in the latest scan\n"
+        "/venue <name> [yyyy-mm-dd] – one venue\n"
+        "/date <yyyy-mm-dd> [venue] – one date")
+
+
+def _age(checked_at):
+    if not checked_at:
+        return "not checked yet"
+    minutes = (time.time() - checked_at) / 60
+    return "checked just now" if minutes < 1 else f"checked {minutes:.0f} min ago"
+
+
+def format_page(venue, date_str, page):
+    """One cached (venue, date) as message text."""
+    page = page or {"slots": [], "checked_at": None}
+    lines = [f"📍 {venue} – {date_str} ({_age(page['checked_at'])})"]
+    if page.get("error"):
+        lines.append("⚠️ The last check of this page failed")
+    for slot in page["slots"]:
+        line = f"⏰ {slot.time} | 🏟️ {slot.spaces} spaces"
+        if slot.court:
+            line += f" | 🎾 Court {slot.court}"
+        if slot.price:
+            line += f" | 💰 {slot.price}"
+        lines.append(line)
+    if not page["slots"]:
+        lines.append("Nothing free")
+    return "\n".join(lines)
+
+
+class CommandBot:
+    """
+    Answers chat commands from `cache` (a status_server.ResultCache). With
+    `on_rescan`, stale single pages are queued for process_rescans() and
+    `on_rescan()` is called to wake the thread that drives the browser.
+    """
+
+    def __init__(self, token, cache, locations, allowed_chats, dates=None, on_rescan=None,
+                 rescan_after=BOT_RESCAN_AFTER, api_base=TELEGRAM_API_BASE):
+        self.token = token
+        self.cache = cache
+        self.locations = locations
+        self.allowed_chats = {str(chat_id) for chat_id in allowed_chats if chat_id}
+        self.dates = dates  # Callable returning the dates being watched (the only ones rescanned)
+        self.on_rescan = on_rescan
+        self.rescan_after = rescan_after
+        self.api_base = api_base
+        self._rescans = queue.Queue()
+        self._waiting = {}  # (venue, date) -> chat ids waiting for its rescan
+        self._lock = threading.Lock()
+        self._offset = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _call(self, method, params, timeout=10):
+        response = requests.post(f"{self.api_base}/bot{self.token}/{method}", json=params, timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("result")
+
+    def send(self, chat_id, text):
+        if len(text) > MESSAGE_LIMIT:
+            text = text[:MESSAGE_LIMIT - 1] + "…"
+        try:
+            self._call("sendMessage", {"chat_id": chat_id, "text": text})
+        except Exception as e:
+            print(f"Telegram reply failed: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._poll, name="telegram-bot", daemon=True)
+        self._thread.start()
+        print(f"🤖 Answering /now, /venue and /date for {len(self.allowed_chats)} chat(s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def _poll(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                updates = self._call("getUpdates", {"offset": self._offset, "timeout": BOT_POLL_TIMEOUT,
+                                                    "allowed_updates": ["message"]},
+                                     timeout=BOT_POLL_TIMEOUT + 10)
+                backoff = 1
+            except Exception as e:
+                if self._stop.is_set():
+                    break  # Stopped while a long poll was in flight
+                print(f"Telegram getUpdates failed: {e}")
+                self._stop.wait(backoff)
+                backoff = min(60, backoff * 2)
+                continue
+            for update in updates or []:
+                self._offset = update["update_id"] + 1
+                self.handle_update(update)
+
+    def handle_update(self, update):
+        message = update.get("message") or {}
+        text = (message.get("text") or "").strip()
+        chat_id = str((message.get("chat") or {}).get("id", ""))
+        if not text.startswith("/"):
+            return
+        if chat_id not in self.allowed_chats:
+            print(f"🤖 Ignoring {text.split()[0]} from unknown chat {chat_id}")
+            return
+        try:
+            reply = self.answer(text, chat_id)
+        except Exception as e:
+            reply = f"⚠️ {e}"
+        self.send(chat_id, reply)
+
+    def answer(self, text, chat_id):
+        """Reply text for one command (queuing a rescan if it asks about one stale page)."""
+        command, *args = text.split()
+        command = command.split("@", 1)[0].lower()  # "/now@SomeBot" in group chats
+        date_args = [arg for arg in args if DATE_RE.match(arg)]
+        name = " ".join(arg for arg in args if not DATE_RE.match(arg))
+        date_str = date_args[0] if date_args else None
+
+        if command == "/now":
+            return self._now()
+        if command == "/venue" and name:
+            return self._query(name, date_str, chat_id)
+        if command == "/date" and date_str:
+            return self._query(name, date_str, chat_id)
+        return HELP
+
+    def _now(self):
+        pages = self.cache.pages()
+        if not pages:
+            return "No scan has finished yet - try again after the next sweep."
+        free = [format_page(venue, date_str, page) for (venue, date_str), page in pages if page["slots"]]
+        oldest = min((page["checked_at"] for _, page in pages if page["checked_at"]), default=None)
+        footer = f"\n\n{len(pages) - len(free)} other page(s) with nothing free. Oldest result: {_age(oldest)}."
+        return ("\n\n".join(free) if free else "Nothing free in the latest scan.") + footer
+
+    def match_venues(self, name):
+        """Venue names matching `name` exactly, or else containing it (case-insensitive)."""
+        names = [location["name"] for location in self.locations]
+        wanted = name.lower()
+        exact = [venue for venue in names if venue.lower() == wanted]
+        return exact or [venue for venue in names if wanted in venue.lower()]
+
+    def _query(self, name, date_str, chat_id):
+        venues = self.match_venues(name) if name else None
+        if venues == []:
+            return f"No venue matching '{name}'. Venues: {', '.join(l['name'] for l in self.locations)}"
+        pages = [(key, page) for key, page in self.cache.pages(date_str=date_str)
+                 if venues is None or key[0] in venues]
+
+        # A single page pinned down: make sure it's recent enough
+        watched = self.dates() if self.dates else []
+        if date_str is None and len(watched) == 1:
+            date_str = watched[0]
+        rescanning = False
+        if venues and len(venues) == 1 and date_str:
+            key = (venues[0], date_str)
+            page = self.cache.page(*key)
+            if not pages:
+                pages = [(key, page)]
+            if self._stale(page) and date_str in watched:
+                rescanning = self.request_rescan(key, chat_id)
+
+        reply = "\n\n".join(format_page(venue, page_date, page) for (venue, page_date), page in pages)
+        reply = reply or "Nothing cached for that yet."
+        if rescanning:
+            reply += "\n\n🔄 That's getting old - rescanning it now, I'll follow up."
+        return reply
+
+    def _stale(self, page):
+        return not page or not page["checked_at"] or time.time() - page["checked_at"] > self.rescan_after
+
+    def request_rescan(self, key, chat_id):
+        """Queue one (venue, date) for the browser thread. Returns False if rescans are off."""
+        if self.on_rescan is None:
+            return False
+        with self._lock:
+            queued = key in self._waiting
+            self._waiting.setdefault(key, set()).add(chat_id)
+        if not queued:
+            self._rescans.put((key, time.time()))
+            self.on_rescan()
+        return True
+
+    def process_rescans(self, rescan):
+        """
+        Run queued rescans on the calling (browser) thread via `rescan(location, date_str)`,
+        which updates the cache, and send the follow-ups.
+        """
+        while True:
+            try:
+                key, requested_at = self._rescans.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                chats = self._waiting.pop(key, set())
+            page = self.cache.page(*key)
+            if not (page and page["checked_at"] and page["checked_at"] >= requested_at):  # No sweep beat us to it
+                location = next(location for location in self.locations if location["name"] == key[0])
+                print(f"🤖 Rescanning {key[0]} {key[1]} for a bot query")
+                try:
+                    rescan(location, key[1])
+                except Exception as e:
+                    for chat_id in chats:
+                        self.send(chat_id, f"⚠️ Couldn't rescan {key[0]} {key[1]}: {e}")
+                    continue
+            reply = "🔄 Fresh result:\n\n" + format_page(*key, self.cache.page(*key))
+            for chat_id in chats:
+                self.send(chat_id, reply)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Bot command checks against the local Telegram stand-in (mock_telegram.py).
+No browser: the cache is filled by hand and rescans are a stub that records
+what it was asked to check. Every test gets its own stand-in, cache and bot.
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+from mock_telegram import start_mock_telegram
+from slots import Slot
+from status_server import ResultCache
+from telegram_bot import CommandBot
+
+CHAT = "42"
+DATES = ["2025-09-06", "2025-09-07"]
+LOCATIONS = [{"name": "Highbury Tennis", "base_url": "https://example.invalid/highbury"},
+             {"name": "Islington Tennis Centre", "base_url": "https://example.invalid/islington"}]
+
+
+def make_bot(server, rescans):
+    cache = ResultCache()
+    fresh, old = time.time(), time.time() - 3600
+    cache.update_page("Highbury Tennis", DATES[0], [Slot.create("Highbury Tennis", DATES[0], "09:00 - 10:00", 2)], fresh)
+    cache.update_page("Highbury Tennis", DATES[1], [], old)
+    cache.update_page("Islington Tennis Centre", DATES[0], [], fresh)
+
+    def rescan(location, date_str):
+        rescans.append((location["name"], date_str))
+        cache.update_page(location["name"], date_str,
+                          [Slot.create(location["name"], date_str, "18:00 - 19:00", 1)], time.time())
+
+    bot = CommandBot("TOKEN", cache, LOCATIONS, [CHAT], dates=lambda: DATES, on_rescan=lambda: None,
+                     rescan_after=900, api_base=server.base_url)
+    return bot, rescan
+
+
+@contextmanager
+def running_bot():
+    """Yield (server, bot, rescans, rescan) for one test, and tear them down after it."""
+    server = start_mock_telegram()
+    rescans = []
+    bot, rescan = make_bot(server, rescans)
+    bot.start()
+    try:
+        yield server, bot, rescans, rescan
+    finally:
+        bot.stop()
+        server.shutdown()
+
+
+def ask(server, text, chat_id=CHAT, replies=1):
+    before = len(server.sent)
+    server.say(chat_id, text)
+    return [m["text"] for m in server.wait_for_sent(before + replies, timeout=5)[before:]]
+
+
+def test_now_answers_from_cache():
+    with running_bot() as (server, bot, rescans, rescan):
+        reply, = ask(server, "/now")
+        assert "Highbury Tennis – 2025-09-06" in reply and "09:00 - 10:00" in reply, reply
+        assert "2 other page(s) with nothing free" in reply, reply
+        assert not rescans
+
+
+def test_fresh_page_is_not_rescanned():
+    with running_bot() as (server, bot, rescans, rescan):
+        reply, = ask(server, "/venue highbury 2025-09-06")
+        assert "09:00 - 10:00" in reply and "rescanning" not in reply, reply
+        bot.process_rescans(rescan)
+        assert not rescans
+
+
+def test_stale_page_gets_one_targeted_rescan():
+    with running_bot() as (server, bot, rescans, rescan):
+        reply, = ask(server, "/date 2025-09-07 highbury")
+        assert "Nothing free" in reply and "rescanning" in reply, reply
+        bot.process_rescans(rescan)
+        assert rescans == [("Highbury Tennis", "2025-09-07")], rescans
+        follow_up = server.wait_for_sent(len(server.sent), timeout=5)[-1]["text"]
+        assert "18:00 - 19:00" in follow_up, follow_up
+
+
+def test_broad_queries_never_rescan():
+    with running_bot() as (server, bot, rescans, rescan):
+        ask(server, "/venue tennis")
+        ask(server, "/date 2025-09-06")
+        bot.process_rescans(rescan)
+        assert not rescans, rescans
+
+
+def test_unknown_chat_is_ignored():
+    with running_bot() as (server, bot, rescans, rescan):
+        before = len(server.sent)
+        server.say("999", "/now")
+        time.sleep(1)
+        assert len(server.sent) == before, server.sent[before:]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing Telegram bot commands")
+    print("=" * 80)
+    failed = 0
+    for test in (test_now_answers_from_cache, test_fresh_page_is_not_rescanned,
+                 test_stale_page_gets_one_targeted_rescan, test_broad_queries_never_rescan,
+                 test_unknown_chat_is_ignored):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
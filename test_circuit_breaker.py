@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Circuit breaker checks: circuits trip after the threshold of consecutive
+failures, back off exponentially up to the maximum, allow one probe once the
+backoff has passed, and keep all of that across runs through the state file.
+Runs on a fake clock.
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+SITE = "www.better.org.uk"
+VENUE = f"{SITE} Highbury Tennis"
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@contextlib.contextmanager
+def fake_clock():
+    clock, real_time = FakeClock(), circuit_breaker.time
+    circuit_breaker.time = clock
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            yield clock, os.path.join(scratch, "circuit_state.json")
+    finally:
+        circuit_breaker.time = real_time
+
+
+def test_trips_at_threshold():
+    with fake_clock() as (clock, path):
+        breaker = CircuitBreaker(path, backoff=300)
+        breaker.record_failure(VENUE, threshold=2)
+        assert breaker.state(VENUE) == CLOSED
+        breaker.record_failure(VENUE, threshold=2)
+        assert breaker.state(VENUE) == OPEN
+        assert breaker.retry_in(VENUE) == 300
+        assert breaker.state(SITE) == CLOSED  # Circuits are independent
+
+
+def test_success_resets_the_count():
+    with fake_clock() as (clock, path):
+        breaker = CircuitBreaker(path, backoff=300)
+        breaker.record_failure(VENUE, threshold=2)
+        breaker.record_success(VENUE)
+        breaker.record_failure(VENUE, threshold=2)
+        assert breaker.state(VENUE) == CLOSED  # Not consecutive
+
+
+def test_half_open_probe():
+    with fake_clock() as (clock, path):
+        breaker = CircuitBreaker(path, backoff=300)
+        for _ in range(4):
+            breaker.record_failure(SITE, threshold=4)
+        clock.now += 299
+        assert breaker.state(SITE) == OPEN and breaker.retry_in(SITE) == 1
+        clock.now += 1
+        assert breaker.state(SITE) == HALF_OPEN
+        breaker.record_failure(SITE, threshold=4)  # A failed probe reopens at once, below the threshold
+        assert breaker.state(SITE) == OPEN
+        clock.now += 600
+        assert breaker.state(SITE) == HALF_OPEN
+        breaker.record_success(SITE)  # A good probe closes it
+        assert breaker.state(SITE) == CLOSED and breaker.retry_in(SITE) == 0
+
+
+def test_backoff_doubles_up_to_maximum():
+    with fake_clock() as (clock, path):
+        breaker = CircuitBreaker(path, backoff=300, max_backoff=2000)
+        waits = []
+        for _ in range(5):
+            breaker.record_failure(SITE, threshold=1)
+            waits.append(breaker.retry_in(SITE))
+            clock.now += waits[-1]  # Backoff over: the next failure is the probe
+        assert waits == [300, 600, 1200, 2000, 2000], waits
+
+
+def test_state_persists_across_runs():
+    with fake_clock() as (clock, path):
+        CircuitBreaker(path, backoff=300).record_failure(SITE, threshold=1)
+        clock.now += 300
+        next_run = CircuitBreaker(path, backoff=300)
+        assert next_run.state(SITE) == HALF_OPEN
+        next_run.record_failure(SITE, threshold=1)
+        assert CircuitBreaker(path, backoff=300).retry_in(SITE) == 600  # The doubling carried over
+
+        with open(path, "w") as f:
+            f.write("{not json")
+        assert CircuitBreaker(path).state(SITE) == CLOSED  # A damaged file starts afresh
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the circuit breaker")
+    print("=" * 80)
+    failed = 0
+    for test in (test_trips_at_threshold, test_success_resets_the_count, test_half_open_probe,
+                 test_backoff_doubles_up_to_maximum, test_state_persists_across_runs):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Configuration checks: settings in .env reach the module constants that are
+read at import time. Each check copies the modules into a scratch directory
+next to its own .env and imports them in a fresh interpreter.
+"""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_with_env_file(settings, code, args=()):
+    """Run `code` with `settings` in .env and none of them in the environment. Returns its stdout as JSON."""
+    env = {k: v for k, v in os.environ.items() if k not in settings and k != "PYTHONPATH"}
+    with tempfile.TemporaryDirectory() as scratch:
+        for path in glob.glob(os.path.join(SCRIPT_DIR, "*.py")):
+            shutil.copy(path, scratch)
+        with open(os.path.join(scratch, ".env"), "w") as f:
+            f.writelines(f"{key}={value}\n" for key, value in settings.items())
+        result = subprocess.run([sys.executable, "-c", code, *args], cwd=scratch, env=env,
+                                capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-500:]
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_watcher_settings_from_env_file():
+    values = run_with_env_file(
+        {"HISTORY_DIR": "from-env-file", "PARSE_WORKERS": "0", "BROWSER_PROFILE": "lean"},
+        "import json, watcher, history; print(json.dumps({'history_dir': history.HISTORY_DIR, "
+        "'parse_workers': watcher.PARSE_POOL.workers, 'browser_profile': watcher.BROWSER_PROFILE}))")
+    assert values == {"history_dir": "from-env-file", "parse_workers": 0, "browser_profile": "lean"}, values
+
+
+
+def test_launcher_reads_env_file_before_instance_settings():
+    not_today = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"][(time.localtime().tm_wday + 1) % 7]
+    values = run_with_env_file(
+        {"WATCH_DAYS": not_today, "WATCHER_LOCK_PATH": "from-env-file.lock",
+         "WATCHER_SOCKET_PATH": "from-env-file.sock"},
+        "import json, runpy; ns = runpy.run_path('launcher.py', run_name='__main__'); "
+        "print(json.dumps([sorted(ns['WATCH_DAYS']), ns['LOCK_PATH'], ns['SOCKET_PATH']]))")
+    assert values == [[not_today], "from-env-file.lock", "from-env-file.sock"], values
+
+
+def test_importing_launcher_leaves_environment_alone():
+    """watcher.py imports launcher halfway through its own imports; that must not load .env again."""
+    values = run_with_env_file({"WATCH_DAYS": "mon"},
+                               "import json, os, launcher; print(json.dumps(os.getenv('WATCH_DAYS')))")
+    assert values is None, values
+
+
+if __name__ == "__main__":
+    print("🧪 Testing configuration loading")
+    print("=" * 80)
+    failed = 0
+    for test in (test_watcher_settings_from_env_file, test_launcher_reads_env_file_before_instance_settings,
+                 test_importing_launcher_leaves_environment_alone):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -3,17 +3,17 @@
 Temporary test script to check detection logic on a specific URL with known available slots
 """
 
-import os
-import time
 from dotenv import load_dotenv
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-from watcher import parse_court_availability, handle_cookie_popup, login_to_better
+from watcher import parse_court_availability, handle_cookie_popup, login_to_better, TENNIS_LOCATIONS
+from artifacts import ArtifactStore, new_run_id
 
 # Load environment variables
 load_dotenv()
 
 # Test URL with known available slots (September 5th)
-TEST_URL = "https://bookings.better.org.uk/location/islington-tennis-centre/highbury-tennis/2025-09-05/by-time"
+TEST_DATE = "2025-09-05"
+TEST_URL = f"https://bookings.better.org.uk/location/islington-tennis-centre/highbury-tennis/{TEST_DATE}/by-time"
 
 def test_detection():
     """Test the detection logic on a specific URL with available slots."""
@@ -22,6 +22,9 @@ def test_detection():
     print(f"Date: September 5th, 2025 (Known available slots)")
     print("="*80)
     
+    artifacts = ArtifactStore()
+    run_id = new_run_id()
+    
     with sync_playwright() as playwright:
         # Launch browser in visible mode for testing
         browser = playwright.chromium.launch(headless=False)
@@ -63,10 +66,7 @@ def test_detection():
             
             # Save HTML BEFORE scrolling
             html_before = page.content()
-            html_before_path = f"test_detection_BEFORE_scroll_{time.strftime('%Y%m%d_%H%M%S')}.html"
-            with open(html_before_path, 'w', encoding='utf-8') as f:
-                f.write(html_before)
-            print(f"💾 HTML before scroll saved: {html_before_path}")
+            artifacts.put("html", html_before, run_id, "test_detection BEFORE scroll", TEST_DATE)
             
             # Scroll gradually to ensure all slots are loaded (lazy loading)
             print("📜 Scrolling gradually to load all slots...")
@@ -88,16 +88,11 @@ def test_detection():
             page.wait_for_timeout(5000)  # Wait for all scrolling and loading to complete
             
             # Step 3: Take screenshot for reference
-            screenshot_path = f"test_detection_screenshot_{time.strftime('%Y%m%d_%H%M%S')}.png"
-            page.screenshot(path=screenshot_path)
-            print(f"📸 Screenshot saved: {screenshot_path}")
+            artifacts.put("screenshot", page.screenshot(), run_id, "test_detection", TEST_DATE)
             
             # Step 4: Save HTML AFTER scrolling for analysis
             html_content = page.content()
-            html_path = f"test_detection_AFTER_scroll_{time.strftime('%Y%m%d_%H%M%S')}.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"💾 HTML after scroll saved: {html_path}")
+            artifacts.put("html", html_content, run_id, "test_detection AFTER scroll", TEST_DATE)
             
             # Compare HTML sizes
             print(f"📊 HTML before scroll: {len(html_before)} characters")
@@ -107,7 +102,7 @@ def test_detection():
             
             # Step 5: Test our detection logic
             print("\n🔍 Testing detection logic...")
-            available_slots = parse_court_availability(html_content)
+            available_slots = parse_court_availability(html_content, TENNIS_LOCATIONS[0], TEST_DATE)
             
             # Step 6: Display results
             print("\n" + "="*60)
@@ -120,11 +115,11 @@ def test_detection():
                 
                 for i, slot in enumerate(available_slots, 1):
                     print(f"Slot {i}:")
-                    print(f"  ⏰ Time: {slot['time']}")
-                    print(f"  💰 Price: {slot['price']}")
-                    print(f"  🏟️ Spaces: {slot['spaces']}")
-                    print(f"  🔗 Book URL: {slot['book_url']}")
-                    print(f"  📝 Raw text: {slot['raw_text'][:100]}...")
+                    print(f"  ⏰ Time: {slot.time}")
+                    print(f"  💰 Price: {slot.price}")
+                    print(f"  🏟️ Spaces: {slot.spaces}")
+                    print(f"  🔗 Book URL: {slot.book_url}")
+                    print(f"  📝 Raw text: {slot.raw_text}")
                     print()
                 
                 print("🎉 Detection logic is working correctly!")
@@ -159,6 +154,8 @@ def test_detection():
         finally:
             context.close()
             browser.close()
+            artifacts.close()
+            print(f"💾 Artifacts saved under run {run_id} (python artifacts.py list --run {run_id})")
 
 if __name__ == "__main__":
     test_detection()
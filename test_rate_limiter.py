@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Rate limiter checks: the configured rate reaches the watcher, buckets refill
+at that rate up to the burst, 429/403 responses slow the host down and pause
+it, and every limiter on the box shares one budget through the state file.
+Runs on a fake clock, so nothing here actually sleeps.
+"""
+
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+
+import rate_limiter
+from rate_limiter import RateLimiter
+from test_config import run_with_env_file
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+HOST = "www.better.org.uk"
+URL = f"https://{HOST}/location/islington-tennis-centre/highbury-tennis"
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() moves time() forward and records the delay."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@contextlib.contextmanager
+def fake_clock():
+    clock, real_time = FakeClock(), rate_limiter.time
+    rate_limiter.time = clock
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            yield clock, os.path.join(scratch, "rate_limit.json")
+    finally:
+        rate_limiter.time = real_time
+
+
+def test_configured_rate_reaches_watcher():
+    values = run_with_env_file({"RATE_LIMIT_PER_MINUTE": "3", "RATE_LIMIT_BURST": "2"},
+                               "import json, watcher; "
+                               "print(json.dumps([watcher.RATE_LIMITER.rate * 60, watcher.RATE_LIMITER.burst]))")
+    assert values == [3, 2], values
+
+
+def test_burst_then_refill():
+    with fake_clock() as (clock, path):
+        limiter = RateLimiter(path, per_minute=60, burst=2)
+        assert limiter.acquire(HOST) == 0 and limiter.acquire(HOST) == 0
+        assert limiter.acquire(HOST) == 1.0, clock.sleeps  # One token a second
+        clock.now += 60  # Refills to the burst, no further
+        assert limiter.acquire(HOST) == 0 and limiter.acquire(HOST) == 0
+        assert limiter.acquire(HOST) == 1.0, clock.sleeps
+
+
+def test_429_halves_rate_and_pauses_host():
+    with fake_clock() as (clock, path):
+        limiter = RateLimiter(path, per_minute=60, burst=5, min_per_minute=20, penalty_seconds=45)
+        limiter.acquire(HOST)
+        assert limiter.observe(URL, 429, {"Retry-After": "30"}) is True
+        assert limiter.acquire(HOST) == 30  # Retry-After wins over the default pause
+        with limiter._state() as state:
+            assert state[HOST]["rate"] == 0.5, state
+
+        limiter.observe(URL, 429)
+        assert limiter.acquire(HOST) == 45
+        limiter.observe(URL, 429)
+        with limiter._state() as state:
+            assert state[HOST]["rate"] == 20 / 60, state  # Never below the minimum
+
+        limiter.observe(URL, 200)  # Each success earns back a twentieth of the configured rate
+        with limiter._state() as state:
+            assert abs(state[HOST]["rate"] - (20 / 60 + 1 / 20)) < 1e-9, state
+
+
+def test_403_only_counts_for_page_loads():
+    with fake_clock() as (clock, path):
+        limiter = RateLimiter(path, per_minute=60, burst=5, penalty_seconds=10)
+        assert limiter.observe(URL, 403, navigation=False) is False
+        assert limiter.acquire(HOST) == 0
+        assert limiter.observe(URL, 403) is True
+        assert limiter.acquire(HOST) == 10
+
+
+def test_limiters_share_the_state_file():
+    with fake_clock() as (clock, path):
+        first = RateLimiter(path, per_minute=60, burst=2)
+        second = RateLimiter(path, per_minute=60, burst=2)
+        first.acquire(HOST)
+        second.acquire(HOST)
+        assert first.acquire(HOST) == 1.0  # The second limiter used up the burst
+        second.observe(URL, 429, {"Retry-After": "20"})
+        assert first.acquire(HOST) == 20  # And a penalty through one pauses the other
+
+
+def test_accounts_share_the_host_budget():
+    with fake_clock() as (clock, path):
+        limiter = RateLimiter(path, per_minute=60, burst=2)
+        sam = limiter.for_account("sam", per_minute=60, burst=5)
+        alex = limiter.for_account("alex", per_minute=60, burst=5)
+        assert sam.acquire(HOST) == 0 and alex.acquire(HOST) == 0
+        assert sam.acquire(HOST) == 1.0  # Sam has tokens left, the host doesn't
+
+
+def test_processes_never_lose_an_update():
+    """Processes taking tokens at the same time: the flock'd read-modify-write keeps every one."""
+    processes, requests = 4, 25
+    code = ("import sys; from rate_limiter import RateLimiter; "
+            "limiter = RateLimiter(sys.argv[1], per_minute=0.001, burst=1000, min_per_minute=0.001); "
+            f"[limiter.acquire('{HOST}') for _ in range({requests})]")
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "rate_limit.json")
+        workers = [subprocess.Popen([sys.executable, "-c", code, path], cwd=SCRIPT_DIR) for _ in range(processes)]
+        assert all(worker.wait(timeout=60) == 0 for worker in workers)
+        with RateLimiter(path, per_minute=0.001, burst=1000, min_per_minute=0.001)._state() as state:
+            tokens = state[HOST]["tokens"]
+    assert 1000 - processes * requests <= tokens < 1000 - processes * requests + 0.1, tokens
+
+
+if __name__ == "__main__":
+    print("🧪 Testing the rate limiter")
+    print("=" * 80)
+    failed = 0
+    for test in (test_configured_rate_reaches_watcher, test_burst_then_refill, test_429_halves_rate_and_pauses_host,
+                 test_403_only_counts_for_page_loads, test_limiters_share_the_state_file,
+                 test_accounts_share_the_host_budget, test_processes_never_lose_an_update):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Court extraction checks for Slot.create: only a real court number or letter
+becomes the court, never text that merely mentions courts.
+"""
+
+import sys
+
+from slots import Slot
+
+CASES = [
+    ("Court 3 09:00 - 10:00", "3"),
+    ("court 12 available", "12"),
+    ("Court B | 1 space", "B"),
+    ("2 courts available", ""),
+    ("Outdoor Courts", ""),
+    ("Tennis Court Hire", ""),
+    ("Court a 09:00", ""),
+]
+
+
+def test_court_from_raw_text():
+    for raw_text, court in CASES:
+        slot = Slot.create("Highbury Tennis", "2025-09-06", "09:00 - 10:00", 1, raw_text=raw_text)
+        assert slot.court == court, f"{raw_text!r}: court {slot.court!r}, expected {court!r}"
+
+
+def test_courts_text_does_not_split_dedup_key():
+    first = Slot.create("Highbury Tennis", "2025-09-06", "09:00 - 10:00", 1, raw_text="2 courts available")
+    second = Slot.create("Highbury Tennis", "2025-09-06", "09:00 - 10:00", 1, raw_text="Outdoor Courts")
+    assert first.key == second.key, (first.key, second.key)
+
+
+if __name__ == "__main__":
+    print("🧪 Testing court extraction")
+    print("=" * 80)
+    failed = 0
+    for test in (test_court_from_raw_text, test_courts_text_does_not_split_dedup_key):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
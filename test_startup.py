@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Startup budget checks for the cron entry point.
+Runs launcher.py with `-X importtime` on a day it has nothing to do and checks
+that it exits quickly without importing Playwright, BeautifulSoup and friends.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Budgets for a no-op invocation (override for slow machines)
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "60"))
+WALL_BUDGET_MS = float(os.getenv("STARTUP_WALL_BUDGET_MS", "250"))
+
+HEAVY_MODULES = ["playwright", "bs4", "soupsieve", "requests", "smtplib", "numpy", "dotenv", "zstandard"]
+
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def run_noop_launcher():
+    """Run launcher.py where today is not a watch day. Returns (stdout, importtime lines, wall ms)."""
+    not_today = DAY_NAMES[(time.localtime().tm_wday + 1) % 7]
+    env = dict(os.environ, WATCH_DAYS=not_today)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    with tempfile.TemporaryDirectory() as scratch:  # No .env, lock or state files here
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", os.path.join(SCRIPT_DIR, "launcher.py")],
+                                cwd=scratch, env=env, capture_output=True, text=True, timeout=30)
+        wall_ms = (time.perf_counter() - started) * 1000
+    assert result.returncode == 0, f"launcher exited {result.returncode}: {result.stderr[-500:]}"
+    imports = [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+    return result.stdout, imports, wall_ms
+
+
+def imported_modules(imports):
+    return {line.rsplit("|", 1)[1].strip() for line in imports[1:]}
+
+
+def total_import_ms(imports):
+    """Sum of cumulative times of top-level imports (nested ones are included in those)."""
+    total_us = 0
+    for line in imports[1:]:
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # One leading space for top-level entries
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def test_noop_exits_without_heavy_imports():
+    stdout, imports, _ = run_noop_launcher()
+    assert "not a watch day" in stdout, stdout
+    modules = imported_modules(imports)
+    loaded = [m for m in modules if m.split(".")[0] in HEAVY_MODULES]
+    assert not loaded, f"heavy modules imported on a no-op run: {', '.join(sorted(loaded))}"
+    assert "watcher" not in modules, "watcher.py imported on a no-op run"
+
+
+def test_noop_startup_budget():
+    _, imports, wall_ms = run_noop_launcher()
+    import_ms = total_import_ms(imports)
+    print(f"   imports {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS:.0f}), "
+          f"wall {wall_ms:.0f} ms (budget {WALL_BUDGET_MS:.0f})")
+    assert import_ms <= IMPORT_BUDGET_MS, f"imports took {import_ms:.1f} ms"
+    assert wall_ms <= WALL_BUDGET_MS, f"no-op run took {wall_ms:.0f} ms"
+
+
+def test_watcher_import_has_no_side_exit():
+    """Importing watcher.py without credentials must not exit (validation happens in main())."""
+    env = {k: v for k, v in os.environ.items() if k not in ("BETTER_EMAIL", "BETTER_PASSWORD")}
+    with tempfile.TemporaryDirectory() as scratch:
+        result = subprocess.run([sys.executable, "-c", "import watcher"], cwd=scratch, timeout=60,
+                                env=dict(env, PYTHONPATH=SCRIPT_DIR), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-500:]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing launcher startup budget")
+    print("=" * 80)
+    failed = 0
+    for test in (test_noop_exits_without_heavy_imports, test_noop_startup_budget, test_watcher_import_has_no_side_exit):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
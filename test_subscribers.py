@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Subscription matching checks: start windows per day (through the bisected
+index), price and court filters, grouping into blocks of back-to-back slots,
+min_duration, and the ranking of blocks in what fan_out sends.
+"""
+
+import sys
+
+from slots import Slot
+from subscribers import Subscription, SubscriptionIndex, fan_out, group_consecutive, block_minutes
+
+SAT, SUN, MON = "2025-09-06", "2025-09-07", "2025-09-08"
+HIGHBURY, ROSEMARY = "Highbury Tennis", "Rosemary Gardens Tennis"
+
+
+def slot(time_text, date_str=SAT, venue=HIGHBURY, court="1", price="£12.00"):
+    return Slot.create(venue, date_str, time_text, 1, price=price, court=court)
+
+
+def results_for(slots):
+    """Sweep results as run_sweep returns them, one per venue and date."""
+    pages = {}
+    for s in slots:
+        pages.setdefault((s.venue, s.date), []).append(s)
+    return [{"location": venue, "date": date_str, "url": f"https://example.com/{venue}/{date_str}", "slots": page}
+            for (venue, date_str), page in pages.items()]
+
+
+def matched_names(subscriptions, s):
+    return sorted(sub.name for sub in SubscriptionIndex(subscriptions).match(s))
+
+
+def test_windows_per_day():
+    subscriptions = [
+        Subscription.from_dict({"name": "weekend mornings", "windows": {"Sat-Sun": "08:00-12:00"}}),
+        Subscription.from_dict({"name": "evenings", "windows": {"Mon-Fri": "18:30-20:00", "Sun": "16:00-19:00"}}),
+        Subscription.from_dict({"name": "sat from 9", "days": ["Sat"], "from": "09:00"}),
+        Subscription.from_dict({"name": "everything"}),
+    ]
+    assert matched_names(subscriptions, slot("08:00 - 09:00")) == ["everything", "weekend mornings"]
+    assert matched_names(subscriptions, slot("12:00 - 13:00")) == ["everything", "sat from 9", "weekend mornings"]
+    assert matched_names(subscriptions, slot("17:00 - 18:00")) == ["everything", "sat from 9"]
+    assert matched_names(subscriptions, slot("17:00 - 18:00", SUN)) == ["evenings", "everything"]
+    assert matched_names(subscriptions, slot("18:30 - 19:30", MON)) == ["evenings", "everything"]
+    assert matched_names(subscriptions, slot("07:00 - 08:00", MON)) == ["everything"]
+
+
+def test_price_and_court_filters():
+    subscriptions = [Subscription.from_dict({"name": "cheap", "max_price": 14}),
+                     Subscription.from_dict({"name": "courts 1-2", "courts": [1, "2"]})]
+    assert matched_names(subscriptions, slot("09:00 - 10:00", price="£12.35")) == ["cheap", "courts 1-2"]
+    assert matched_names(subscriptions, slot("09:00 - 10:00", price="£15.00")) == ["courts 1-2"]
+    assert matched_names(subscriptions, slot("09:00 - 10:00", price="")) == ["cheap", "courts 1-2"]  # Unknown price
+    assert matched_names(subscriptions, slot("09:00 - 10:00", court="3")) == ["cheap"]
+
+
+def test_group_consecutive():
+    blocks = group_consecutive([
+        slot("10:00 - 11:00"), slot("09:00 - 10:00"), slot("12:00 - 13:00"),  # Gap after 11:00
+        slot("11:00 - 12:00", court="2"),  # Other court
+        slot("10:00 - 11:00", venue=ROSEMARY),  # Other venue
+    ])
+    shape = sorted((b[0].venue, b[0].court, b[0].start, block_minutes(b)) for b in blocks)
+    assert shape == [(HIGHBURY, "1", "09:00", 120), (HIGHBURY, "1", "12:00", 60),
+                     (HIGHBURY, "2", "11:00", 60), (ROSEMARY, "1", "10:00", 60)], shape
+
+
+def test_min_duration_and_ranking():
+    sub = Subscription.from_dict({"name": "Jo", "min_duration": 120, "prefer_venues": [ROSEMARY],
+                                  "prefer_courts": ["2"]})
+    sweep = results_for([
+        slot("09:00 - 10:00"), slot("10:00 - 11:00"),  # Highbury court 1, 2h
+        slot("14:00 - 15:00", court="2"), slot("15:00 - 16:00", court="2"),  # Highbury court 2, 2h
+        slot("07:00 - 08:00", court="2"), slot("08:00 - 09:00", court="2"), slot("09:00 - 10:00", court="2"),  # 3h
+        slot("18:00 - 19:00", court="3"),  # 1h: too short
+        slot("17:00 - 18:00", SUN, ROSEMARY, "4"), slot("18:00 - 19:00", SUN, ROSEMARY, "4"),
+    ])
+    [(matched, results)] = fan_out(sweep, [sub])
+    assert matched is sub
+    ranked = [(r["location"], b[0].court, b[0].start, block_minutes(b)) for r in results for b in r["blocks"]]
+    assert ranked == [
+        (ROSEMARY, "4", "17:00", 120),  # Preferred venue first, even on a later day
+        (HIGHBURY, "2", "07:00", 180),  # Then the preferred court, longest first
+        (HIGHBURY, "2", "14:00", 120),
+        (HIGHBURY, "1", "09:00", 120),
+    ], ranked
+    assert all(s.court != "3" for r in results for s in r["slots"])
+
+
+def test_max_results_keeps_the_best():
+    sub = Subscription.from_dict({"name": "Sam", "prefer_courts": ["2"], "max_results": 1})
+    sweep = results_for([slot("09:00 - 10:00", court="1"), slot("10:00 - 11:00", venue=ROSEMARY, court="2")])
+    [(_, results)] = fan_out(sweep, [sub])
+    assert [(r["location"], [s.court for s in r["slots"]]) for r in results] == [(ROSEMARY, ["2"])], results
+
+
+if __name__ == "__main__":
+    print("🧪 Testing subscription matching")
+    print("=" * 80)
+    failed = 0
+    for test in (test_windows_per_day, test_price_and_court_filters, test_group_consecutive,
+                 test_min_duration_and_ranking, test_max_results_keeps_the_best):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
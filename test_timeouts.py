@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Adaptive timeout checks: the learned timeout is the percentile latency times
+the margin, kept between the wait point's floor and ceiling, and misses on
+required waits push it up while optional ones are ignored.
+"""
+
+import os
+import sys
+import tempfile
+
+from timeouts import AdaptiveTimeouts, WAIT_POINTS, bucket_of, bucket_upper_ms
+
+VENUE = "Highbury Tennis"
+
+
+def new_timeouts(scratch, **kwargs):
+    kwargs.setdefault("percentile", 95)
+    kwargs.setdefault("margin", 1.5)
+    kwargs.setdefault("min_samples", 5)
+    return AdaptiveTimeouts(os.path.join(scratch, "wait_timings.json"),
+                            os.path.join(scratch, "wait_timings_history.jsonl"), **kwargs)
+
+
+def test_default_until_enough_samples():
+    with tempfile.TemporaryDirectory() as scratch:
+        timeouts = new_timeouts(scratch)
+        for _ in range(4):
+            timeouts.record("booking_widget", VENUE, 4000)
+        assert timeouts.timeout("booking_widget", VENUE) == WAIT_POINTS["booking_widget"][0]
+        timeouts.record("booking_widget", VENUE, 4000)
+        assert timeouts.timeout("booking_widget", VENUE) != WAIT_POINTS["booking_widget"][0]
+        assert timeouts.timeout("booking_widget", "Rosemary Gardens Tennis") == WAIT_POINTS["booking_widget"][0]
+
+
+def test_p95_times_margin():
+    with tempfile.TemporaryDirectory() as scratch:
+        timeouts = new_timeouts(scratch)
+        for _ in range(96):
+            timeouts.record("booking_widget", VENUE, 4000)
+        for _ in range(4):  # Slowest 4%: beyond the 95th percentile
+            timeouts.record("booking_widget", VENUE, 20000)
+        p95 = bucket_upper_ms(bucket_of(4000))
+        assert timeouts.learned("booking_widget", VENUE) == p95
+        assert timeouts.timeout("booking_widget", VENUE) == int(p95 * 1.5), timeouts.timeout("booking_widget", VENUE)
+
+
+def test_clamped_to_floor_and_ceiling():
+    _, floor, ceiling = WAIT_POINTS["booking_widget"]
+    with tempfile.TemporaryDirectory() as scratch:
+        timeouts = new_timeouts(scratch)
+        for _ in range(10):
+            timeouts.record("booking_widget", "fast", 100)
+            timeouts.record("booking_widget", "slow", 40000)
+        assert timeouts.timeout("booking_widget", "fast") == floor
+        assert timeouts.timeout("booking_widget", "slow") == ceiling
+
+
+def test_required_misses_grow_the_timeout():
+    def times_out(timeout):
+        raise TimeoutError(f"{timeout} ms")
+
+    default = WAIT_POINTS["booking_widget"][0]
+    with tempfile.TemporaryDirectory() as scratch:
+        timeouts = new_timeouts(scratch)
+        for _ in range(5):
+            assert timeouts.wait("booking_widget", VENUE, times_out, required=True) is False
+        histogram = timeouts._histograms[f"booking_widget|{VENUE}"]
+        assert histogram["misses"] == 5 and sum(histogram["counts"]) == 5, histogram
+        assert timeouts.timeout("booking_widget", VENUE) == int(bucket_upper_ms(bucket_of(default)) * 1.5)
+        assert timeouts.timeout("booking_widget", VENUE) > default
+
+
+def test_optional_misses_are_not_recorded():
+    with tempfile.TemporaryDirectory() as scratch:
+        timeouts = new_timeouts(scratch)
+        assert timeouts.wait("cookie_banner", VENUE, lambda timeout: 1 / 0) is False
+        assert timeouts.wait("cookie_banner", VENUE, lambda timeout: None) is True
+        histogram = timeouts._histograms[f"cookie_banner|{VENUE}"]
+        assert histogram["misses"] == 0 and sum(histogram["counts"]) == 1, histogram
+
+
+def test_saved_and_reloaded():
+    with tempfile.TemporaryDirectory() as scratch:
+        timeouts = new_timeouts(scratch)
+        for _ in range(5):
+            timeouts.record("date_switch", VENUE, 3000)
+        timeouts.save()
+        reloaded = new_timeouts(scratch)
+        assert reloaded.timeout("date_switch", VENUE) == timeouts.timeout("date_switch", VENUE)
+        assert reloaded.current() == {f"date_switch|{VENUE}": timeouts.timeout("date_switch", VENUE)}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing adaptive timeouts")
+    print("=" * 80)
+    failed = 0
+    for test in (test_default_until_enough_samples, test_p95_times_margin, test_clamped_to_floor_and_ceiling,
+                 test_required_misses_grow_the_timeout, test_optional_misses_are_not_recorded,
+                 test_saved_and_reloaded):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Self-tuning wait timeouts.
+Every wait point (cookie banner, booking widget, login modal, ...) records how
+long the site actually took, per venue, into a small persisted histogram. The
+timeout used next time is a high percentile of those latencies times a margin,
+clamped between a floor and a ceiling. Until enough samples exist the old
+fixed value is used.
+
+Usage:
+    python timeouts.py report     # learned timeouts per wait point and venue, and how they changed
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+TIMEOUTS_PATH = os.getenv("TIMEOUTS_PATH", "wait_timings.json")
+TIMEOUTS_HISTORY_PATH = os.getenv("TIMEOUTS_HISTORY_PATH", "wait_timings_history.jsonl")
+TIMEOUT_PERCENTILE = float(os.getenv("TIMEOUT_PERCENTILE", "95"))
+TIMEOUT_MARGIN = float(os.getenv("TIMEOUT_MARGIN", "1.5"))
+# Samples needed before a learned value replaces the default
+TIMEOUT_MIN_SAMPLES = int(os.getenv("TIMEOUT_MIN_SAMPLES", "5"))
+# Older samples are halved once a histogram holds this many, so it follows the site
+TIMEOUT_WINDOW = int(os.getenv("TIMEOUT_WINDOW", "200"))
+
+# Wait point -> (default, floor, ceiling) in milliseconds
+WAIT_POINTS = {
+    "cookie_banner": (2000, 500, 6000),
+    "cookie_dismiss": (1000, 200, 3000),
+    "login_button": (7000, 1000, 20000),
+    "login_modal": (3000, 1000, 10000),
+    "login_complete": (5000, 1500, 15000),
+    "booking_widget": (15000, 3000, 30000),
+    "date_switch": (8000, 1000, 20000),
+    "scroll_settle": (5000, 1000, 15000),
+}
+
+# Histogram buckets: 50 ms growing by 25% per bucket (about 60 s at the top)
+BUCKET_BASE_MS = 50
+BUCKET_GROWTH = 1.25
+BUCKET_COUNT = 33
+
+
+def bucket_of(elapsed_ms):
+    if elapsed_ms <= BUCKET_BASE_MS:
+        return 0
+    return min(BUCKET_COUNT - 1, math.ceil(math.log(elapsed_ms / BUCKET_BASE_MS, BUCKET_GROWTH)))
+
+
+def bucket_upper_ms(bucket):
+    return BUCKET_BASE_MS * BUCKET_GROWTH ** bucket
+
+
+class AdaptiveTimeouts:
+    """Learned timeouts per (wait point, venue), persisted as latency histograms."""
+
+    def __init__(self, path=TIMEOUTS_PATH, history_path=TIMEOUTS_HISTORY_PATH, percentile=TIMEOUT_PERCENTILE,
+                 margin=TIMEOUT_MARGIN, min_samples=TIMEOUT_MIN_SAMPLES):
+        self.path = path
+        self.history_path = history_path
+        self.percentile = percentile
+        self.margin = margin
+        self.min_samples = min_samples
+        self._histograms = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _key(point, venue):
+        return f"{point}|{venue or '*'}"
+
+    def _histogram(self, point, venue):
+        return self._histograms.setdefault(self._key(point, venue),
+                                           {"counts": [0] * BUCKET_COUNT, "misses": 0})
+
+    def learned(self, point, venue="", percentile=None):
+        """Percentile latency in ms from the histogram, or None with too few samples."""
+        histogram = self._histograms.get(self._key(point, venue))
+        if not histogram:
+            return None
+        total = sum(histogram["counts"])
+        if total < self.min_samples:
+            return None
+        target = total * (percentile or self.percentile) / 100
+        running = 0
+        for bucket, count in enumerate(histogram["counts"]):
+            running += count
+            if running >= target:
+                return bucket_upper_ms(bucket)
+        return bucket_upper_ms(BUCKET_COUNT - 1)
+
+    def timeout(self, point, venue=""):
+        """Timeout in ms to use for the next wait at this point."""
+        default, floor, ceiling = WAIT_POINTS[point]
+        learned = self.learned(point, venue)
+        if learned is None:
+            return default
+        return int(min(ceiling, max(floor, learned * self.margin)))
+
+    def record(self, point, venue, elapsed_ms, ok=True):
+        """Add one observation. Misses on required waits count at the timeout so it can grow."""
+        histogram = self._histogram(point, venue)
+        if not ok:
+            histogram["misses"] += 1
+        histogram["counts"][bucket_of(elapsed_ms)] += 1
+        if sum(histogram["counts"]) > TIMEOUT_WINDOW:
+            histogram["counts"] = [count // 2 for count in histogram["counts"]]
+        self._dirty = True
+
+    def wait(self, point, venue, wait_fn, required=False):
+        """
+        Run `wait_fn(timeout_ms)` with the learned timeout and record how long it took.
+        Returns True if the condition was met, False if it timed out. `required`
+        marks waits whose condition should always come true (the booking widget,
+        a date switch): their timeouts count as a sample at the timeout, so the
+        timeout grows when the site slows down. Timeouts of optional waits (e.g. a
+        cookie banner that may never appear) aren't recorded.
+        """
+        timeout = self.timeout(point, venue)
+        started = time.perf_counter()
+        try:
+            wait_fn(timeout)
+        except Exception:
+            if required:
+                self.record(point, venue, timeout, ok=False)
+            return False
+        self.record(point, venue, (time.perf_counter() - started) * 1000)
+        return True
+
+    def save(self):
+        """Persist histograms and append a snapshot of the learned timeouts."""
+        if not self._dirty:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._histograms, f)
+        os.replace(tmp_path, self.path)
+        snapshot = {"at": time.strftime("%Y-%m-%dT%H:%M:%S"), "timeouts": self.current()}
+        with open(self.history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot) + "\n")
+        self._dirty = False
+
+    def current(self):
+        """{"point|venue": timeout_ms} for every wait point seen so far."""
+        return {key: self.timeout(*key.split("|", 1)) for key in sorted(self._histograms)}
+
+
+def report(timeouts):
+    print(f"{'wait point':<16} {'venue':<26} {'samples':>7} {'misses':>6} {'p50':>7} "
+          f"{'p' + str(int(timeouts.percentile)):>7} {'timeout':>8} {'default':>8}")
+    for key in sorted(timeouts._histograms):
+        point, venue = key.split("|", 1)
+        if point not in WAIT_POINTS:
+            continue
+        histogram = timeouts._histograms[key]
+        median = timeouts.learned(point, venue, percentile=50)
+        high = timeouts.learned(point, venue)
+        print(f"{point:<16} {venue:<26} {sum(histogram['counts']):>7} {histogram['misses']:>6} "
+              f"{median or 0:>7.0f} {high or 0:>7.0f} {timeouts.timeout(point, venue):>8} {WAIT_POINTS[point][0]:>8}")
+
+    try:
+        with open(timeouts.history_path, encoding="utf-8") as f:
+            snapshots = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        snapshots = []
+    if len(snapshots) < 2:
+        return
+    first, last = snapshots[0], snapshots[-1]
+    print(f"\nChange since {first['at']} ({len(snapshots)} runs):")
+    for key, value in last["timeouts"].items():
+        before = first["timeouts"].get(key, WAIT_POINTS.get(key.split("|", 1)[0], (value,))[0])
+        if before != value:
+            print(f"  {key.replace('|', ' @ '):<44} {before:>6} ms -> {value:>6} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect learned wait timeouts")
+    parser.add_argument("command", choices=["report"])
+    parser.add_argument("--file", default=TIMEOUTS_PATH)
+    parser.add_argument("--history", default=TIMEOUTS_HISTORY_PATH)
+    args = parser.parse_args()
+    report(AdaptiveTimeouts(args.file, args.history))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tail-latency sampled Playwright tracing.
+Every page check is recorded as a trace chunk, but a chunk is only written to
+disk when the check was slow, failed, or looks suspicious (zero slots on a page
+that had slots last time). Pages are parsed in the background, so a page that
+had slots last time is written provisionally and kept or deleted once its parse
+result arrives (see parsed()). Persisted traces form a ring buffer of the most
+recent TRACE_KEEP files. Open one with:  playwright show-trace traces/<file>.zip
+"""
+
+import json
+import os
+import re
+import time
+
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+TRACE_LATENCY_MS = int(os.getenv("TRACE_LATENCY_MS", "45000"))
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "20"))
+
+
+class TraceSampler:
+    """Records a chunk per check and keeps only the interesting ones."""
+
+    def __init__(self, trace_dir=TRACE_DIR, latency_ms=TRACE_LATENCY_MS, keep=TRACE_KEEP):
+        self.trace_dir = trace_dir
+        self.latency_ms = latency_ms
+        self.keep = keep
+        self._state_path = os.path.join(trace_dir, "last_counts.json")
+        self._last_counts = self._load_counts()
+        self._started = None
+        self._pending = {}  # label -> (provisional path, elapsed ms), waiting for the parse result
+        self.persisted = 0
+
+    def _load_counts(self):
+        try:
+            with open(self._state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_counts(self):
+        os.makedirs(self.trace_dir, exist_ok=True)
+        with open(self._state_path, "w", encoding="utf-8") as f:
+            json.dump(self._last_counts, f)
+
+    def attach(self, context):
+        """Enable tracing on a (new) browser context."""
+        context.tracing.start(screenshots=True, snapshots=True, sources=False)
+
+    def begin(self, context, label):
+        context.tracing.start_chunk(title=label)
+        self._started = time.perf_counter()
+
+    def _reason_to_keep(self, label, result, elapsed_ms):
+        if isinstance(result, Exception) or (isinstance(result, dict) and result.get("error")):
+            return "error"
+        zero_slots = False
+        if isinstance(result, dict) and "slots" in result:  # Results parsed inline; see parsed() for the rest
+            previous = self._last_counts.get(label)
+            self._last_counts[label] = len(result["slots"])
+            zero_slots = not result["slots"] and bool(previous)
+        if elapsed_ms > self.latency_ms:
+            return "slow"
+        return "zero-slots" if zero_slots else None
+
+    def _path(self, label, reason):
+        safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_")
+        return os.path.join(self.trace_dir, f"{time.strftime('%Y%m%d_%H%M%S')}_{reason}_{safe_label}.zip")
+
+    def _kept(self, path, reason, elapsed_ms):
+        self.persisted += 1
+        print(f"🧵 Trace saved ({reason}, {elapsed_ms / 1000:.1f}s): {path}")
+        self._prune()
+
+    def end(self, context, label, result):
+        """Finish the chunk for `label`, persisting it if the check deserves a look."""
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        try:
+            reason = self._reason_to_keep(label, result, elapsed_ms)
+            # Slots still being parsed: only a page that had slots last time can turn out suspicious
+            pending = (reason is None and isinstance(result, dict) and "parsed" in result
+                       and bool(self._last_counts.get(label)))
+            if reason is None and not pending:
+                context.tracing.stop_chunk()  # Discarded without touching disk
+                return None
+            os.makedirs(self.trace_dir, exist_ok=True)
+            path = self._path(label, reason or "pending")
+            context.tracing.stop_chunk(path=path)
+            if pending:
+                self._pending[label] = (path, elapsed_ms)
+            else:
+                self._kept(path, reason, elapsed_ms)
+            return path
+        except Exception as e:
+            print(f"Could not finish trace chunk: {e}")
+            try:
+                context.tracing.stop_chunk()  # Never leave a chunk open for the next check
+            except Exception:
+                pass
+            return None
+        finally:
+            self._save_counts()
+
+    def parsed(self, label, slot_count):
+        """
+        Record the parse result of a checked page (slot_count None if parsing failed),
+        keeping its provisional trace if it now shows zero slots or failed.
+        """
+        previous = self._last_counts.get(label)
+        if slot_count is not None:
+            self._last_counts[label] = slot_count
+        pending = self._pending.pop(label, None)
+        try:
+            if pending:
+                path, elapsed_ms = pending
+                reason = "error" if slot_count is None else "zero-slots" if slot_count == 0 and previous else None
+                if reason:
+                    final_path = path.replace("_pending_", f"_{reason}_", 1)
+                    os.replace(path, final_path)
+                    self._kept(final_path, reason, elapsed_ms)
+                else:
+                    os.remove(path)
+        except OSError as e:
+            print(f"Could not finish trace for {label}: {e}")
+        finally:
+            self._save_counts()
+
+    def _prune(self):
+        traces = sorted(f for f in os.listdir(self.trace_dir) if f.endswith(".zip"))
+        for name in traces[:-self.keep] if self.keep else traces:
+            try:
+                os.remove(os.path.join(self.trace_dir, name))
+            except OSError:
+                pass
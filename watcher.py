@@ -5,33 +5,59 @@ Checks for available tennis court slots and sends notifications when found.
 """
 
 import os
-import re
 import sys
 import time
+import argparse
+import contextlib
+import threading
 import smtplib
 import requests
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from envfile import load_env_file
+
+# Load environment variables (override any existing ones) before the modules below read theirs
+load_env_file()
 
-# Load environment variables (override any existing ones)
-load_dotenv(override=True)
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from parsers import (parse_court_availability, ready_selector, get_parser, venue_key,
+                     SELF_CHECK_FAILURES, BOOKING_HOST)
+from parse_pool import ParsePool
+from slots import SlotIndex
+from history import record_results
+from subscribers import load_subscriptions, fan_out, page_wanted, SUBSCRIBERS_FILE
+from status_server import RESULT_CACHE, start_status_server
+from browser_session import BrowserSession, SharedBrowser, STORAGE_STATE_PATH
+from accounts import load_accounts, ACCOUNTS_FILE
+from browser_profiles import PROFILES as BROWSER_PROFILES, BROWSER_PROFILE, get_profile
+from artifacts import ArtifactStore, new_run_id
+from tracing import TraceSampler, TRACE_LATENCY_MS
+from instance import InstanceLock, ControlServer, send_command, LOCK_PATH, SOCKET_PATH
+from replay import Recording
+from rate_limiter import RateLimiter, navigate, host_of
+from timeouts import AdaptiveTimeouts
+from live_watch import LiveWatcher
+from profiling import Profiler, MODES as PROFILE_MODES
+from telegram_bot import CommandBot, TELEGRAM_API_BASE
+from circuit_breaker import CircuitBreaker, OPEN, HALF_OPEN, CIRCUIT_VENUE_FAILURES, CIRCUIT_SITE_FAILURES
+from launcher import day_is_due, record_run
 
 # Required configuration
 BETTER_EMAIL = os.getenv("BETTER_EMAIL")
 BETTER_PASSWORD = os.getenv("BETTER_PASSWORD")
 
+# Accounts to scan with (see accounts.py): venues are spread across them, each with its own context
+ACCOUNTS = load_accounts(ACCOUNTS_FILE, BETTER_EMAIL, BETTER_PASSWORD, STORAGE_STATE_PATH)
+
 # Tennis court locations to monitor
 TENNIS_LOCATIONS = [
     {
         "name": "Highbury Tennis",
-        "base_url": "https://bookings.better.org.uk/location/islington-tennis-centre/highbury-tennis"
+        "base_url": f"{BOOKING_HOST}/location/islington-tennis-centre/highbury-tennis"
     },
     {
         "name": "Rosemary Gardens Tennis", 
-        "base_url": "https://bookings.better.org.uk/location/islington-tennis-centre/rosemary-gardens-tennis"
+        "base_url": f"{BOOKING_HOST}/location/islington-tennis-centre/rosemary-gardens-tennis"
     }
 ]
 
@@ -50,16 +76,64 @@ PUSHOVER_API_TOKEN = os.getenv("PUSHOVER_API_TOKEN")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "8218022688:AAEeVfxC_TKJaMIQW2D9IeN9Vf0LYOe1Sgk")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-# Validate required environment variables
-if not (BETTER_EMAIL and BETTER_PASSWORD):
-    print("ERROR: Missing required environment variables:", file=sys.stderr)
-    print("Required: BETTER_EMAIL, BETTER_PASSWORD", file=sys.stderr)
-    sys.exit(2)
+# Everyone who gets alerts; TELEGRAM_CHAT_ID is treated as one unfiltered subscription
+SUBSCRIPTIONS = load_subscriptions(SUBSCRIBERS_FILE, default_chat_id=TELEGRAM_CHAT_ID)
+# Don't load date pages no subscription could want a slot from (e.g. Friday when everyone wants Sat/Sun)
+SKIP_UNWANTED_PAGES = os.getenv("SKIP_UNWANTED_PAGES", "true").lower() == "true"
+
+# Slots already reported in previous runs (used to mark new ones)
+SLOT_INDEX_PATH = os.getenv("SLOT_INDEX_PATH", "slot_index.json")
+
+# Debug mode HTML/screenshots go to a deduplicated, size-limited store (see artifacts.py)
+ARTIFACTS = ArtifactStore()
+RUN_ID = new_run_id()
+
+# Every navigation to the booking site waits for this shared per-host budget (and an account's own, with several)
+RATE_LIMITER = RateLimiter()
+
+# Skips the site or a venue after repeated failures instead of paying every timeout
+BREAKER = CircuitBreaker()
+SITE_KEY = host_of(BOOKING_HOST)
+PROBE_TIMEOUT = int(os.getenv("CIRCUIT_PROBE_TIMEOUT", "10"))
+
+# Waits last as long as the site has recently needed, learned per wait point and venue
+WAIT_TIMEOUTS = AdaptiveTimeouts()
+
+# Pages are parsed in worker processes while the browser loads the next one
+PARSE_POOL = ParsePool()
+
+# "in-app": after a venue's first page, switch dates through the site's own routing; "full": goto every date
+DATE_NAVIGATION = os.getenv("DATE_NAVIGATION", "in-app")
+# Text of a by-time page that has rendered and has no sessions on that date (regex, case-insensitive)
+EMPTY_STATE_PATTERN = os.getenv("EMPTY_STATE_PATTERN",
+                                r"no (sessions|activities|classes|slots)\b[^.]{0,40}\b(available|found)")
+
+# Set by --record/--replay: notifications are captured instead of sent (see replay.py)
+RECORDING = None
+# Replays get their own, effectively unlimited, request budget
+REPLAY_RATE_PER_MINUTE = 1_000_000
+
+
+def profiled(mode, label):
+    """Profiler for --profile (see profiling.py), or a no-op context."""
+    return Profiler(mode, label=label) if mode else contextlib.nullcontext()
 
 
-def send_email(subject: str, body: str):
-    """Send email notification if SMTP is configured."""
-    if not all([SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, EMAIL_TO]):
+def validate_config():
+    """Exit with code 2 if required environment variables are missing."""
+    if not ACCOUNTS:
+        print("ERROR: Missing required environment variables:", file=sys.stderr)
+        print(f"Required: BETTER_EMAIL, BETTER_PASSWORD (or accounts in {ACCOUNTS_FILE})", file=sys.stderr)
+        sys.exit(2)
+
+
+def send_email(subject: str, body: str, to: str = None):
+    """Send email notification if SMTP is configured (to EMAIL_TO unless `to` is given)."""
+    to = to or EMAIL_TO
+    if RECORDING:
+        RECORDING.record_notification("email", to=to, subject=subject, body=body)
+        return
+    if not all([SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS, to]):
         print("Email notification skipped - SMTP not fully configured")
         return
     
@@ -67,29 +141,33 @@ def send_email(subject: str, body: str):
         msg = MIMEText(body, "plain", "utf-8")
         msg["Subject"] = subject
         msg["From"] = SMTP_USER
-        msg["To"] = EMAIL_TO
+        msg["To"] = to
         
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
             server.starttls()
             server.login(SMTP_USER, SMTP_PASS)
-            server.sendmail(SMTP_USER, [EMAIL_TO], msg.as_string())
+            server.sendmail(SMTP_USER, [to], msg.as_string())
         print("Email notification sent successfully")
     except Exception as e:
         print(f"Failed to send email: {e}")
 
 
-def send_telegram(message: str):
-    """Send Telegram notification if configured."""
-    if not (TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID):
+def send_telegram(message: str, chat_id: str = None):
+    """Send Telegram notification if configured (to TELEGRAM_CHAT_ID unless `chat_id` is given)."""
+    chat_id = chat_id or TELEGRAM_CHAT_ID
+    if RECORDING:
+        RECORDING.record_notification("telegram", chat_id=chat_id, text=message)
+        return
+    if not (TELEGRAM_BOT_TOKEN and chat_id):
         print("Telegram notification skipped - TELEGRAM_CHAT_ID not configured")
         print("To get your chat ID, message your bot and visit:")
-        print(f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates")
+        print(f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/getUpdates")
         return
     
     try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        url = f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
         response = requests.post(url, json={
-            "chat_id": TELEGRAM_CHAT_ID,
+            "chat_id": chat_id,
             "text": message,
             "parse_mode": "HTML"
         })
@@ -102,9 +180,13 @@ def send_telegram(message: str):
         print(f"Failed to send Telegram notification: {e}")
 
 
-def send_pushover(title: str, message: str):
-    """Send Pushover push notification if configured."""
-    if not (PUSHOVER_USER_KEY and PUSHOVER_API_TOKEN):
+def send_pushover(title: str, message: str, user_key: str = None):
+    """Send Pushover push notification if configured (to PUSHOVER_USER_KEY unless `user_key` is given)."""
+    user_key = user_key or PUSHOVER_USER_KEY
+    if RECORDING:
+        RECORDING.record_notification("pushover", user_key=user_key, title=title, message=message)
+        return
+    if not (user_key and PUSHOVER_API_TOKEN):
         print("Pushover notification skipped - not configured")
         return
     
@@ -113,7 +195,7 @@ def send_pushover(title: str, message: str):
             "https://api.pushover.net/1/messages.json",
             data={
                 "token": PUSHOVER_API_TOKEN,
-                "user": PUSHOVER_USER_KEY,
+                "user": user_key,
                 "title": title,
                 "message": message,
             },
@@ -129,6 +211,9 @@ def send_pushover(title: str, message: str):
 
 def get_weekend_dates():
     """Get the dates for this weekend (Friday, Saturday, Sunday)."""
+    if RECORDING and RECORDING.pinned_dates():
+        return RECORDING.pinned_dates()
+
     today = datetime.now()
     
     # Find the Friday of this week (weekday 4)
@@ -150,17 +235,21 @@ def generate_weekend_urls(base_url):
     return [f"{base_url}/{date}/by-time" for date in weekend_dates]
 
 def is_weekend():
-    """Check if today is Friday, Saturday, or Sunday."""
-    today = datetime.now().weekday()
-    return today in [4, 5, 6]  # Friday=4, Saturday=5, Sunday=6
+    """Check if today is a watch day (Friday, Saturday, Sunday unless WATCH_DAYS says otherwise)."""
+    return day_is_due()
+
 
+def any_of(page, selectors):
+    """Locator matching the first visible element for any of `selectors`."""
+    locator = page.locator(selectors[0])
+    for selector in selectors[1:]:
+        locator = locator.or_(page.locator(selector))
+    return locator.first
 
-def handle_cookie_popup(page):
+
+def handle_cookie_popup(page, venue=""):
     """Handle cookie consent popup if it appears."""
     try:
-        # Wait a moment for popup to appear
-        page.wait_for_timeout(2000)
-        
         # Look for cookie consent buttons
         cookie_selectors = [
             'text="Accept All Cookies"',
@@ -170,13 +259,22 @@ def handle_cookie_popup(page):
             '[data-testid="accept-all-cookies"]',
             '.cookie-accept-all'
         ]
+        cookie_button = any_of(page, cookie_selectors)
+        
+        # Wait for popup to appear, as long as it usually takes here
+        if not WAIT_TIMEOUTS.wait("cookie_banner", venue,
+                                  lambda timeout: cookie_button.wait_for(state="visible", timeout=timeout)):
+            print("No cookie popup found or already handled")
+            return False
         
         for selector in cookie_selectors:
             try:
-                if page.locator(selector).is_visible(timeout=2000):
+                if page.locator(selector).is_visible():
                     page.click(selector, timeout=3000)
                     print("Accepted cookie consent")
-                    page.wait_for_timeout(1000)  # Wait for popup to disappear
+                    # Wait for popup to disappear
+                    WAIT_TIMEOUTS.wait("cookie_dismiss", venue,
+                                       lambda timeout: cookie_button.wait_for(state="hidden", timeout=timeout))
                     return True
             except PlaywrightTimeout:
                 continue
@@ -189,17 +287,16 @@ def handle_cookie_popup(page):
         return False
 
 
-def login_to_better(page):
+def login_to_better(page, email=None, password=None, limiter=None):
     """
     Log into Better/GLL booking system.
     Handles the authentication flow on bookings.better.org.uk
+    (as BETTER_EMAIL unless another account's credentials are given).
     """
+    email = email or BETTER_EMAIL
+    password = password or BETTER_PASSWORD
     print("Navigating to Better booking system...")
-    page.goto("https://bookings.better.org.uk/", wait_until="domcontentloaded")
-    
-    # Wait for page to fully load, then handle cookie popup
-    print("Waiting for page to load...")
-    page.wait_for_timeout(5000)  # Wait 5 seconds for cookie popup to appear
+    navigate(page, f"{BOOKING_HOST}/", limiter or RATE_LIMITER, wait_until="domcontentloaded")
     
     print("Handling cookie popup...")
     handle_cookie_popup(page)
@@ -225,6 +322,11 @@ def login_to_better(page):
             'text="Log in"'
         ]
         
+        # Wait for the page to render a login (or logout) control
+        print("Waiting for page to load...")
+        WAIT_TIMEOUTS.wait("login_button", "", required=True, wait_fn=lambda timeout: any_of(
+            page, login_selectors + ['text="Log out"']).wait_for(state="visible", timeout=timeout))
+        
         login_clicked = False
         for selector in login_selectors:
             try:
@@ -240,11 +342,12 @@ def login_to_better(page):
         if not login_clicked:
             raise Exception("Could not find login button")
         
-        # Wait for login modal to appear
-        page.wait_for_timeout(3000)
-        
         # Look for the modal
         modal_selector = '[class*="Modal"]'
+        
+        # Wait for login modal to appear
+        WAIT_TIMEOUTS.wait("login_modal", "", required=True, wait_fn=lambda timeout: page.locator(
+            modal_selector).first.wait_for(state="visible", timeout=timeout))
         try:
             modal = page.locator(modal_selector).first
             if not modal.is_visible(timeout=3000):
@@ -266,7 +369,7 @@ def login_to_better(page):
             try:
                 element = page.locator(selector).first
                 if element.is_visible(timeout=3000):
-                    element.fill(BETTER_EMAIL)
+                    element.fill(email)
                     username_filled = True
                     print("Filled username field")
                     break
@@ -288,7 +391,7 @@ def login_to_better(page):
             try:
                 element = page.locator(selector).first
                 if element.is_visible(timeout=3000):
-                    element.fill(BETTER_PASSWORD)
+                    element.fill(password)
                     password_filled = True
                     print("Filled password field")
                     break
@@ -323,7 +426,8 @@ def login_to_better(page):
             raise Exception("Could not find submit button in modal")
         
         # Wait for login to complete
-        page.wait_for_timeout(5000)
+        WAIT_TIMEOUTS.wait("login_complete", "", lambda timeout: page.locator(
+            'text="Log out"').first.wait_for(state="visible", timeout=timeout))
         print("Login completed")
     
     except Exception as e:
@@ -331,178 +435,117 @@ def login_to_better(page):
         print("Continuing anyway - may already be logged in")
 
 
-def parse_court_availability(html: str):
+def switch_date_in_app(page, location, date_str, limiter=None):
     """
-    Parse the Better booking page HTML to find available tennis court slots.
-    Returns list of available slots with their details.
+    Move a loaded by-time page of this venue to another date through the app's
+    own routing (its link to that date, else pushState + popstate) and wait for
+    the slot list to re-render. Returns False if that didn't work, or if the
+    current date shows no cards (nothing to tell the old list from the new one).
     """
-    soup = BeautifulSoup(html, "html.parser")
-    available_slots = []
-    seen_times = set()  # Track time slots to prevent duplicates
-    
-    # Method 1: Look for "Book" buttons (most reliable indicator)
-    book_buttons = soup.find_all(['button', 'a'], string=re.compile(r'Book', re.IGNORECASE))
-    for button in book_buttons:
-        # Find the container that holds this booking slot
-        container = button.parent
-        for _ in range(8):  # Walk up the DOM tree
-            if container and container.name:
-                container_text = container.get_text()
-                
-                # Look for time pattern (HH:MM - HH:MM)
-                time_match = re.search(r'(\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2})', container_text)
-                # Look for price pattern (£X.XX)
-                price_match = re.search(r'£\s*(\d+\.?\d*)', container_text)
-                # Look for spaces available
-                spaces_match = re.search(r'(\d+)\s+spaces?\s+available', container_text, re.IGNORECASE)
-                
-                if time_match and spaces_match:
-                    spaces = int(spaces_match.group(1))
-                    if spaces > 0:
-                        # Get booking URL
-                        book_url = ""
-                        if button.name == 'a' and button.get('href'):
-                            href = button['href']
-                            book_url = href if href.startswith('http') else f"https://bookings.better.org.uk{href}"
-                        
-                        slot_info = {
-                            'time': time_match.group(1),
-                            'price': f"£{price_match.group(1)}" if price_match else "",
-                            'spaces': spaces,
-                            'book_url': book_url,
-                            'raw_text': container_text.strip()
-                        }
-                        
-                        # Avoid duplicates using set for efficiency
-                        if time_match.group(1) not in seen_times:
-                            seen_times.add(time_match.group(1))
-                            available_slots.append(slot_info)
-                        break
-            container = container.parent if container else None
-    
-    # Method 2: Fallback - Look for text patterns (original method)
-    if not available_slots:
-        availability_patterns = [
-            r"(\d+)\s+spaces?\s+available",  # "1 space available", "3 spaces available"
-            r"(\d+)\s+courts?\s+available",  # "1 court available", "2 courts available"
-            r"available\s*:\s*(\d+)",        # "available: 2"
-            r"(\d+)\s+remaining",            # "2 remaining"
-            r"(\d+)\s+spaces?\s+left",       # "1 space left"
-            r"Book\s*.*?(\d+)\s+spaces?",    # Near "Book" button with spaces
-        ]
-    
-        # Find all text nodes that might contain availability information
-        for text_node in soup.find_all(string=True):
-            text = text_node.strip()
-            if not text:
-                continue
-                
-            for pattern in availability_patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
-                if match:
-                    spaces = int(match.group(1))
-                    if spaces > 0:
-                        # Find the parent container to extract more details
-                        container = text_node.parent
-                        
-                        # Walk up the DOM to find a larger container with time/price info
-                        for _ in range(5):
-                            if container and container.name:
-                                # Look for time information in this container
-                                time_text = ""
-                                price_text = ""
-                                book_url = ""
-                                
-                                # Extract time (HH:MM - HH:MM format)
-                                time_match = re.search(r'\b(\d{1,2}:\d{2}\s*-\s*\d{1,2}:\d{2})\b', 
-                                                     container.get_text())
-                                if time_match:
-                                    time_text = time_match.group(1)
-                                
-                                # Extract price (£X.XX format)
-                                price_match = re.search(r'£\s*(\d+\.?\d*)', container.get_text())
-                                if price_match:
-                                    price_text = f"£{price_match.group(1)}"
-                                
-                                # Look for booking links
-                                for link in container.find_all('a', href=True):
-                                    href = link['href']
-                                    if '/slot/' in href or 'book' in link.get_text().lower():
-                                        if href.startswith('http'):
-                                            book_url = href
-                                        else:
-                                            book_url = f"https://bookings.better.org.uk{href}"
-                                        break
-                                
-                                if time_text:  # Only add if we found time information
-                                    slot_info = {
-                                        'time': time_text,
-                                        'price': price_text,
-                                        'spaces': spaces,
-                                        'book_url': book_url,
-                                        'raw_text': text
-                                    }
-                                    
-                                    # Avoid duplicates using set for efficiency
-                                    if time_text not in seen_times:
-                                        seen_times.add(time_text)
-                                        available_slots.append(slot_info)
-                                    break
-                            
-                            container = container.parent if container else None
-    
-    return available_slots
+    extractor = get_parser(*venue_key(location["base_url"]))
+    if extractor is None or not page.url.startswith(location["base_url"]):
+        return False  # No known slot list to watch, or not on this venue's page (e.g. a recycled page)
+    selector = extractor.container_selector
+    watch_url = f"{location['base_url']}/{date_str}/by-time"
+    try:
+        # Mark the current cards so a re-render is recognisable even if the new day looks similar
+        before = page.evaluate("""
+            (selector) => Array.from(document.querySelectorAll(selector), node => {
+                node.dataset.staleSlot = "1";
+                return node.innerText;
+            }).join("\\n")
+        """, selector)
+        if not before:
+            return False
+        (limiter or RATE_LIMITER).acquire(host_of(watch_url))
+        date_link = page.locator(f'a[href*="/{date_str}/by-time"]').first
+        if date_link.count():
+            date_link.click()
+        else:
+            page.evaluate("""
+                (url) => {
+                    history.pushState({}, "", url);
+                    window.dispatchEvent(new PopStateEvent("popstate", {state: {}}));
+                }
+            """, watch_url)
+        # Done once the URL is on the new date and its list (or an explicit empty state) has rendered.
+        # Old cards merely disappearing isn't enough: the list may still be loading, or the click
+        # may have started a full page load that hasn't rendered anything yet.
+        return WAIT_TIMEOUTS.wait("date_switch", location["name"], required=True, wait_fn=lambda timeout: (
+            page.wait_for_function("""
+                ([selector, before, path, emptyPattern]) => {
+                    if (!location.pathname.endsWith(path)) return false;
+                    const nodes = Array.from(document.querySelectorAll(selector));
+                    if (nodes.some(node => !node.dataset.staleSlot)) return true;  // New cards rendered
+                    if (nodes.length && nodes.map(node => node.innerText).join("\\n") !== before) {
+                        return true;  // Cards updated in place
+                    }
+                    return !nodes.length && new RegExp(emptyPattern, "i").test(document.body.innerText);
+                }
+            """, arg=[selector, before, f"/{date_str}/by-time", EMPTY_STATE_PATTERN], timeout=timeout)))
+    except Exception as e:
+        print(f"In-app date switch failed: {e}")
+        return False
 
 
-def check_location_for_date(page, location, date_str, debug_mode):
-    """Check a specific tennis location for availability on a specific date."""
+def check_location_for_date(page, location, date_str, debug_mode, in_app=False, limiter=None):
+    """
+    Check a specific tennis location for availability on a specific date.
+    With `in_app`, first try switching the already open venue page to the date
+    instead of loading it; the result's "navigation" says which path was used.
+    The page is parsed in the background: "parsed" is a PARSE_POOL future.
+    Navigation waits for `limiter` (the session's account budget), default RATE_LIMITER.
+    """
+    limiter = limiter or RATE_LIMITER
     location_name = location["name"]
     watch_url = f"{location['base_url']}/{date_str}/by-time"
+    navigation = "full"
     
     print(f"\n🎾 Checking {location_name} for {date_str}...")
     print(f"URL: {watch_url}")
     
     try:
-        # Navigate to the specific court booking page
-        page.goto(watch_url, wait_until="domcontentloaded", timeout=30000)
-        
-        # Handle cookie popup on the booking page if it appears
-        handle_cookie_popup(page)
-        
-        # Wait for booking widget to fully load - use adaptive approach
-        print("⏳ Waiting for booking widget to load...")
-        
-        # Wait a bit for initial content
-        page.wait_for_timeout(5000)
-        
-        # Try to wait for any booking-related elements
-        try:
-            page.wait_for_selector('button, a', timeout=10000)  # Wait for any buttons/links
-            print("✅ Found interactive elements")
-        except:
-            print("⚠️ No interactive elements found")
+        if in_app:
+            if switch_date_in_app(page, location, date_str, limiter):
+                navigation = "in-app"
+                print("⚡ Switched date within the page")
+            else:
+                navigation = "fallback"
+                print("↪️ In-app date switch didn't work - loading the page instead")
         
-        # Additional wait for dynamic content
-        page.wait_for_timeout(10000)
+        if navigation != "in-app":
+            # Navigate to the specific court booking page
+            navigate(page, watch_url, limiter, wait_until="domcontentloaded", timeout=30000)
+            
+            # Handle cookie popup on the booking page if it appears
+            handle_cookie_popup(page, location_name)
+            
+            # Wait for booking widget to fully load - as long as this venue usually needs
+            print("⏳ Waiting for booking widget to load...")
+            # Required: a widget that didn't render in time must lengthen the timeout, not be parsed half-done
+            # forever. A day with no sessions renders the empty state instead of a list, which counts as loaded.
+            widget = any_of(page, [ready_selector(location["base_url"]), f"text=/{EMPTY_STATE_PATTERN}/i"])
+            if WAIT_TIMEOUTS.wait("booking_widget", location_name, required=True,
+                                  wait_fn=lambda timeout: widget.wait_for(timeout=timeout)):
+                print("✅ Booking widget loaded")
+            else:
+                print("⚠️ Booking widget didn't render in time")
         
         # Scroll gradually to ensure all slots are loaded (lazy loading)
         print("📜 Scrolling gradually to load all slots...")
         page.evaluate("""
-            // Scroll gradually to trigger all lazy loading
-            let scrollHeight = document.body.scrollHeight;
-            let currentScroll = 0;
-            let scrollStep = 500; // Scroll 500px at a time
-            
-            function gradualScroll() {
-                window.scrollTo(0, currentScroll);
-                currentScroll += scrollStep;
-                if (currentScroll < scrollHeight) {
-                    setTimeout(gradualScroll, 200); // Wait 200ms between scrolls
+            async () => {
+                // Scroll gradually to trigger all lazy loading, following the page as it grows
+                const scrollStep = 500; // Scroll 500px at a time
+                for (let y = 0, steps = 0; y < document.body.scrollHeight && steps < 100; y += scrollStep, steps++) {
+                    window.scrollTo(0, y);
+                    await new Promise(resolve => setTimeout(resolve, 200)); // Wait 200ms between scrolls
                 }
             }
-            gradualScroll();
         """)
-        page.wait_for_timeout(5000)  # Wait for all scrolling and loading to complete
+        # Wait for lazily loaded slots to finish arriving
+        WAIT_TIMEOUTS.wait("scroll_settle", location_name,
+                           lambda timeout: page.wait_for_load_state("networkidle", timeout=timeout))
         
         # Verification: Check if we're on the right page
         page_title = page.title()
@@ -510,75 +553,442 @@ def check_location_for_date(page, location, date_str, debug_mode):
         print(f"Page title: {page_title}")
         print(f"Current URL: {current_url}")
         
-        # Take screenshot if in debug mode
+        # Take screenshot if in debug mode (stored deduplicated in the artifact store)
         if debug_mode:
-            screenshot_path = f"debug_screenshot_{location_name.replace(' ', '_')}_{time.strftime('%Y%m%d_%H%M%S')}.png"
-            page.screenshot(path=screenshot_path)
-            print(f"Screenshot saved: {screenshot_path}")
+            ARTIFACTS.put("screenshot", page.screenshot(), RUN_ID, location_name, date_str)
         
         # Parse the page for available slots
         html_content = page.content()
         
         # Save HTML content if in debug mode
         if debug_mode:
-            html_path = f"debug_page_{location_name.replace(' ', '_')}_{time.strftime('%Y%m%d_%H%M%S')}.html"
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"Page HTML saved: {html_path}")
+            ARTIFACTS.put("html", html_content, RUN_ID, location_name, date_str)
         
-        available_slots = parse_court_availability(html_content)
+        # Hand the snapshot to the parsers and move on (waits here only if they're behind)
+        parsed = PARSE_POOL.submit(html_content, location, date_str)
         
         return {
             "location": location_name,
+            "date": date_str,
             "url": watch_url,
-            "slots": available_slots
+            "parsed": parsed,
+            "navigation": navigation
         }
         
     except Exception as e:
         print(f"Error checking {location_name}: {str(e)}")
         return {
             "location": location_name,
+            "date": date_str,
             "url": watch_url,
-            "slots": [],
+            "navigation": navigation,
             "error": str(e)
         }
 
 
-def check_location_all_weekend_dates(page, location, debug_mode):
-    """Check a location for all weekend dates and return combined results."""
+def site_reachable():
+    """
+    False while the site's circuit is open. When its backoff has passed, one
+    cheap request decides whether to close the circuit or back off for longer.
+    """
+    state = BREAKER.state(SITE_KEY)
+    if state == OPEN:
+        print(f"⏭️ {SITE_KEY} is in backoff after repeated failures - "
+              f"next retry in {BREAKER.retry_in(SITE_KEY) / 60:.0f} min")
+        return False
+    if state == HALF_OPEN:
+        print(f"🩺 Probing {SITE_KEY} before using the browser...")
+        try:
+            RATE_LIMITER.acquire(SITE_KEY)
+            reachable = requests.head(f"{BOOKING_HOST}/", timeout=PROBE_TIMEOUT, allow_redirects=True).status_code < 500
+        except requests.RequestException:
+            reachable = False
+        if not reachable:
+            BREAKER.record_failure(SITE_KEY, CIRCUIT_SITE_FAILURES)
+            return False
+        BREAKER.record_success(SITE_KEY)
+    return True
+
+
+def record_page_outcome(circuit_key, ok):
+    """Feed one page check into the venue and site circuits."""
+    if ok:
+        BREAKER.record_success(circuit_key)
+        BREAKER.record_success(SITE_KEY)
+    else:
+        BREAKER.record_failure(circuit_key, CIRCUIT_VENUE_FAILURES)
+        BREAKER.record_failure(SITE_KEY, CIRCUIT_SITE_FAILURES)
+
+
+def check_location_all_weekend_dates(session, location, debug_mode):
+    """
+    Load a location's page for every weekend date. Parsing is still running when
+    this returns: finish_location() waits for it and fills in the slots.
+    """
     weekend_dates = get_weekend_dates()
-    all_slots = []
+    pages = []
+    dates_checked = []
+    dates_skipped = []
     location_name = location["name"]
+    circuit_key = f"{SITE_KEY} {location_name}"
+    in_app = False  # The first date is always a full page load
     
     for date_str in weekend_dates:
+        # Fast-fail the remaining dates once the site or this venue has tripped
+        if BREAKER.state(SITE_KEY) == OPEN:
+            break
+        if not wanted_page(location, date_str):
+            print(f"⏭️ Skipping {location_name} {date_str}: no subscriber preference could match")
+            dates_skipped.append(date_str)
+            continue
+        if BREAKER.state(circuit_key) == OPEN:
+            print(f"⏭️ Skipping {location_name} {date_str}: failing repeatedly, "
+                  f"next retry in {BREAKER.retry_in(circuit_key) / 60:.0f} min")
+            in_app = False
+            continue
         try:
-            result = check_location_for_date(page, location, date_str, debug_mode)
-            if result["slots"]:
-                # Add date info to each slot
-                for slot in result["slots"]:
-                    slot["date"] = date_str
-                all_slots.extend(result["slots"])
+            result = session.run(lambda page: check_location_for_date(page, location, date_str, debug_mode, in_app,
+                                                                      session.limiter),
+                                 label=f"{location_name} {date_str}")
+            pages.append(result)
+            if "error" not in result:
+                dates_checked.append(date_str)
+            record_page_outcome(circuit_key, "error" not in result)
+            # Later dates switch within the page, unless that just failed for this venue
+            in_app = (DATE_NAVIGATION == "in-app" and "error" not in result
+                      and result.get("navigation") != "fallback")
         except Exception as e:
             print(f"Error checking {location_name} for {date_str}: {e}")
+            record_page_outcome(circuit_key, False)
+            in_app = False
     
     return {
         "location": location_name,
-        "slots": all_slots,
-        "error": None if all_slots else "No slots found for any weekend date"
+        "pages": pages,
+        "dates_checked": dates_checked,
+        "dates_skipped": dates_skipped
     }
 
 
-def main():
-    """Main function to check for available tennis courts."""
-    # Check if it's weekend (Friday, Saturday, Sunday)
-    if not is_weekend():
-        print(f"Today is not a weekend day. Exiting.")
-        print("This script only runs on Friday, Saturday, and Sunday.")
-        return
+def wanted_page(location, date_str):
+    """Whether a (venue, date) page is worth loading for the current subscriptions."""
+    return not SKIP_UNWANTED_PAGES or page_wanted(SUBSCRIPTIONS, location["name"], date_str)
+
+
+def collect_parsed(page_result, tracer=None):
+    """Wait for a checked page's slots, telling the tracer how many it had (see tracing.py)."""
+    label = f"{page_result['location']} {page_result['date']}"
+    try:
+        slots = PARSE_POOL.result(page_result["parsed"])
+    except Exception:
+        if tracer:
+            tracer.parsed(label, None)
+        raise
+    if tracer:
+        tracer.parsed(label, len(slots))
+    return slots
+
+
+def finish_location(result, tracer=None):
+    """Collect the parsed slots of a location's pages into its combined result."""
+    all_slots = []
+    for page_result in result.pop("pages"):
+        if "parsed" not in page_result:
+            continue
+        try:
+            all_slots.extend(collect_parsed(page_result, tracer))
+        except Exception as e:
+            print(f"Error parsing {page_result['url']}: {e}")
+    result["slots"] = all_slots
+    result["error"] = None if all_slots else "No slots found for any weekend date"
+    return result
+
+
+def rescan_page(sessions, location, date_str, debug_mode):
+    """Check a single (venue, date) outside a sweep (for a bot query) and update RESULT_CACHE."""
+    circuit_key = f"{SITE_KEY} {location['name']}"
+    if not site_reachable() or BREAKER.state(circuit_key) == OPEN:
+        raise RuntimeError("the booking site or venue is in backoff after repeated failures")
+    session = session_for(sessions, location)
+    if session.browser is None:
+        session.start()
+    result = session.run(lambda page: check_location_for_date(page, location, date_str, debug_mode,
+                                                              limiter=session.limiter),
+                         label=f"{location['name']} {date_str}")
+    record_page_outcome(circuit_key, "error" not in result)
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    slots = collect_parsed(result, session.tracer)
+    RESULT_CACHE.update_page(location["name"], date_str, slots, time.time())
+    return slots
+
+
+def make_sessions(playwright, debug_mode, accounts=None, **options):
+    """
+    A BrowserSession per account (default: ACCOUNTS), each with its own context,
+    saved login and rate-limit budget. Several accounts share one browser.
+    """
+    accounts = accounts or ACCOUNTS
+    profile = get_profile(BROWSER_PROFILE)
+    if len(accounts) == 1:
+        account = accounts[0]
+        options.setdefault("storage_state_path", account.state_path)
+        return [BrowserSession(playwright, headless=not debug_mode, limiter=RATE_LIMITER, profile=profile,
+                               login=lambda page: login_to_better(page, account.email, account.password),
+                               **options)]
+
+    shared = SharedBrowser(playwright, headless=not debug_mode, profile=profile)
+    sessions = []
+    for account in accounts:
+        limiter = RATE_LIMITER.for_account(account.name)
+        sessions.append(BrowserSession(
+            playwright, headless=not debug_mode, limiter=limiter, shared_browser=shared, name=account.name,
+            login=lambda page, account=account, limiter=limiter: login_to_better(page, account.email,
+                                                                                 account.password, limiter),
+            storage_state_path=account.state_path, **options))
+    print(f"👥 Scanning with {len(sessions)} accounts: {', '.join(account.name for account in accounts)}")
+    return sessions
+
+
+def session_for(sessions, location):
+    """The session that checks `location`: venues are dealt out round-robin, so each stays on one account."""
+    names = [l["name"] for l in TENNIS_LOCATIONS]
+    index = names.index(location["name"]) if location["name"] in names else 0
+    return sessions[index % len(sessions)]
+
+
+def start_sessions(sessions):
+    """Launch (or relaunch) the browser and log in every session that isn't running."""
+    for session in sessions:
+        if session.browser is None:
+            session.start()
+
+
+def close_sessions(sessions):
+    for session in sessions:
+        session.close()
+    if sessions and sessions[0].shared_browser:
+        sessions[0].shared_browser.close()
+
+
+def sessions_report(sessions):
+    """Memory figures (process-wide) plus recycling counters summed over the sessions."""
+    report = sessions[0].report()
+    for session in sessions[1:]:
+        for key, value in session.stats.items():
+            report[key] = report.get(key, 0) + value
+    return report
+
+
+def start_command_bot(on_rescan=None):
+    """Answer /now, /venue and /date over Telegram from RESULT_CACHE (see telegram_bot.py)."""
+    chats = {TELEGRAM_CHAT_ID} | {s.telegram_chat_id for s in SUBSCRIPTIONS}
+    bot = CommandBot(TELEGRAM_BOT_TOKEN, RESULT_CACHE, TENNIS_LOCATIONS, chats,
+                     dates=get_weekend_dates, on_rescan=on_rescan)
+    bot.start()
+    return bot
+
+
+def slot_blocks(result):
+    """A result's slots as blocks of consecutive slots (ranked ones from fan_out, else one per slot)."""
+    return result.get("blocks") or [[slot] for slot in result["slots"]]
+
+
+def format_block_details(block, new_keys, link_separator=" | "):
+    """Format back-to-back slots at one venue/court as a single line."""
+    if len(block) == 1:
+        return format_slot_details(block[0], new_keys, link_separator)
+    first, last = block[0], block[-1]
+    details = f"📅 {first.date} | ⏰ {first.start} - {last.end} ({len(block)} slots)"
+    if any(slot.key in new_keys for slot in block):
+        details = f"🆕 {details}"
+    if first.court:
+        details += f" | 🎾 Court {first.court}"
+    prices = sorted({slot.price for slot in block if slot.price})
+    if prices:
+        details += f" | 💰 {' / '.join(prices)}"
+    details += f" | 🏟️ {min(slot.spaces for slot in block)}+ spaces"
+    if first.book_url:
+        details += f"{link_separator}🔗 {first.book_url}"
+    return details
+
+
+def format_slot_details(slot, new_keys, link_separator=" | "):
+    """Format one slot for a notification, marking slots not reported before."""
+    details = f"📅 {slot.date} | ⏰ {slot.time}"
+    if slot.key in new_keys:
+        details = f"🆕 {details}"
+    if slot.court:
+        details += f" | 🎾 Court {slot.court}"
+    if slot.price:
+        details += f" | 💰 {slot.price}"
+    details += f" | 🏟️ {slot.spaces} spaces"
+    if slot.book_url:
+        details += f"{link_separator}🔗 {slot.book_url}"
+    return details
+
+
+def run_sweep(sessions, debug_mode):
+    """
+    Check every location for every weekend date, each venue with its account's session.
+    Returns (all_results, new_keys) where new_keys are slots not reported before.
+    """
+    started = time.time()
+    # The browser keeps loading pages while earlier ones are parsed; collect the slots once all are loaded
+    loaded = [check_location_all_weekend_dates(session_for(sessions, location), location, debug_mode)
+              for location in TENNIS_LOCATIONS]
+    all_results = [finish_location(result, sessions[0].tracer) for result in loaded]
+
+    # Serve the latest results over the local status API
+    RESULT_CACHE.update(all_results, get_weekend_dates(), started, time.time(), SELF_CHECK_FAILURES)
+    RESULT_CACHE.set_memory(sessions_report(sessions))
+
+    # Remember what has been reported so repeat sightings aren't flagged as new
+    seen_index = SlotIndex.load(SLOT_INDEX_PATH)
+    new_keys = {slot.key for result in all_results for slot in result["slots"] if seen_index.add(slot)}
+    seen_index.save(SLOT_INDEX_PATH)
+
+    # Remember how long this sweep's waits took for next time
+    WAIT_TIMEOUTS.save()
+
+    # Keep every observation for cadence analysis (see history.py); recorded runs stay out of it
+    if not RECORDING:
+        record_results(all_results)
+
+    # Finish pending debug artifact writes and apply retention
+    if debug_mode:
+        ARTIFACTS.close()
+
+    # Flag venues whose registered parser no longer matches the live pages
+    for venue, reason in SELF_CHECK_FAILURES.items():
+        print(f"⚠️ Parser for {venue} needs attention: {reason}")
+
+    return all_results, new_keys
+
+
+def build_message(results, new_keys):
+    """Plain-text summary of the slots in `results`, with booking page links."""
+    message_parts = ["🎾 Tennis Courts Available at Islington Tennis Centre!\n"]
     
-    # Check for debug mode
-    debug_mode = os.getenv("DEBUG_MODE", "false").lower() == "true"
+    for result in results:
+        if result["slots"]:
+            message_parts.append(f"\n📍 {result['location']}:")
+            for block in slot_blocks(result):
+                message_parts.append(format_block_details(block, new_keys))
+    
+    message_parts.append(f"\nChecked at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
+    # Add URLs for each location, for the dates that have slots
+    message_parts.append("\nBooking pages:")
+    for result in results:
+        for location in TENNIS_LOCATIONS:
+            if location['name'] == result['location']:
+                for date in sorted({slot.date for slot in result["slots"]}):
+                    url = f"{location['base_url']}/{date}/by-time"
+                    message_parts.append(f"• {result['location']} ({date}): {url}")
+                break
+    
+    return "\n".join(message_parts)
+
+
+def send_telegram_slots(results, new_keys, message, chat_id):
+    """Send a slot message over Telegram, splitting it to fit the 4096 character limit."""
+    total_slots_found = sum(len(result["slots"]) for result in results)
+    telegram_message = f"🎾 <b>Tennis Courts Available!</b>\n\n{message}"
+    
+    # Telegram has a 4096 character limit, so split if needed
+    if len(telegram_message) > 4000:
+        # Send summary first
+        summary = f"🎾 <b>Tennis Courts Available!</b>\n\n🎾 FOUND {total_slots_found} AVAILABLE SLOT(S) ACROSS {len([r for r in results if r['slots']])} LOCATION(S)!\n\nDetailed breakdown in next messages..."
+        send_telegram(summary, chat_id)
+        
+        # Send each location separately
+        for result in results:
+            if result["slots"]:
+                location_message = f"📍 <b>{result['location']}</b>:\n\n"
+                for block in slot_blocks(result):
+                    location_message += format_block_details(block, new_keys, "\n") + "\n\n"
+                
+                # Split location message if still too long
+                if len(location_message) > 4000:
+                    # Send slots in batches
+                    batch_message = f"📍 <b>{result['location']}</b>:\n\n"
+                    for block in slot_blocks(result):
+                        slot_details = format_block_details(block, new_keys, "\n") + "\n\n"
+                        
+                        if len(batch_message + slot_details) > 3800:
+                            send_telegram(batch_message, chat_id)
+                            batch_message = f"📍 <b>{result['location']}</b> (continued):\n\n" + slot_details
+                        else:
+                            batch_message += slot_details
+                    
+                    if batch_message.strip():
+                        send_telegram(batch_message, chat_id)
+                else:
+                    send_telegram(location_message, chat_id)
+    else:
+        send_telegram(telegram_message, chat_id)
+
+
+def notify_results(all_results, new_keys):
+    """
+    Print the sweep's findings and send each subscriber the slots matching their filters.
+    Returns True if any slots were found.
+    """
+    total_slots_found = sum(len(result["slots"]) for result in all_results)
+
+    if total_slots_found == 0:
+        print(f"\nNo available slots found at any location")
+        for result in all_results:
+            status = "✅ Checked" if "error" not in result else f"❌ Error: {result['error']}"
+            print(f"  - {result['location']}: {status}")
+        print(f"Check completed at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        return False
+
+    print(f"\n🎾 FOUND {total_slots_found} AVAILABLE SLOT(S) ACROSS {len([r for r in all_results if r['slots']])} LOCATION(S)!")
+    
+    print("\n" + "="*60)
+    print(build_message(all_results, new_keys))
+    print("="*60)
+
+    matches = fan_out(all_results, SUBSCRIPTIONS)
+    if not SUBSCRIPTIONS:
+        # No recipients configured: send_telegram explains how to set one up
+        send_telegram(build_message(all_results, new_keys))
+    elif not matches:
+        print("No subscriber filters matched these slots - no notifications sent")
+
+    for subscription, results in matches:
+        print(f"📨 Notifying {subscription.name} ({sum(len(r['slots']) for r in results)} slot(s))")
+        message = build_message(results, new_keys)
+        if subscription.telegram_chat_id:
+            send_telegram_slots(results, new_keys, message, subscription.telegram_chat_id)
+        if subscription.pushover_user_key:
+            send_pushover("Tennis Courts Available", message, subscription.pushover_user_key)
+        if subscription.email:
+            send_email("🎾 Tennis Courts Available!", message, subscription.email)
+    return True
+
+
+def make_tracer():
+    """Trace sampler if TRACE_MODE is on, else None."""
+    if os.getenv("TRACE_MODE", "false").lower() != "true":
+        return None
+    print(f"🧵 Tracing on: keeping traces for checks slower than {TRACE_LATENCY_MS / 1000:.0f}s, failed or suspicious")
+    return TraceSampler()
+
+
+def report_error(e):
+    """Log a fatal error and optionally email it."""
+    error_msg = f"Error occurred: {str(e)}"
+    print(error_msg, file=sys.stderr)
+    
+    # Optionally send error notifications
+    if SMTP_USER and EMAIL_TO:
+        send_email("Tennis Monitor Error", f"Error in tennis court monitor:\n\n{error_msg}")
+
+
+def print_banner(debug_mode):
     weekend_dates = get_weekend_dates()
     print(f"Starting Better tennis court monitor at {time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Monitoring {len(TENNIS_LOCATIONS)} locations for weekend dates:")
@@ -586,146 +996,281 @@ def main():
     for location in TENNIS_LOCATIONS:
         print(f"  - {location['name']}")
     print(f"Debug mode: {'ON' if debug_mode else 'OFF'}")
+
+
+def run_once(debug_mode):
+    """Single sweep (the cron path). Exits 1 if slots were found, 0 if not, 2 on error."""
+    print_banner(debug_mode)
     
     with sync_playwright() as playwright:
-        # Launch browser (headless for production, set to False for debugging)
-        print("🔧 Launching browser...")
-        browser = playwright.chromium.launch(headless=not debug_mode)
-        print("✅ Browser launched successfully")
-        print("🔧 Creating browser context...")
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-        )
-        print("🔧 Creating new page...")
-        page = context.new_page()
-        print("✅ Browser setup complete")
+        if RECORDING:
+            # A recording holds one login, so recorded and replayed runs use the first account only
+            sessions = make_sessions(playwright, debug_mode, ACCOUNTS[:1], tracer=make_tracer(),
+                                     recording=RECORDING, storage_state_path=RECORDING.path("browser_state.json"))
+        else:
+            sessions = make_sessions(playwright, debug_mode, tracer=make_tracer())
         
         try:
-            # Step 1: Login to Better
-            login_to_better(page)
+            # Don't launch a browser while the site is known to be down
+            if not site_reachable():
+                sys.exit(0)
+            
+            # Step 1: Launch the browser and log in to Better with each account
+            try:
+                start_sessions(sessions)
+            except Exception:
+                BREAKER.record_failure(SITE_KEY, CIRCUIT_SITE_FAILURES)
+                raise
             
             # Step 2: Check all tennis locations
-            all_results = []
-            total_slots_found = 0
+            all_results, new_keys = run_sweep(sessions, debug_mode)
             
-            for location in TENNIS_LOCATIONS:
-                result = check_location_all_weekend_dates(page, location, debug_mode)
-                all_results.append(result)
-                if result["slots"]:
-                    total_slots_found += len(result["slots"])
+            if not RECORDING:
+                record_run()  # Lets launcher.py enforce WATCH_MIN_INTERVAL
             
             # Step 3: Process results
-            if total_slots_found > 0:
-                print(f"\n🎾 FOUND {total_slots_found} AVAILABLE SLOT(S) ACROSS {len([r for r in all_results if r['slots']])} LOCATION(S)!")
-                
-                # Format notification message
-                message_parts = ["🎾 Tennis Courts Available at Islington Tennis Centre!\n"]
-                
-                for result in all_results:
-                    if result["slots"]:
-                        message_parts.append(f"\n📍 {result['location']}:")
-                        for slot in result["slots"]:
-                            details = f"📅 {slot.get('date', 'Unknown date')} | ⏰ {slot['time']}"
-                            if slot['price']:
-                                details += f" | 💰 {slot['price']}"
-                            details += f" | 🏟️ {slot['spaces']} spaces"
-                            if slot['book_url']:
-                                details += f" | 🔗 {slot['book_url']}"
-                            message_parts.append(details)
-                
-                message_parts.append(f"\nChecked at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
-                
-                # Add URLs for each location
-                message_parts.append("\nBooking pages:")
-                for result in all_results:
-                    for location in TENNIS_LOCATIONS:
-                        if location['name'] == result['location']:
-                            weekend_dates = get_weekend_dates()
-                            for date in weekend_dates:
-                                url = f"{location['base_url']}/{date}/by-time"
-                                message_parts.append(f"• {result['location']} ({date}): {url}")
-                            break
-                
-                message = "\n".join(message_parts)
-                
-                print("\n" + "="*60)
-                print(message)
-                print("="*60)
-                
-                # Send notifications via Telegram (split if too long)
-                telegram_message = f"🎾 <b>Tennis Courts Available!</b>\n\n{message}"
-                
-                # Telegram has a 4096 character limit, so split if needed
-                if len(telegram_message) > 4000:
-                    # Send summary first
-                    summary = f"🎾 <b>Tennis Courts Available!</b>\n\n🎾 FOUND {total_slots_found} AVAILABLE SLOT(S) ACROSS {len([r for r in all_results if r['slots']])} LOCATION(S)!\n\nDetailed breakdown in next messages..."
-                    send_telegram(summary)
-                    
-                    # Send each location separately
-                    for result in all_results:
-                        if result["slots"]:
-                            location_message = f"📍 <b>{result['location']}</b>:\n\n"
-                            for slot in result["slots"]:
-                                details = f"📅 {slot.get('date', 'Unknown date')} | ⏰ {slot['time']}"
-                                if slot['price']:
-                                    details += f" | 💰 {slot['price']}"
-                                details += f" | 🏟️ {slot['spaces']} spaces"
-                                if slot['book_url']:
-                                    details += f"\n🔗 {slot['book_url']}"
-                                location_message += details + "\n\n"
-                            
-                            # Split location message if still too long
-                            if len(location_message) > 4000:
-                                # Send slots in batches
-                                batch_message = f"📍 <b>{result['location']}</b>:\n\n"
-                                for i, slot in enumerate(result["slots"]):
-                                    slot_details = f"📅 {slot.get('date', 'Unknown date')} | ⏰ {slot['time']}"
-                                    if slot['price']:
-                                        slot_details += f" | 💰 {slot['price']}"
-                                    slot_details += f" | 🏟️ {slot['spaces']} spaces"
-                                    if slot['book_url']:
-                                        slot_details += f"\n🔗 {slot['book_url']}"
-                                    slot_details += "\n\n"
-                                    
-                                    if len(batch_message + slot_details) > 3800:
-                                        send_telegram(batch_message)
-                                        batch_message = f"📍 <b>{result['location']}</b> (continued):\n\n" + slot_details
-                                    else:
-                                        batch_message += slot_details
-                                
-                                if batch_message.strip():
-                                    send_telegram(batch_message)
-                            else:
-                                send_telegram(location_message)
-                else:
-                    send_telegram(telegram_message)
-                
-                # send_email("🎾 Tennis Courts Available!", message)  # Disabled in favor of Telegram
-                # send_pushover("Tennis Courts Available", message)  # Disabled in favor of Telegram
-                
+            if notify_results(all_results, new_keys):
                 # Exit with code 1 to indicate slots were found (useful for cron alerts)
                 sys.exit(1)
-            else:
-                print(f"\nNo available slots found at any location")
-                for result in all_results:
-                    status = "✅ Checked" if "error" not in result else f"❌ Error: {result['error']}"
-                    print(f"  - {result['location']}: {status}")
-                print(f"Check completed at {time.strftime('%Y-%m-%d %H:%M:%S')}")
-                sys.exit(0)
+            sys.exit(0)
                 
         except Exception as e:
-            error_msg = f"Error occurred: {str(e)}"
-            print(error_msg, file=sys.stderr)
-            
-            # Optionally send error notifications
-            if SMTP_USER and EMAIL_TO:
-                send_email("Tennis Monitor Error", f"Error in tennis court monitor:\n\n{error_msg}")
-            
+            report_error(e)
             sys.exit(2)
         
         finally:
-            context.close()
-            browser.close()
+            close_sessions(sessions)
+
+
+def run_daemon(debug_mode, interval, lock, bot_commands=False):
+    """
+    Keep one browser open and sweep every `interval` seconds on weekend days.
+    Cron invocations that find the daemon running ask it for an immediate sweep
+    over the control socket instead of launching their own browser. With
+    `bot_commands`, single-page rescans asked for over Telegram run in between.
+    """
+    sweep_requested = threading.Event()
+    wake = threading.Event()
+
+    def handle_command(command):
+        if command == "sweep":
+            sweep_requested.set()
+            wake.set()
+            return {"ok": True, "message": "sweep scheduled"}
+        if command == "status":
+            return {"ok": True, "pid": os.getpid(), "mode": "daemon"}
+        return {"ok": False, "message": f"unknown command: {command}"}
+
+    control = ControlServer(SOCKET_PATH, handle_command)
+    control.start()
+    print(f"🛰️ Daemon listening on {SOCKET_PATH} (sweep every {interval}s)")
+    bot = start_command_bot(on_rescan=wake.set) if bot_commands else None
+
+    try:
+        with sync_playwright() as playwright:
+            # Pages are recycled and the browser restarted as needed, so memory stays flat
+            sessions = make_sessions(playwright, debug_mode, tracer=make_tracer())
+            try:
+                next_sweep = 0
+                while True:
+                    lock.heartbeat()
+                    if sweep_requested.is_set() or time.time() >= next_sweep:
+                        sweep_requested.clear()
+                        next_sweep = time.time() + interval
+                        if not is_weekend():
+                            print("Today is not a weekend day. Waiting.")
+                        elif site_reachable():
+                            try:
+                                print_banner(debug_mode)
+                                start_sessions(sessions)
+                                all_results, new_keys = run_sweep(sessions, debug_mode)
+                                notify_results(all_results, new_keys)
+                            except Exception as e:
+                                report_error(e)
+
+                    if bot:
+                        bot.process_rescans(lambda location, date_str:
+                                            rescan_page(sessions, location, date_str, debug_mode))
+
+                    wake.wait(timeout=max(0, next_sweep - time.time()))
+                    wake.clear()
+                    if sweep_requested.is_set():
+                        print("📨 Immediate sweep requested")
+            finally:
+                close_sessions(sessions)
+    finally:
+        if bot:
+            bot.stop()
+        control.stop()
+
+
+def run_live(debug_mode, refresh_interval, lock, bot_commands=False):
+    """
+    Keep a page open per venue and weekend date, refresh the booking widget in
+    place every `refresh_interval` seconds and notify as soon as a page shows a
+    slot not reported before - no sweeps. Bot commands never rescan here: every
+    watched page is already current.
+    """
+    seen_index = SlotIndex.load(SLOT_INDEX_PATH)
+
+    def on_change(location, date_str, slots):
+        result = {"location": location["name"], "slots": slots, "dates_checked": [date_str]}
+        RESULT_CACHE.update_page(location["name"], date_str, slots, time.time())
+        record_results([result])
+        new_slots = [slot for slot in slots if seen_index.add(slot)]
+        seen_index.save(SLOT_INDEX_PATH)
+        print(f"🔔 {location['name']} {date_str}: {len(slots)} slot(s) available, {len(new_slots)} new")
+        if new_slots:
+            notify_results([dict(result, slots=new_slots)], {slot.key for slot in new_slots})
+
+    def live_navigate(page, url, **goto_options):
+        return navigate(page, url, RATE_LIMITER, **goto_options)
+
+    print(f"👁️ Live mode: refreshing open pages every {refresh_interval}s")
+    bot = start_command_bot() if bot_commands else None
+    with sync_playwright() as playwright:
+        # Live pages all stay in one context, logged in as the first account
+        session, = make_sessions(playwright, debug_mode, ACCOUNTS[:1])
+        live = None
+        try:
+            while True:
+                lock.heartbeat()
+                if not is_weekend():
+                    if live:
+                        live.close_all()
+                    print("Today is not a weekend day. Waiting.")
+                    time.sleep(refresh_interval)
+                    continue
+                if not site_reachable():
+                    time.sleep(refresh_interval)
+                    continue
+                try:
+                    if live is None or not session.healthy():
+                        if session.browser is None:
+                            session.start()
+                        else:
+                            session.restart_browser("live pages lost")
+                        live = LiveWatcher(session.context, on_change, live_navigate,
+                                           refresh_interval=refresh_interval, want=wanted_page)
+                    live.sync(TENNIS_LOCATIONS, get_weekend_dates())
+                    live.idle()
+                    live.refresh()
+                except Exception as e:
+                    report_error(e)
+                    time.sleep(refresh_interval)
+        finally:
+            if bot:
+                bot.stop()
+            session.close()
+
+
+def main():
+    """Main function to check for available tennis courts."""
+    parser = argparse.ArgumentParser(description="Better/GLL tennis court availability monitor")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and sweep every --interval seconds")
+    parser.add_argument("--interval", type=int, default=int(os.getenv("WATCH_INTERVAL", "1800")),
+                        help="Seconds between sweeps in daemon mode (default: 1800)")
+    parser.add_argument("--live", action="store_true",
+                        help="Keep each date page open and report changes as the widget refreshes")
+    parser.add_argument("--refresh-interval", type=int, default=int(os.getenv("LIVE_REFRESH_INTERVAL", "60")),
+                        help="Seconds between in-page refreshes in live mode (default: 60)")
+    parser.add_argument("--http-port", type=int, default=int(os.getenv("STATUS_HTTP_PORT", "0")),
+                        help="Serve latest results on this local port (0 = off)")
+    parser.add_argument("--http-host", default=os.getenv("STATUS_HTTP_HOST", "127.0.0.1"),
+                        help="Address for the status API (default: 127.0.0.1)")
+    parser.add_argument("--bot", action="store_true",
+                        help="Answer /now, /venue and /date over Telegram (with --daemon or --live)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=os.getenv("PROFILE_MODE") or None,
+                        help="Profile the run (cpu: cProfile, mem: tracemalloc) into PROFILE_DIR")
+    parser.add_argument("--browser-profile", default=os.getenv("BROWSER_PROFILE", "default"),
+                        help=f"Browser launch profile, from: {', '.join(BROWSER_PROFILES)} (see browser_profiles.py)")
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument("--record", metavar="DIR",
+                           help="Run against the live site and save HARs, dates and notifications to DIR")
+    recording.add_argument("--replay", metavar="DIR",
+                           help="Run offline from a recording in DIR (notifications go to DIR)")
+    args = parser.parse_args()
+    validate_config()
+
+    if (args.record or args.replay) and (args.daemon or args.live):
+        parser.error("--record/--replay run a single sweep and can't be combined with --daemon or --live")
+    if args.daemon and args.live:
+        parser.error("--live already keeps running; use it instead of --daemon")
+    if args.bot and not (args.daemon or args.live):
+        parser.error("--bot needs a long-running mode: --daemon or --live")
+    if args.browser_profile not in BROWSER_PROFILES:
+        parser.error(f"unknown browser profile '{args.browser_profile}' (choose from: {', '.join(BROWSER_PROFILES)})")
+    bot_commands = args.bot or os.getenv("TELEGRAM_BOT_COMMANDS") == "1"
+
+    global RECORDING, SLOT_INDEX_PATH, TENNIS_LOCATIONS, BREAKER, WAIT_TIMEOUTS, PARSE_POOL, BROWSER_PROFILE, \
+        RATE_LIMITER
+    BROWSER_PROFILE = args.browser_profile
+    if args.record or args.replay:
+        RECORDING = Recording(args.record or args.replay, "record" if args.record else "replay")
+        SLOT_INDEX_PATH = RECORDING.path("slot_index.json")
+        BREAKER = CircuitBreaker(RECORDING.path("circuit_state.json"))
+        WAIT_TIMEOUTS = AdaptiveTimeouts(RECORDING.path("wait_timings.json"), RECORDING.path("wait_timings_history.jsonl"))
+        if args.record:
+            RECORDING.pin(get_weekend_dates(), TENNIS_LOCATIONS)
+            print(f"🎬 Recording this run to {args.record}")
+        else:
+            TENNIS_LOCATIONS = RECORDING.manifest["locations"]
+            # Replays are served from the HARs: don't spend (or wait for) the live site's request budget
+            RATE_LIMITER = RateLimiter(RECORDING.path("rate_limit.json"), per_minute=REPLAY_RATE_PER_MINUTE,
+                                       burst=REPLAY_RATE_PER_MINUTE)
+            print(f"🎬 Replaying {args.replay} (recorded {RECORDING.manifest['recorded_at']}) - no live requests")
+
+    # Check if it's weekend (Friday, Saturday, Sunday); recordings can be made and replayed any day
+    if not (args.daemon or args.live) and not RECORDING and not is_weekend():
+        print(f"Today is not a weekend day. Exiting.")
+        print("This script only runs on Friday, Saturday, and Sunday.")
+        return
+    
+    # Check for debug mode
+    debug_mode = os.getenv("DEBUG_MODE", "false").lower() == "true"
+
+    # Worker processes are invisible to the profiler, so parse on the profiled thread
+    if args.profile:
+        PARSE_POOL = ParsePool(workers=0)
+        print(f"📈 Profiling this run ({args.profile}); parsing inline")
+
+    # Replays never touch the live site, so they can run alongside the real watcher
+    if args.replay:
+        with profiled(args.profile, "replay"):
+            run_once(debug_mode)
+        return
+
+    # Only one watcher (and one browser) at a time
+    mode = "daemon" if args.daemon else "live" if args.live else "run"
+    lock = InstanceLock(LOCK_PATH)
+    if not lock.acquire(mode):
+        holder = lock.holder() or {}
+        if holder.get("stale"):
+            print(f"⚠️ Watcher pid {holder.get('pid')} holds the lock but has not checked in "
+                  f"for {holder['stale']:.0f}s - it may be hung")
+        if not args.daemon and holder.get("mode") == "daemon":
+            reply = send_command(SOCKET_PATH, "sweep")
+            if reply and reply.get("ok"):
+                print(f"Daemon (pid {holder.get('pid')}) is running - requested an immediate sweep")
+                return
+        print(f"Another watcher is already running (pid {holder.get('pid', 'unknown')}). Exiting.")
+        return
+
+    status_server = start_status_server(args.http_host, args.http_port) if args.http_port else None
+    try:
+        with profiled(args.profile, mode):
+            if args.daemon:
+                run_daemon(debug_mode, args.interval, lock, bot_commands)
+            elif args.live:
+                run_live(debug_mode, args.refresh_interval, lock, bot_commands)
+            else:
+                run_once(debug_mode)
+    finally:
+        PARSE_POOL.close()
+        if status_server:
+            status_server.shutdown()
+        lock.release()
 
 
 if __name__ == "__main__":